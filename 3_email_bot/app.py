@@ -8,16 +8,40 @@ import chromadb
 import json
 import os
 
-def main():
+# ChromaDB returns distances, so lower values mean more similar questions
+SIMILARITY_THRESHOLD = 1.5  # Adjust this value as needed
+
+def get_collection():
+    """
+    Opens the persistent ChromaDB collection created by the indexer.
+
+    Returns:
+        Collection: The "email_bot" collection
+    """
+    default_ef = embedding_functions.DefaultEmbeddingFunction()
+    
+    # Ensure directory exists
+    os.makedirs("./db/chroma_persist", exist_ok=True)
+    chromadb_client = chromadb.PersistentClient(path="./db/chroma_persist")
+    return chromadb_client.get_or_create_collection("email_bot", embedding_function=default_ef)
+
+def main(reader=None, sender=None, collection=None, max_results=10, similarity_threshold=SIMILARITY_THRESHOLD):
     """
     Main function that processes unread emails, searches for similar questions in the knowledge base,
     finds associated answers and sends them as a response to the original email.
+
+    Args:
+        reader (EmailReader, optional): Source of unread emails. Defaults to the Gmail reader.
+        sender (EmailSender, optional): Used to send replies. Defaults to the Gmail sender.
+        collection (Collection, optional): Knowledge base. Defaults to the persistent collection.
+        max_results (int, optional): Maximum number of unread threads to process. Defaults to 10.
+        similarity_threshold (float, optional): Maximum distance to accept a match.
     """
-    reader = EmailReader()
-    sender = EmailSender()
+    reader = reader or EmailReader()
+    sender = sender or EmailSender()
     
     # Read unread emails
-    emails = reader.read_emails(max_results=10, query='is:unread')
+    emails = reader.read_emails(max_results=max_results, query='is:unread')
     print(f"Found {len(emails)} new emails to process.")
     
     if not emails:
@@ -25,17 +49,13 @@ def main():
         return
     
     # Configure ChromaDB
-    default_ef = embedding_functions.DefaultEmbeddingFunction()
-    
-    try:
-        # Ensure directory exists
-        os.makedirs("./db/chroma_persist", exist_ok=True)
-        chromadb_client = chromadb.PersistentClient(path="./db/chroma_persist")
-        collection = chromadb_client.get_or_create_collection("email_bot", embedding_function=default_ef)
-    except Exception as e:
-        print(f"Error connecting to ChromaDB: {e}")
-        print("Make sure the database was created by running the indexer.py script first.")
-        return
+    if collection is None:
+        try:
+            collection = get_collection()
+        except Exception as e:
+            print(f"Error connecting to ChromaDB: {e}")
+            print("Make sure the database was created by running the indexer.py script first.")
+            return
     
     # Check if there are documents in the collection
     try:
@@ -46,160 +66,178 @@ def main():
     except Exception as e:
         print(f"Error checking collection: {e}")
         return
+
+    # Count the available questions once instead of for every email
+    try:
+        all_questions = collection.get(
+            where={"$and": [
+                {"type": {"$eq": "question"}},
+                {"has_response": {"$eq": True}}
+            ]},
+            include=[]
+        )
+        print(f"Total available questions with answers: {len(all_questions['ids'])}")
+    except Exception as e:
+        print(f"Error counting questions: {e}")
     
     # Process each email
     for i, email in enumerate(emails, 1):
         print(f"\n[{i}/{len(emails)}] Processing email from {email['from']} - Subject: {email['subject']}")
+        process_email(email, collection, reader, sender, similarity_threshold)
+    
+    print("\nEmail processing completed!")
 
-        # Prepare query text - use only the first 200 characters to avoid noise
-        query_text = email['text'][:200] if len(email['text']) > 200 else email['text']
-        
-        print(f"\nQuery text: {query_text[:50]}...")
-        
-        # Semantic search for similar questions
-        try:
-            # First, get all available questions for analysis
-            all_questions = collection.get(
-                where={"$and": [
-                    {"type": {"$eq": "question"}},
-                    {"has_response": {"$eq": True}}
-                ]},
-                include=["metadatas"]
-            )
-            
-            print(f"Total available questions with answers: {len(all_questions['ids'])}")
+def process_email(email, collection, reader, sender, similarity_threshold=SIMILARITY_THRESHOLD):
+    """
+    Finds the most similar answered question for an email and replies with its answer.
 
-            # Semantic search with only 1 result (the most similar)
-            results = collection.query(
-                query_texts=[query_text],
-                n_results=1,  # Get only the most similar result
-                where={"$and": [
-                    {"type": {"$eq": "question"}},
-                    {"has_response": {"$eq": True}}
-                ]}  # Ensure we only get questions with answers
-            )
-            
-            if not results["ids"] or len(results["ids"][0]) == 0:
-                print("No similar questions found in the knowledge base.")
-                continue
-                
-            # Define a similarity threshold (lower value means more similar)
-            # ChromaDB uses distance, so lower values are better
-            similarity_threshold = 1.5  # Adjust this value as needed
-            
-            # Filter results by similarity
-            filtered_results = {
-                "ids": [],
-                "documents": [],
-                "metadatas": [],
-                "distances": []
-            }
+    Args:
+        email (dict): Email as returned by EmailReader.read_emails
+        collection (Collection): Knowledge base with indexed questions and answers
+        reader (EmailReader): Used to mark the email as read after replying
+        sender (EmailSender): Used to send the reply
+        similarity_threshold (float, optional): Maximum distance to accept a match.
+
+    Returns:
+        bool: True if a reply was sent, False otherwise
+    """
+    sent = False
+
+    # Prepare query text - use only the first 200 characters to avoid noise
+    query_text = email['text'][:200] if len(email['text']) > 200 else email['text']
+    
+    print(f"\nQuery text: {query_text[:50]}...")
+    
+    # Semantic search for similar questions
+    try:
+        # Semantic search with only 1 result (the most similar)
+        results = collection.query(
+            query_texts=[query_text],
+            n_results=1,  # Get only the most similar result
+            where={"$and": [
+                {"type": {"$eq": "question"}},
+                {"has_response": {"$eq": True}}
+            ]}  # Ensure we only get questions with answers
+        )
+        
+        if not results["ids"] or len(results["ids"][0]) == 0:
+            print("No similar questions found in the knowledge base.")
+            return False
             
-            for i, distance in enumerate(results["distances"][0]):
-                if distance < similarity_threshold:
-                    filtered_results["ids"].append(results["ids"][0][i])
-                    filtered_results["documents"].append(results["documents"][0][i])
-                    filtered_results["metadatas"].append(results["metadatas"][0][i])
-                    filtered_results["distances"].append(distance)
+        # Filter results by similarity
+        filtered_results = {
+            "ids": [],
+            "documents": [],
+            "metadatas": [],
+            "distances": []
+        }
+        
+        for i, distance in enumerate(results["distances"][0]):
+            if distance < similarity_threshold:
+                filtered_results["ids"].append(results["ids"][0][i])
+                filtered_results["documents"].append(results["documents"][0][i])
+                filtered_results["metadatas"].append(results["metadatas"][0][i])
+                filtered_results["distances"].append(distance)
+        
+        if not filtered_results["ids"]:
+            print(f"No questions with sufficient similarity found (threshold: {similarity_threshold}).")
+            return False
             
-            if not filtered_results["ids"]:
-                print(f"No questions with sufficient similarity found (threshold: {similarity_threshold}).")
-                continue
-                
-            print(f"Found {len(filtered_results['ids'])} questions with sufficient similarity.")
+        print(f"Found {len(filtered_results['ids'])} questions with sufficient similarity.")
 
-            # Show found questions with their similarity scores
-            print("\n=== SIMILAR QUESTIONS FOUND ===")
+        # Show found questions with their similarity scores
+        print("\n=== SIMILAR QUESTIONS FOUND ===")
+        
+        # Variable to store the response to be sent
+        response_to_send = None
+        response_meta = None
+        
+        # Process only the most similar question
+        if filtered_results["ids"]:
+            question_id = filtered_results["ids"][0]
+            question_doc = filtered_results["documents"][0]
+            question_meta = filtered_results["metadatas"][0]
+            distance = filtered_results["distances"][0]
             
-            # Variable to store the response to be sent
-            response_to_send = None
-            response_meta = None
+            print(f"\nMost similar question: {question_meta.get('subject')}")
+            print(f"Similarity: {distance}")
+            print(f"ID: {question_id}")
+            print(f"Thread ID: {question_meta.get('thread_id')}")
+            print(f"Has answer: {question_meta.get('has_response', False)}")
             
-            # Process only the most similar question
-            if filtered_results["ids"]:
-                question_id = filtered_results["ids"][0]
-                question_doc = filtered_results["documents"][0]
-                question_meta = filtered_results["metadatas"][0]
-                distance = filtered_results["distances"][0]
+            # If the question has an associated answer, retrieve and show it
+            if question_meta.get("has_response") and question_meta.get("response_id"):
+                response_id = question_meta.get("response_id")
                 
-                print(f"\nMost similar question: {question_meta.get('subject')}")
-                print(f"Similarity: {distance}")
-                print(f"ID: {question_id}")
-                print(f"Thread ID: {question_meta.get('thread_id')}")
-                print(f"Has answer: {question_meta.get('has_response', False)}")
+                # Get the answer by ID
+                response_results = collection.get(
+                    ids=[response_id],
+                    include=["documents", "metadatas"]
+                )
                 
-                # If the question has an associated answer, retrieve and show it
-                if question_meta.get("has_response") and question_meta.get("response_id"):
-                    response_id = question_meta.get("response_id")
+                if response_results["ids"]:
+                    resp_doc = response_results["documents"][0]
+                    resp_meta = response_results["metadatas"][0]
                     
-                    # Get the answer by ID
-                    response_results = collection.get(
-                        ids=[response_id],
-                        include=["documents", "metadatas"]
-                    )
+                    print(f"\nASSOCIATED ANSWER:")
+                    print(f"From: {resp_meta.get('from')}")
+                    print(f"Subject: {resp_meta.get('subject')}")
+                    print(f"Answer text:\n{resp_doc[:200]}...")
                     
-                    if response_results["ids"]:
-                        resp_doc = response_results["documents"][0]
-                        resp_meta = response_results["metadatas"][0]
-                        
-                        print(f"\nASSOCIATED ANSWER:")
-                        print(f"From: {resp_meta.get('from')}")
-                        print(f"Subject: {resp_meta.get('subject')}")
-                        print(f"Answer text:\n{resp_doc[:200]}...")
-                        
-                        # Store the response for sending
-                        response_to_send = resp_doc
-                        response_meta = resp_meta
-                    else:
-                        print(f"Referenced answer (ID: {response_id}) not found!")
+                    # Store the response for sending
+                    response_to_send = resp_doc
+                    response_meta = resp_meta
                 else:
-                    print("This question has no associated answer.")
+                    print(f"Referenced answer (ID: {response_id}) not found!")
+            else:
+                print("This question has no associated answer.")
+            
+            # If we found a response, send it
+            if response_to_send:
+                print("\n=== SENDING RESPONSE AUTOMATICALLY ===")
                 
-                # If we found a response, send it
-                if response_to_send:
-                    print("\n=== SENDING RESPONSE AUTOMATICALLY ===")
-                    
-                    # Prepare the original email for response
-                    original_msg = {
-                        "from_": email['from'],
-                        "subject": email['subject'],
-                        "headers": {"Message-ID": email['message_id']},
-                        "thread_id": email['thread_id']
-                    }
+                # Prepare the original email for response
+                original_msg = {
+                    "from_": email['from'],
+                    "subject": email['subject'],
+                    "headers": {"Message-ID": email['message_id']},
+                    "thread_id": email['thread_id']
+                }
+                
+                # Send the response
+                try:
+                    result = sender.reply_email(
+                        original_msg=original_msg,
+                        reply_body=response_to_send
+                    )
                     
-                    # Send the response
-                    try:
-                        result = sender.reply_email(
-                            original_msg=original_msg,
-                            reply_body=response_to_send
-                        )
+                    if result:
+                        sent = True
+                        print(f"Response successfully sent to {email['from']}!")
                         
-                        if result:
-                            print(f"Response successfully sent to {email['from']}!")
-                            
-                            # Mark the original email as read
-                            if 'id' in email:
-                                mark_result = reader.mark_as_read(message_id=email['id'])
-                                if mark_result:
-                                    print(f"Email successfully marked as read!")
-                                else:
-                                    print(f"WARNING: Could not mark the email as read.")
+                        # Mark the original email as read
+                        if 'id' in email:
+                            mark_result = reader.mark_as_read(message_id=email['id'])
+                            if mark_result:
+                                print(f"Email successfully marked as read!")
                             else:
-                                # Fallback to thread_id if message id is not available
-                                mark_result = reader.mark_as_read(thread_id=email['thread_id'])
-                                if mark_result:
-                                    print(f"Entire thread successfully marked as read!")
-                                else:
-                                    print(f"WARNING: Could not mark the thread as read.")
+                                print(f"WARNING: Could not mark the email as read.")
                         else:
-                            print(f"ERROR: Failed to send response to {email['from']}. Check credentials and permissions.")
-                    except Exception as e:
-                        print(f"ERROR: Error sending response: {e}")
-            
-        except Exception as e:
-            print(f"Error searching for similar questions: {e}")
-    
-    print("\nEmail processing completed!")
+                            # Fallback to thread_id if message id is not available
+                            mark_result = reader.mark_as_read(thread_id=email['thread_id'])
+                            if mark_result:
+                                print(f"Entire thread successfully marked as read!")
+                            else:
+                                print(f"WARNING: Could not mark the thread as read.")
+                    else:
+                        print(f"ERROR: Failed to send response to {email['from']}. Check credentials and permissions.")
+                except Exception as e:
+                    print(f"ERROR: Error sending response: {e}")
+        
+    except Exception as e:
+        print(f"Error searching for similar questions: {e}")
+
+    return sent
 
 def debug_collection():
     """
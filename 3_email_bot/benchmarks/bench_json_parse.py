@@ -0,0 +1,115 @@
+"""
+Benchmark of the single-pass tolerant JSON parser against the previous
+regex-based `robust_json_parse` chain, using typical malformed LLM outputs.
+
+Usage:
+    python benchmarks/bench_json_parse.py [iterations]
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_utils import LLMUtils, TolerantJSONParser, parse_tolerant_json
+
+INCIDENT = {
+    "title": "404 Error when trying to access pedigree reports on iOS devices",
+    "description": "I'm trying to access my dog's pedigree reports through my iPhone 13 but I constantly receive a 404 error. " * 3,
+}
+
+REPLY = {
+    "message_id": "<CAF1234@mail.gmail.com>",
+    "from": "user@example.com",
+    "subject": "Failed to generate pedigree report",
+    "problem": "Report generation fails",
+    "solution": "1) Clear the browser cache; 2) Update Safari to 15.4+; 3) Retry the export.",
+}
+
+
+def _dump(items):
+    return json.dumps(items, indent=2)
+
+
+SAMPLES = {
+    "valid": _dump([REPLY] * 10),
+    "markdown_fence": "Here is the JSON you asked for:\n```json\n" + _dump([INCIDENT] * 10) + "\n```",
+    "trailing_commas": _dump([REPLY] * 10).replace('"\n  }', '",\n  }').replace("}\n]", "},\n]"),
+    "semicolons": _dump([REPLY] * 10).replace('",\n', '";\n'),
+    "single_quotes": _dump([REPLY] * 10).replace('"', "'"),
+    "unquoted_keys": re.sub(r'"(\w+)":', r'\1:', _dump([REPLY] * 10)),
+    "missing_commas": _dump([REPLY] * 10).replace("},\n", "}\n"),
+}
+
+
+def legacy_robust_json_parse(utils, text):
+    """The regex/re-parse chain `robust_json_parse` used before the tolerant parser."""
+    try:
+        json_text = utils.extract_json_from_response(text)
+    except ValueError:
+        json_text = text
+    clean_json = utils.clean_json_string(json_text)
+    try:
+        return json.loads(clean_json)
+    except json.JSONDecodeError:
+        clean_json = clean_json.replace(";", ",")
+        clean_json = re.sub(r'([^\\])(")(.*?)([^\\])(")(\s*:)', r'\1\2\3\4\5\6', clean_json)
+        clean_json = re.sub(r'(}|"])\s*(}|])', r'\1,\2', clean_json)
+        try:
+            return json.loads(clean_json)
+        except json.JSONDecodeError:
+            return utils.manual_json_extraction(json_text)
+
+
+def _time(func, text, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            result = func(text)
+        except Exception:
+            result = None
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6, result
+
+
+def _quiet(func):
+    # The legacy chain prints diagnostics on every failure
+    def run(text):
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            return func(text)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return run
+
+
+def _streamed(text, chunk_size=16):
+    parser = TolerantJSONParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i:i + chunk_size])
+    return parser.close()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    utils = LLMUtils()
+    legacy = _quiet(lambda text: legacy_robust_json_parse(utils, text))
+
+    print(f"{'sample':<16}{'legacy us':>12}{'ok':>5}{'tolerant us':>14}{'ok':>5}{'streamed us':>14}")
+    for name, text in SAMPLES.items():
+        expected = len(json.loads(SAMPLES["valid"]))
+        legacy_us, legacy_result = _time(legacy, text, iterations)
+        tolerant_us, tolerant_result = _time(parse_tolerant_json, text, iterations)
+        streamed_us, _ = _time(_streamed, text, iterations)
+        legacy_ok = isinstance(legacy_result, list) and len(legacy_result) == expected
+        tolerant_ok = isinstance(tolerant_result, list) and len(tolerant_result) == expected
+        print(f"{name:<16}{legacy_us:>12.1f}{'yes' if legacy_ok else 'no':>5}"
+              f"{tolerant_us:>14.1f}{'yes' if tolerant_ok else 'no':>5}{streamed_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
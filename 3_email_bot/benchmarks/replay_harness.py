@@ -0,0 +1,356 @@
+"""
+Offline replay harness for the email bot.
+
+Indexes a corpus of question/answer threads with the real indexer and replays
+incoming questions through the real matching code in app.py, using local
+stand-ins for Gmail and SMTP. Reports emails per second, per-stage latency
+percentiles and match precision at the given similarity thresholds.
+
+The corpus is either synthetic (default) or loaded from a JSON file with the
+following format (use --save-corpus to get an example):
+
+    {
+        "threads": [{"thread_id": "...", "topic": "...",
+                     "question": {"from": "...", "subject": "...", "text": "..."},
+                     "answer": {"from": "...", "subject": "...", "text": "..."}}],
+        "queries": [{"from": "...", "subject": "...", "text": "...",
+                     "expected_topic": "... or null if no answer should be sent"}]
+    }
+
+Usage:
+    python benchmarks/replay_harness.py --threads 200 --queries 500
+    python benchmarks/replay_harness.py --corpus recorded.json --thresholds 1.0,1.25,1.5
+"""
+from chromadb.utils import embedding_functions
+import argparse
+import chromadb
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from utils.indexer import index_emails
+
+TOPICS = {
+    "ios_reports": (
+        "404 error on pedigree reports on iOS",
+        ["I get a 404 error when opening my dog's pedigree reports on my iPhone with Safari.",
+         "Pedigree reports return 'Resource not found' on my iPad, but they work on my laptop.",
+         "On iOS every pedigree report link shows a 404 page, even after clearing the cache."],
+        "The 404 on iOS is caused by an outdated report URL cached by Safari. Clear website data in Settings > Safari and update to iOS 16.4 or later."
+    ),
+    "photo_upload": (
+        "Photo upload freezes at 45%",
+        ["Uploading photos of my dog freezes at 45% and then fails with 'unsupported format'.",
+         "The gallery upload gets stuck halfway when I add several JPG photos at once.",
+         "My browser hangs when I upload more than five pictures to the dog gallery."],
+        "Large batches exceed the browser memory limit. Upload at most five photos at a time or resize them below 2MB before uploading."
+    ),
+    "pdf_certificate": (
+        "Pedigree certificate PDF generation fails",
+        ["Generating the PDF pedigree certificate fails with 'Failed to render lineage chart'.",
+         "The certificate PDF never finishes rendering for my dog with seven generations.",
+         "I cannot download the pedigree certificate, the lineage chart does not render."],
+        "Lineages deeper than six generations time out while rendering. Use the 'compact lineage' option in the certificate settings."
+    ),
+    "csv_export": (
+        "Medical history CSV export is corrupted",
+        ["The medical history CSV export opens as a damaged file in Excel.",
+         "Exporting the vet history produces a corrupted CSV with strange characters.",
+         "My dog's medical records export cannot be opened in Google Sheets."],
+        "The export mixes attachments into the CSV when records have images. Untick 'include attachments' and export again."
+    ),
+    "microchip": (
+        "Microchip already registered error",
+        ["Registering my new dog fails because the microchip number is already registered.",
+         "The system says the microchip belongs to another account after a transfer.",
+         "I cannot add a transferred dog, validation says the chip number exists."],
+        "Transferred microchips must be released by the previous owner. Ask them to confirm the transfer under Dogs > Transfers."
+    ),
+    "mobile_login": (
+        "Mobile app authentication fails with invalid token",
+        ["The mobile app says 'Authentication failure: Invalid token' when I connect my account.",
+         "I can log in on the website but the Android app rejects my credentials.",
+         "Connecting the app to my account fails with an OAuth2 invalid grant error."],
+        "App versions below 2.4 use a retired login flow. Update the app from the store and sign in again."
+    ),
+}
+
+UNRELATED = [
+    "Can you send me an invoice for last month's subscription?",
+    "What are your office opening hours during the holidays?",
+    "I would like to cancel my newsletter subscription.",
+    "Do you have a partnership program for veterinary clinics?",
+]
+
+OPENERS = ["Hello,", "Hi team,", "Good morning,", "Dear support,", ""]
+CLOSINGS = ["Thanks.", "Please help.", "This is urgent.", "Any idea?", ""]
+
+
+def build_synthetic_corpus(n_threads, n_queries, seed=42):
+    """Builds a corpus of answered threads and incoming questions about known topics."""
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    threads = []
+    for i in range(n_threads):
+        topic = topics[i % len(topics)]
+        subject, variants, answer = TOPICS[topic]
+        threads.append({
+            "thread_id": f"thread-{i}",
+            "topic": topic,
+            "question": {
+                "from": f"user{i}@example.com",
+                "subject": subject,
+                "text": f"{rng.choice(OPENERS)} {rng.choice(variants)} {rng.choice(CLOSINGS)}".strip(),
+            },
+            "answer": {
+                "from": "support@animalfreedom.example",
+                "subject": f"Re: {subject}",
+                "text": answer,
+            },
+        })
+
+    queries = []
+    for i in range(n_queries):
+        if rng.random() < 0.2:
+            text, expected = rng.choice(UNRELATED), None
+        else:
+            expected = rng.choice(topics)
+            text = rng.choice(TOPICS[expected][1])
+        queries.append({
+            "from": f"customer{i}@example.com",
+            "subject": text[:40],
+            "text": f"{rng.choice(OPENERS)} {text} {rng.choice(CLOSINGS)}".strip(),
+            "expected_topic": expected,
+        })
+    return {"threads": threads, "queries": queries}
+
+
+class StageTimer:
+    """Collects durations per pipeline stage."""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def percentiles(self, stage):
+        values = sorted(self.durations.get(stage, []))
+        if not values:
+            return None
+
+        def pick(p):
+            return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+        return len(values), pick(50), pick(95), pick(99)
+
+
+class TimedCollection:
+    """Wraps a ChromaDB collection to time the calls made by the matching code."""
+
+    def __init__(self, collection, timer):
+        self._collection = collection
+        self._timer = timer
+
+    def query(self, *args, **kwargs):
+        with self._timer.measure("match"):
+            return self._collection.query(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        with self._timer.measure("fetch_answer"):
+            return self._collection.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class LocalMailbox:
+    """Stand-in for the Gmail EmailReader, serving emails from memory."""
+
+    def __init__(self, emails, timer):
+        self.emails = emails
+        self.unread = {email["id"] for email in emails}
+        self.timer = timer
+
+    def read_emails(self, max_results=10, query='is:unread'):
+        with self.timer.measure("read"):
+            emails = self.emails
+            if query == 'is:unread':
+                emails = [e for e in emails if e["id"] in self.unread]
+            return emails[:max_results]
+
+    def mark_as_read(self, message_id=None, thread_id=None):
+        with self.timer.measure("mark_read"):
+            if message_id:
+                self.unread.discard(message_id)
+            else:
+                self.unread -= {e["id"] for e in self.emails if e["thread_id"] == thread_id}
+            return True
+
+
+class LocalSender:
+    """Stand-in for the Gmail/SMTP EmailSender, recording replies in memory."""
+
+    def __init__(self, timer, latency=0.0):
+        self.timer = timer
+        self.latency = latency
+        self.replies = {}
+
+    def reply_email(self, original_msg, reply_body, content_type="plain"):
+        with self.timer.measure("send"):
+            required_fields = ["from_", "subject", "thread_id"]
+            if any(not original_msg.get(field) for field in required_fields):
+                return False
+            if self.latency:
+                time.sleep(self.latency)
+            self.replies[original_msg["thread_id"]] = reply_body
+            return True
+
+
+def _thread_emails(thread):
+    emails = []
+    for kind in ("question", "answer"):
+        message = thread[kind]
+        emails.append({
+            "from": message["from"],
+            "subject": message["subject"],
+            "text": message["text"],
+            "thread_id": thread["thread_id"],
+            "message_id": f"<{thread['thread_id']}-{kind}@replay>",
+            "id": f"{thread['thread_id']}-{kind}",
+        })
+    return emails
+
+
+def _query_emails(queries):
+    return [{
+        "from": query["from"],
+        "subject": query["subject"],
+        "text": query["text"],
+        "thread_id": f"incoming-{i}",
+        "message_id": f"<incoming-{i}@replay>",
+        "id": f"incoming-{i}",
+    } for i, query in enumerate(queries)]
+
+
+def build_collection(corpus, path, timer):
+    """Indexes the corpus threads with the real indexer into a fresh collection."""
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection(
+        "email_bot", embedding_function=embedding_functions.DefaultEmbeddingFunction()
+    )
+    with timer.measure("index"):
+        for thread in corpus["threads"]:
+            index_emails(collection, _thread_emails(thread))
+    return collection
+
+
+def replay(corpus, collection, threshold, send_latency=0.0, verbose=False):
+    """
+    Replays the corpus queries through app.process_email.
+
+    Returns:
+        tuple: (StageTimer, elapsed seconds, dict of quality counters)
+    """
+    timer = StageTimer()
+    emails = _query_emails(corpus["queries"])
+    reader = LocalMailbox(emails, timer)
+    sender = LocalSender(timer, latency=send_latency)
+    timed_collection = TimedCollection(collection, timer)
+    answer_topics = {thread["answer"]["text"]: thread["topic"] for thread in corpus["threads"]}
+
+    output = sys.stdout if verbose else io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        for email in reader.read_emails(max_results=len(emails)):
+            with timer.measure("total"):
+                app.process_email(email, timed_collection, reader, sender, similarity_threshold=threshold)
+    elapsed = time.perf_counter() - start
+
+    quality = {"sent": 0, "correct": 0, "answerable": 0, "answered": 0, "unrelated_answered": 0}
+    for email, query in zip(emails, corpus["queries"]):
+        reply = sender.replies.get(email["thread_id"])
+        expected = query.get("expected_topic")
+        if expected:
+            quality["answerable"] += 1
+        if reply is None:
+            continue
+        quality["sent"] += 1
+        if expected:
+            quality["answered"] += 1
+            if answer_topics.get(reply) == expected:
+                quality["correct"] += 1
+        else:
+            quality["unrelated_answered"] += 1
+    return timer, elapsed, quality
+
+
+def print_report(threshold, timer, elapsed, quality, n_emails):
+    print(f"\n=== THRESHOLD {threshold} ===")
+    print(f"Emails: {n_emails} in {elapsed:.2f}s ({n_emails / elapsed:.1f} emails/s)")
+    print(f"{'stage':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage in ("read", "match", "fetch_answer", "send", "mark_read", "total"):
+        stats = timer.percentiles(stage)
+        if stats:
+            count, p50, p95, p99 = stats
+            print(f"{stage:<14}{count:>8}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+
+    precision = quality["correct"] / quality["sent"] if quality["sent"] else 0.0
+    recall = quality["correct"] / quality["answerable"] if quality["answerable"] else 0.0
+    print(f"Replies sent: {quality['sent']} | precision: {precision:.3f} | recall: {recall:.3f} "
+          f"| unrelated emails answered: {quality['unrelated_answered']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a corpus through the email bot offline.")
+    parser.add_argument("--corpus", help="JSON corpus file (defaults to a synthetic corpus)")
+    parser.add_argument("--save-corpus", help="Write the corpus used to this file")
+    parser.add_argument("--threads", type=int, default=60, help="Synthetic answered threads to index")
+    parser.add_argument("--queries", type=int, default=200, help="Synthetic incoming emails to replay")
+    parser.add_argument("--thresholds", default=str(app.SIMILARITY_THRESHOLD),
+                        help="Comma-separated similarity thresholds to evaluate")
+    parser.add_argument("--send-latency", type=float, default=0.0, help="Simulated seconds per sent reply")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic corpus")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot output")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+    else:
+        corpus = build_synthetic_corpus(args.threads, args.queries, args.seed)
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, indent=2)
+
+    with tempfile.TemporaryDirectory() as path:
+        index_timer = StageTimer()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            collection = build_collection(corpus, path, index_timer)
+        index_time = index_timer.durations["index"][0]
+        print(f"Indexed {len(corpus['threads'])} threads in {index_time:.2f}s "
+              f"({len(corpus['threads']) / index_time:.1f} threads/s)")
+
+        for threshold in (float(t) for t in args.thresholds.split(",")):
+            timer, elapsed, quality = replay(corpus, collection, threshold, args.send_latency, args.verbose)
+            print_report(threshold, timer, elapsed, quality, len(corpus["queries"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,22 @@ from utils.model import LLMModel                # Importing the LLM model
 from utils.sender_smtp import EmailSender       # Importing EmailSender to send emails via smtp
 from dotenv import load_dotenv
 from utils.llm_utils import LLMUtils            # Importing utilities for LLM manipulation
+from utils.seeding import SeedCheckpoint, TokenBucket, retry_with_jitter, run_bounded
+import argparse
+import asyncio
 import json
+import math
 import os
-import re                                       # Importing regular expressions module
 load_dotenv()
 
+INCIDENTS_PER_BATCH = 10
+
 class IncidentSeeder(LLMUtils):
     def __init__(self, llm_model):
         self.llm_model = llm_model
 
-    def generate_incidents(self):
+    def build_messages(self):
+        """Returns the chat messages asking the model for a batch of 10 incidents."""
         prompt = (
             "Generate a list with EXACTLY 10 DETAILED and REALISTIC technical incidents reported by users of our 'ANIMAL FREEDOM' dog and pedigree management web system.\n\n"
             "IMPORTANT: Your response MUST contain EXACTLY 10 incidents, no more, no less.\n\n"
@@ -66,161 +72,28 @@ class IncidentSeeder(LLMUtils):
                 "content": prompt
             }
         ]
+        return messages
 
+    def generate_incidents(self):
+        messages = self.build_messages()
         response = self.llm_model.generate_completion(messages)
         
         # Print the first 200 characters of the response for diagnosis
         print(f"First 200 characters of the response: {response[:200]}")
         
-        # Direct approach: extract only what appears to be JSON
-        json_start = response.find("[")
-        json_end = response.rfind("]") + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            # Extract what appears to be JSON
-            json_text = response[json_start:json_end]
-            print(f"Extracted JSON (first 100 characters): {json_text[:100]}...")
-            
-            # Try to fix common problems
-            json_text = json_text.replace(";", ",")
-            json_text = json_text.replace("'", '"')
-            
-            # Extreme approach: manually extract each object and rebuild the JSON
-            try:
-                print("Attempting manual object extraction...")
-                # Extract all objects that start with { and end with }
-                objects = re.findall(r'{[^{}]*"title"[^{}]*"description"[^{}]*}', json_text, re.DOTALL)
-                
-                if objects:
-                    print(f"Found {len(objects)} potential objects.")
-                    valid_objects = []
-                    
-                    for i, obj_text in enumerate(objects):
-                        # Clean each object individually
-                        clean_obj = obj_text.replace(";", ",").replace("'", '"')
-                        
-                        # Ensure all keys are in double quotes
-                        clean_obj = re.sub(r'([{,]\s*)([a-zA-Z0-9_]+)(\s*:)', r'\1"\2"\3', clean_obj)
-                        
-                        # Remove extra commas before closing braces
-                        clean_obj = re.sub(r',\s*}', '}', clean_obj)
-                        
-                        try:
-                            # Try to parse the object
-                            obj = json.loads(clean_obj)
-                            
-                            # Check if it has the necessary fields
-                            if "title" in obj and "description" in obj:
-                                valid_objects.append(obj)
-                                print(f"Object {i+1} valid: {obj['title'][:30]}...")
-                        except json.JSONDecodeError as e:
-                            print(f"Object {i+1} invalid: {e}")
-                    
-                    if valid_objects:
-                        print(f"Manual extraction successful! {len(valid_objects)} valid objects.")
-                        return json.dumps(valid_objects)
-            except Exception as e:
-                print(f"Error in manual extraction: {e}")
-            
-            # If manual extraction fails, try to parse the corrected JSON
-            try:
-                incidents = json.loads(json_text)
-                print(f"JSON parsed successfully! Found {len(incidents)} incidents.")
-                clean_response = json.dumps(incidents)
-                return clean_response
-            except json.JSONDecodeError as e:
-                print(f"Error parsing extracted JSON: {e}")
-                
-                # Try to fix the specific error
-                if "Expecting ',' delimiter" in str(e):
-                    error_match = re.search(r'line (\d+) column (\d+)', str(e))
-                    if error_match:
-                        error_line = int(error_match.group(1))
-                        error_col = int(error_match.group(2))
-                        
-                        print(f"Trying to fix specific error on line {error_line}, column {error_col}...")
-                        
-                        # Split the text into lines
-                        lines = json_text.split('\n')
-                        
-                        # Check if the error line is within bounds
-                        if 0 < error_line <= len(lines):
-                            # Adjust for zero-based index
-                            line_idx = error_line - 1
-                            problematic_line = lines[line_idx]
-                            
-                            print(f"Problematic line: {problematic_line}")
-                            
-                            # Insert a comma at the error position
-                            if error_col <= len(problematic_line):
-                                fixed_line = problematic_line[:error_col] + ',' + problematic_line[error_col:]
-                                lines[line_idx] = fixed_line
-                                print(f"Fixed line: {fixed_line}")
-                                
-                                # Rebuild the JSON
-                                fixed_json = '\n'.join(lines)
-                                
-                                try:
-                                    incidents = json.loads(fixed_json)
-                                    print(f"JSON fixed successfully! Found {len(incidents)} incidents.")
-                                    return json.dumps(incidents)
-                                except json.JSONDecodeError as e2:
-                                    print(f"Still error after specific correction: {e2}")
-                # Continue with other approaches
-        
-        # If the direct approach fails, try more robust methods
+        # Parse the response in a single pass, repairing common JSON mistakes
         try:
-            # Try to use the robust JSON parsing method
             incidents = self.robust_json_parse(response)
+            if not isinstance(incidents, list):
+                raise ValueError("The response is not a JSON array")
             print(f"JSON processed successfully! Found {len(incidents)} incidents.")
-            clean_response = json.dumps(incidents)
-            return clean_response
-        except Exception as e:
+        except ValueError as e:
             print(f"Error in robust analysis: {e}")
-            
-            # Try to extract and clean the JSON manually
-            try:
-                clean_response = self.extract_json_from_response(response)
-                clean_response = self.clean_json_string(clean_response)
-                
-                # Check if the JSON is valid
-                if self.is_valid_json(clean_response):
-                    incidents = json.loads(clean_response)
-                    print(f"JSON extracted and cleaned successfully! Found {len(incidents)} incidents.")
-                else:
-                    # Try more aggressive cleaning
-                    clean_response = clean_response.replace(";", ",").replace("'", '"')
-                    if self.is_valid_json(clean_response):
-                        incidents = json.loads(clean_response)
-                        print(f"JSON aggressively cleaned successfully! Found {len(incidents)} incidents.")
-                    else:
-                        # Try the emergency method
-                        try:
-                            incidents = self.emergency_json_fix(clean_response)
-                            if incidents:
-                                clean_response = json.dumps(incidents)
-                                print(f"Emergency extraction successful! Found {len(incidents)} incidents.")
-                            else:
-                                # Last attempt: manual JSON construction
-                                print("Attempting manual JSON construction...")
-                                incidents = self.manual_json_construction(response)
-                                if incidents:
-                                    clean_response = json.dumps(incidents)
-                                    print(f"Manual construction successful! Found {len(incidents)} incidents.")
-                                    return clean_response
-                                else:
-                                    raise ValueError("Emergency method failed")
-                        except Exception as ex:
-                            print(f"All extraction attempts failed: {ex}")
-                            # Return an empty array to indicate failure
-                            return "[]"
-            except Exception as e:
-                print(f"Error extracting JSON: {e}")
-                return "[]"
-        
-        # If we got here, we have a valid JSON in clean_response
-        try:
-            incidents = json.loads(clean_response)
+            # Last attempt: manual JSON construction
+            print("Attempting manual JSON construction...")
+            incidents = self.manual_json_construction(response)
+
+        if incidents:
             # Ensure we have exactly 10 incidents
             if len(incidents) > 10:
                 print(f"The model generated {len(incidents)} incidents. Limiting to 10...")
@@ -268,9 +141,7 @@ class IncidentSeeder(LLMUtils):
                     # Continue with the incidents we already have
                     print("Continuing with the incidents already generated.")
             
-            return clean_response
-        except json.JSONDecodeError as e:
-            print(f"Error processing JSON: {e}")
+            return json.dumps(incidents)
 
         # Try to ask the model for correction
         correction_prompt = (
@@ -356,51 +227,8 @@ def main():
     try:
         incidents = seeder.generate_incidents()
         
-        # Try to extract and process the JSON in a simplified way
-        try:
-            # Extract the JSON from the response
-            json_text = incidents
-            
-            # If the text doesn't start with '[', try to find the beginning of the JSON
-            if not json_text.strip().startswith('['):
-                start = json_text.find('[')
-                if start >= 0:
-                    json_text = json_text[start:]
-            
-            # Clean the JSON to fix simple problems
-            json_text = json_text.replace(";", ",").replace("'", '"')
-            
-            # Fix common problems with commas in descriptions
-            json_text = re.sub(r'("description":\s*"[^"]*)"([^"]*")', r'\1\\\"\2', json_text)
-            
-            # Try to load the JSON
-            incidents_list = json.loads(json_text)
-            print(f"JSON processed successfully! Found {len(incidents_list)} incidents.")
-        except Exception as e:
-            print(f"Error processing JSON: {e}")
-            
-            # Try a simpler approach to extract the JSON
-            try:
-                # Look for a JSON array in the response
-                start = incidents.find("[")
-                end = incidents.rfind("]") + 1
-                if start >= 0 and end > start:
-                    json_text = incidents[start:end]
-                    # Replace single quotes with double quotes
-                    json_text = json_text.replace("'", '"')
-                    # Replace semicolons with commas
-                    json_text = json_text.replace(";", ",")
-                    # Try to load the JSON
-                    incidents_list = json.loads(json_text)
-                    print(f"JSON extracted with alternative method! Found {len(incidents_list)} incidents.")
-                else:
-                    # If unable to extract the JSON, use default incidents
-                    print("Could not find a JSON array in the response. Using default incidents...")
-                    incidents_list = get_default_incidents()
-            except Exception as e2:
-                print(f"Alternative extraction failed: {e2}")
-                print("Using default incidents...")
-                incidents_list = get_default_incidents()
+        incidents_list = seeder.robust_json_parse(incidents)
+        print(f"JSON processed successfully! Found {len(incidents_list)} incidents.")
     except Exception as e:
         print(f"Error generating incidents with the LLM: {e}")
         print("Using default incidents...")
@@ -480,5 +308,78 @@ def main():
 
     print("Incidents Seeder completed.")
 
+async def seed_async(total, concurrency, rate, checkpoint_path):
+    """
+    Generates and sends `total` incidents with concurrent, rate-limited LLM calls.
+
+    Every generated batch and every sent email is recorded in the checkpoint
+    file, so running the command again resumes an interrupted seed.
+
+    Args:
+        total (int): Number of incidents to seed
+        concurrency (int): Maximum number of batches processed at once
+        rate (float): Maximum LLM requests per second
+        checkpoint_path (str): JSON Lines file used to resume the seed
+    """
+    llm_model = LLMModel(use_openai=True)
+    seeder = IncidentSeeder(llm_model)
+    sender = EmailSender(email=os.getenv("SEEDER_MAILER"), password=os.getenv("SEEDER_MAILER_PWD"))
+    checkpoint = SeedCheckpoint(checkpoint_path)
+    limiter = TokenBucket(rate)
+    receiver = os.getenv("SEEDER_INCIDENTS_RECEIVER_EMAIL")
+
+    async def generate(messages):
+        await limiter.acquire()
+        response = await llm_model.agenerate_completion(messages, temperature=0.9)
+        incidents = seeder.robust_json_parse(response)
+        valid = [i for i in incidents if isinstance(i, dict) and i.get("title") and i.get("description")]
+        if not valid:
+            raise ValueError("The model response contained no valid incidents")
+        return valid[:INCIDENTS_PER_BATCH]
+
+    async def process_batch(batch):
+        key = f"batch-{batch}"
+        if key not in checkpoint.generated:
+            incidents = await retry_with_jitter(generate, seeder.build_messages())
+            checkpoint.record_generated(key, incidents)
+            print(f"Batch {batch + 1}: {len(incidents)} incidents generated.")
+
+        # The last batch only sends what is left to reach the total
+        size = min(INCIDENTS_PER_BATCH, total - batch * INCIDENTS_PER_BATCH)
+        for i, incident in enumerate(checkpoint.generated[key][:size]):
+            sent_key = f"{key}-{i}"
+            if sent_key in checkpoint.sent:
+                continue
+            sent = await asyncio.to_thread(
+                sender.send_email,
+                to_address=receiver,
+                subject=incident["title"],
+                body=incident["description"]
+            )
+            if sent:
+                checkpoint.record_sent(sent_key)
+
+    batches = math.ceil(total / INCIDENTS_PER_BATCH)
+    print(f"Seeding {total} incidents in {batches} batches (concurrency={concurrency}, rate={rate}/s)...")
+    results = await run_bounded(range(batches), process_batch, concurrency)
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    for error in failed:
+        print(f"Batch failed: {error}")
+    print(f"Incidents Seeder completed: {len(checkpoint.sent)} emails sent, {len(failed)} batches failed.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the mailbox with generated incidents.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use the concurrent, resumable seeding mode")
+    parser.add_argument("--count", type=int, default=INCIDENTS_PER_BATCH, help="Number of incidents to seed (async mode)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent batches (async mode)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Maximum LLM requests per second (async mode)")
+    parser.add_argument("--checkpoint", default="./db/seed_checkpoints/incidents.jsonl", help="Checkpoint file (async mode)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.use_async:
+        asyncio.run(seed_async(args.count, args.concurrency, args.rate, args.checkpoint))
+    else:
+        main()
@@ -3,6 +3,9 @@ from openai import OpenAI
 from utils.reader import EmailReader
 from utils.sender import EmailSender
 from utils.llm_utils import LLMUtils            # Importing utilities for LLM manipulation
+from utils.seeding import SeedCheckpoint, TokenBucket, retry_with_jitter, run_bounded
+import argparse
+import asyncio
 import json
 import re                                       # Importing regular expressions module
 
@@ -237,10 +240,8 @@ def main():
 
     print("\nEmail processing completed!")
 
-def process_single_email(seeder, email, sender):
-    """Process a single email as fallback"""
-    print(f"Processing individually: {email['from']} - Subject: {email['subject']}")
-    
+def build_single_email_messages(email):
+    """Returns the chat messages asking the model for a reply to a single email."""
     single_email_prompt = (
         f"You are a technical assistant EXPERT of the 'ANIMAL FREEDOM' web platform.\n"
         f"You have received the following problem reported by a user:\n\n"
@@ -256,10 +257,16 @@ def process_single_email(seeder, email, sender):
         f"Return ONLY the response text, without additional formatting."
     )
     
-    single_messages = [
+    return [
         {"role": "system", "content": "You are a technical expert who creates detailed and personalized responses."},
         {"role": "user", "content": single_email_prompt}
     ]
+
+def process_single_email(seeder, email, sender):
+    """Process a single email as fallback"""
+    print(f"Processing individually: {email['from']} - Subject: {email['subject']}")
+    
+    single_messages = build_single_email_messages(email)
     
     try:
         # Use higher temperature for more creative responses
@@ -285,5 +292,83 @@ def process_single_email(seeder, email, sender):
     except Exception as e:
         print(f"Error processing email individually: {e}")
 
+async def seed_async(max_emails, concurrency, rate, checkpoint_path):
+    """
+    Generates and sends replies to unread emails with concurrent, rate-limited
+    LLM calls, one call per email.
+
+    Generated replies and sent emails are recorded in the checkpoint file, so
+    running the command again resumes an interrupted seed.
+
+    Args:
+        max_emails (int): Maximum number of unread threads to read
+        concurrency (int): Maximum number of replies generated at once
+        rate (float): Maximum LLM requests per second
+        checkpoint_path (str): JSON Lines file used to resume the seed
+    """
+    llm_model = LLMModel(use_openai=True)
+    checkpoint = SeedCheckpoint(checkpoint_path)
+    limiter = TokenBucket(rate)
+
+    print("Reading unread emails...")
+    reader = EmailReader()
+    emails = reader.read_emails(max_results=max_emails, query='is:unread')
+    sender = EmailSender()
+    # The Gmail API client is not thread-safe, so replies are sent one at a time
+    send_lock = asyncio.Lock()
+
+    # One reply per subject, as in the batch mode
+    unique_emails = list({email['subject']: email for email in reversed(emails)}.values())
+    print(f"Processing {len(unique_emails)} unique emails (concurrency={concurrency}, rate={rate}/s)...")
+
+    async def generate(messages):
+        await limiter.acquire()
+        return await llm_model.agenerate_completion(messages, temperature=0.8)
+
+    async def process_email(email):
+        key = email['message_id'] or email['id']
+        if key in checkpoint.sent:
+            return
+        if key not in checkpoint.generated:
+            reply = await retry_with_jitter(generate, build_single_email_messages(email))
+            checkpoint.record_generated(key, reply)
+
+        original_msg = {
+            "from_": email['from'],
+            "subject": email['subject'],
+            "headers": {"Message-ID": email['message_id']},
+            "thread_id": email['thread_id']
+        }
+        async with send_lock:
+            result = await asyncio.to_thread(
+                sender.reply_email,
+                original_msg=original_msg,
+                reply_body=checkpoint.generated[key]
+            )
+        if result:
+            checkpoint.record_sent(key)
+        else:
+            print(f"Failed to send response to: {email['from']}")
+
+    results = await run_bounded(unique_emails, process_email, concurrency)
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    for error in failed:
+        print(f"Email failed: {error}")
+    print(f"\nEmail processing completed! {len(checkpoint.sent)} replies sent, {len(failed)} failed.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reply to unread incident emails with generated solutions.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use the concurrent, resumable seeding mode")
+    parser.add_argument("--max-emails", type=int, default=10, help="Maximum unread threads to read (async mode)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent LLM calls (async mode)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Maximum LLM requests per second (async mode)")
+    parser.add_argument("--checkpoint", default="./db/seed_checkpoints/replies.jsonl", help="Checkpoint file (async mode)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.use_async:
+        asyncio.run(seed_async(args.max_emails, args.concurrency, args.rate, args.checkpoint))
+    else:
+        main()
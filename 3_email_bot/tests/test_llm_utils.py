@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_utils import TolerantJSONParser, parse_tolerant_json
+
+INCIDENTS = [{"title": "Login fails", "description": "The login page returns 500."}]
+
+
+def test_brackets_in_prose_before_payload():
+    text = 'As reported in [1] and {note}, here are the incidents: [{"title": "Login fails", "description": "The login page returns 500."}]'
+    assert parse_tolerant_json(text) == INCIDENTS
+
+
+def test_brackets_in_prose_before_malformed_object():
+    text = "See [2] for details.\n```json\n{'category': 'billing', priority: 'high',}\n```"
+    assert parse_tolerant_json(text) == {"category": "billing", "priority": "high"}
+
+
+def test_brackets_in_prose_while_streaming():
+    text = 'Sources [1], [2]: [{"title": "Login fails", "description": "The login page returns 500."}]'
+    for size in (1, 4, 9):
+        parser = TolerantJSONParser()
+        streamed = []
+        for i in range(0, len(text), size):
+            streamed += parser.feed(text[i:i + size])
+        assert streamed == INCIDENTS
+        assert parser.close() == INCIDENTS
+
+
+def test_only_prose_like_brackets_use_the_first():
+    assert parse_tolerant_json("The ids are [1, 2, 3].") == [1, 2, 3]
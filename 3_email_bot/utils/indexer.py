@@ -38,113 +38,124 @@ def main():
         emails = reader.read_emails(max_results=10, query='')
         print(f"Total emails read: {len(emails)}")
         
-        # Group emails by thread_id
-        threads = {}
-        for email in emails:
-            thread_id = email['thread_id']
-            if thread_id not in threads:
-                threads[thread_id] = []
-            threads[thread_id].append(email)
+        index_emails(collection, emails)
         
-        print(f"Total threads: {len(threads)}")
+        print("\nIndexing completed successfully!")
+        
+    except Exception as e:
+        print(f"Error during indexing: {e}")
+
+def index_emails(collection, emails):
+    """
+    Indexes a list of emails as question/answer pairs, grouped by thread.
+    The first email of a thread is the question and the last one is the answer.
+
+    Args:
+        collection: ChromaDB collection to store the documents in
+        emails (list): Emails as returned by EmailReader.read_emails
+    """
+    # Group emails by thread_id
+    threads = {}
+    for email in emails:
+        thread_id = email['thread_id']
+        if thread_id not in threads:
+            threads[thread_id] = []
+        threads[thread_id].append(email)
+    
+    print(f"Total threads: {len(threads)}")
+    
+    # Process each thread
+    for thread_id, thread_emails in threads.items():
+        print(f"\nProcessing thread {thread_id} with {len(thread_emails)} emails")
         
-        # Process each thread
-        for thread_id, thread_emails in threads.items():
-            print(f"\nProcessing thread {thread_id} with {len(thread_emails)} emails")
+        if len(thread_emails) == 0:
+            continue
             
-            if len(thread_emails) == 0:
-                continue
-                
-            # The first email is the question
-            original_email = thread_emails[0]
-            question_id = f"{thread_id}-question"
+        # The first email is the question
+        original_email = thread_emails[0]
+        question_id = f"{thread_id}-question"
+        
+        # Prepare question metadata, ensuring there are no None values
+        question_metadata = {
+            "from": original_email.get("from", ""),
+            "subject": original_email.get("subject", ""),
+            "text": original_email.get("text", ""),
+            "type": "question",
+            "thread_id": thread_id,
+            "message_id": original_email.get("message_id", ""),
+            "has_response": len(thread_emails) > 1
+        }
+        
+        # Ensure no value is None
+        for key, value in list(question_metadata.items()):
+            if value is None:
+                question_metadata[key] = ""
+        
+        # Store the question
+        collection.add(
+            ids=[question_id],
+            documents=[original_email["text"]],
+            metadatas=[question_metadata]
+        )
+        
+        print(f"Question indexed with ID: {question_id}")
+        
+        # If there are more emails, the last one is the answer
+        if len(thread_emails) > 1:
+            response_email = thread_emails[-1]
+            response_id = f"{thread_id}-answer"
             
-            # Prepare question metadata, ensuring there are no None values
-            question_metadata = {
+            # Prepare metadata, ensuring there are no None values
+            response_metadata = {
+                "from": response_email.get("from", ""),
+                "subject": response_email.get("subject", ""),
+                "text": response_email.get("text", ""),
+                "type": "answer",
+                "thread_id": thread_id,
+                "message_id": response_email.get("message_id", ""),
+                "in_reply_to": original_email.get("message_id", ""),
+                "original_question": original_email.get("text", ""),
+                "original_subject": original_email.get("subject", "")
+            }
+            
+            # Ensure no value is None
+            for key, value in list(response_metadata.items()):
+                if value is None:
+                    response_metadata[key] = ""
+            
+            # Store the answer
+            collection.add(
+                ids=[response_id],
+                documents=[response_email["text"]],
+                metadatas=[response_metadata]
+            )
+            
+            print(f"Answer indexed with ID: {response_id}")
+            
+            # Prepare updated question metadata, ensuring there are no None values
+            updated_question_metadata = {
                 "from": original_email.get("from", ""),
                 "subject": original_email.get("subject", ""),
                 "text": original_email.get("text", ""),
                 "type": "question",
                 "thread_id": thread_id,
                 "message_id": original_email.get("message_id", ""),
-                "has_response": len(thread_emails) > 1
+                "has_response": True,
+                "response_id": response_id
             }
             
             # Ensure no value is None
-            for key, value in list(question_metadata.items()):
+            for key, value in list(updated_question_metadata.items()):
                 if value is None:
-                    question_metadata[key] = ""
+                    updated_question_metadata[key] = ""
             
-            # Store the question
-            collection.add(
+            # Update the question to indicate it has an answer
+            collection.update(
                 ids=[question_id],
-                documents=[original_email["text"]],
-                metadatas=[question_metadata]
+                metadatas=[updated_question_metadata]
             )
             
-            print(f"Question indexed with ID: {question_id}")
-            
-            # If there are more emails, the last one is the answer
-            if len(thread_emails) > 1:
-                response_email = thread_emails[-1]
-                response_id = f"{thread_id}-answer"
-                
-                # Prepare metadata, ensuring there are no None values
-                response_metadata = {
-                    "from": response_email.get("from", ""),
-                    "subject": response_email.get("subject", ""),
-                    "text": response_email.get("text", ""),
-                    "type": "answer",
-                    "thread_id": thread_id,
-                    "message_id": response_email.get("message_id", ""),
-                    "in_reply_to": original_email.get("message_id", ""),
-                    "original_question": original_email.get("text", ""),
-                    "original_subject": original_email.get("subject", "")
-                }
-                
-                # Ensure no value is None
-                for key, value in list(response_metadata.items()):
-                    if value is None:
-                        response_metadata[key] = ""
-                
-                # Store the answer
-                collection.add(
-                    ids=[response_id],
-                    documents=[response_email["text"]],
-                    metadatas=[response_metadata]
-                )
-                
-                print(f"Answer indexed with ID: {response_id}")
-                
-                # Prepare updated question metadata, ensuring there are no None values
-                updated_question_metadata = {
-                    "from": original_email.get("from", ""),
-                    "subject": original_email.get("subject", ""),
-                    "text": original_email.get("text", ""),
-                    "type": "question",
-                    "thread_id": thread_id,
-                    "message_id": original_email.get("message_id", ""),
-                    "has_response": True,
-                    "response_id": response_id
-                }
-                
-                # Ensure no value is None
-                for key, value in list(updated_question_metadata.items()):
-                    if value is None:
-                        updated_question_metadata[key] = ""
-                
-                # Update the question to indicate it has an answer
-                collection.update(
-                    ids=[question_id],
-                    metadatas=[updated_question_metadata]
-                )
-                
-                print(f"Question updated with reference to answer: {response_id}")
-        
-        print("\nIndexing completed successfully!")
-        
-    except Exception as e:
-        print(f"Error during indexing: {e}")
+            print(f"Question updated with reference to answer: {response_id}")
 
 def debug_question_answer_pairs():
     """
@@ -1,6 +1,387 @@
 import re
 import json 
 
+# Patterns used by the tolerant parser, compiled once at import time
+_WHITESPACE = re.compile(r'\s*')
+_BARE_TOKEN = re.compile(r'[^\s,:;{}\[\]"\']+')
+_STRING_STOP = {
+    '"': re.compile(r'["\\]'),
+    "'": re.compile(r"['\\]"),
+}
+_FENCE = re.compile(r'```[a-zA-Z]*')
+_ESCAPES = {'"': '"', "'": "'", '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_LITERALS = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+_SEPARATORS = ',;'
+_VALUE_END = ',;:}]'
+_CHUNK_TRIGGERS = ',;}]'
+_OPENING = re.compile(r'[\[{]')
+# What follows the opening bracket of a real payload: a key, a string, a nested
+# container or the closing bracket. "see [1]" or "{note}" in prose do not match.
+_ROOT_START = {
+    '{': re.compile(r'\s*(?:["\'}]|[^\s,:;{}\[\]"\']+\s*[:=])'),
+    '[': re.compile(r'\s*["\'{\[\]]'),
+}
+# A root start that may still match once more text arrives
+_ROOT_PENDING = re.compile(r'\s*[^\s,:;{}\[\]"\']*\s*$')
+
+
+class _Incomplete(Exception):
+    """Raised internally when the buffer ends before a value is complete."""
+
+
+class TolerantJSONParser:
+    """
+    Single-pass JSON parser that repairs common LLM mistakes while scanning.
+
+    Handles markdown fences and text around the JSON (including brackets in
+    the prose before it), trailing commas, missing commas, semicolons used as
+    separators, single-quoted strings, unquoted keys, unescaped quotes inside
+    values and Python literals (True/False/None).
+
+    The parser can also be fed a streamed response chunk by chunk: `feed`
+    returns the elements of a top-level array as soon as each one is complete.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.items = []
+        self._pos = 0
+        self._first_bracket = None
+        self._root = None
+        self._done = False
+        self._result = None
+
+    def parse(self, text):
+        """
+        Parses a complete piece of text in one pass.
+
+        Args:
+            text (str): Text containing potentially malformed JSON
+
+        Returns:
+            dict or list: The parsed JSON value
+
+        Raises:
+            ValueError: If no JSON object or array is found in the text
+        """
+        stripped = text.strip()
+        if stripped[:1] in ('[', '{'):
+            # Well-formed output is common, let the C parser handle it
+            try:
+                self._result = json.loads(stripped)
+                self._root, self._done = stripped[0], True
+                self.buffer = text
+                if isinstance(self._result, list):
+                    self.items = self._result
+                return self._result
+            except json.JSONDecodeError:
+                pass
+        self.buffer += text
+        return self.close()
+
+    def feed(self, chunk):
+        """
+        Appends a chunk of streamed output and parses what can be parsed so far.
+
+        Args:
+            chunk (str): Next piece of the model output
+
+        Returns:
+            list: Top-level array elements completed by this chunk
+        """
+        self.buffer += chunk
+        # Nothing can complete unless the chunk carries a closing delimiter
+        if not any(char in chunk for char in _CHUNK_TRIGGERS):
+            return []
+        return self._advance(final=False)
+
+    def close(self):
+        """
+        Finishes parsing, closing any strings and containers left open.
+
+        Returns:
+            dict or list: The parsed JSON value
+
+        Raises:
+            ValueError: If no JSON object or array is found in the buffer
+        """
+        self._advance(final=True)
+        if self._root is None:
+            raise ValueError("No JSON found in the model response.")
+        return self._result
+
+    def snapshot(self):
+        """
+        Returns a best-effort value for the output received so far, without
+        consuming the buffer. Useful to display partial streamed results.
+        """
+        if self._root == '[':
+            return list(self.items)
+        start, _ = self._find_root(self.buffer, 0, final=True)
+        if start < 0:
+            start = self._first_bracket if self._first_bracket is not None else -1
+        if start < 0:
+            return None
+        return _Scanner(self.buffer, start, final=True).value()
+
+    def _advance(self, final):
+        if self._done:
+            return []
+        if self._root is None:
+            start, self._pos = self._find_root(self.buffer, self._pos, final)
+            if start < 0 and final:
+                # Only prose-like brackets: use the first one
+                start = self._first_bracket if self._first_bracket is not None else -1
+            if start < 0:
+                return []
+            self._root = self.buffer[start]
+            # Array elements are parsed one by one after the opening bracket
+            self._pos = start if self._root == '{' else start + 1
+
+        scanner = _Scanner(self.buffer, self._pos, final)
+        if self._root == '{':
+            # Objects are only returned whole, so parse once enough data arrived
+            try:
+                self._result = scanner.value()
+            except _Incomplete:
+                return []
+            self._done = True
+            return []
+
+        new_items = []
+        try:
+            while True:
+                scanner.skip_separators()
+                if scanner.at_end():
+                    self._done = final
+                    break
+                if scanner.peek() in ']}':
+                    self._done = True
+                    break
+                value = scanner.value()
+                self._pos = scanner.pos
+                self.items.append(value)
+                new_items.append(value)
+        except _Incomplete:
+            pass
+        if self._done:
+            self._result = self.items
+        return new_items
+
+    def _find_root(self, text, start, final):
+        """
+        Finds the bracket that opens the JSON payload, skipping prose and fences.
+
+        Brackets whose content does not look like JSON ("see [1]", "{note}") are
+        skipped, and the first bracket seen is remembered as a fallback.
+
+        Returns:
+            tuple: (root, resume), where root is the position of the opening
+            bracket or -1, and resume is where the next search starts. While
+            streaming, the search stops at a bracket that cannot be judged yet.
+        """
+        for match in _OPENING.finditer(text, start):
+            index = match.start()
+            if self._first_bracket is None:
+                self._first_bracket = index
+            if _ROOT_START[text[index]].match(text, index + 1):
+                return index, index
+            if not final and _ROOT_PENDING.match(text, index + 1):
+                return -1, index
+        return -1, len(text)
+
+
+class _Scanner:
+    """Recursive descent over a text buffer used by TolerantJSONParser."""
+
+    def __init__(self, text, pos, final):
+        self.text = text
+        self.pos = pos
+        self.final = final
+
+    def at_end(self):
+        return self.pos >= len(self.text)
+
+    def peek(self):
+        return self.text[self.pos]
+
+    def skip_whitespace(self):
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()
+        if self.text.startswith('```', self.pos):
+            self.pos = _FENCE.match(self.text, self.pos).end()
+            self.skip_whitespace()
+
+    def skip_separators(self):
+        self.skip_whitespace()
+        while not self.at_end() and self.text[self.pos] in _SEPARATORS:
+            self.pos += 1
+            self.skip_whitespace()
+
+    def end_of_buffer(self):
+        if not self.final:
+            raise _Incomplete()
+
+    def value(self):
+        self.skip_whitespace()
+        if self.at_end():
+            self.end_of_buffer()
+            return None
+        char = self.text[self.pos]
+        if char == '{':
+            return self.object()
+        if char == '[':
+            return self.array()
+        if char in _STRING_STOP:
+            return self.string()
+        return self.bare()
+
+    def object(self):
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip_separators()
+            if self.at_end():
+                self.end_of_buffer()
+                return result
+            char = self.text[self.pos]
+            if char == '}':
+                self.pos += 1
+                return result
+            if char == ']':
+                # Stray closing bracket inside an object, ignore it
+                self.pos += 1
+                continue
+            key = self.string() if char in _STRING_STOP else self.bare(as_key=True)
+            self.skip_whitespace()
+            if self.at_end():
+                self.end_of_buffer()
+                return result
+            if self.text[self.pos] in ':=':
+                self.pos += 1
+            self.skip_whitespace()
+            if self.at_end():
+                self.end_of_buffer()
+                return result
+            if self.text[self.pos] in '}' + _SEPARATORS:
+                result[str(key)] = None
+                continue
+            result[str(key)] = self.value()
+
+    def array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_separators()
+            if self.at_end():
+                self.end_of_buffer()
+                return result
+            char = self.text[self.pos]
+            if char == ']':
+                self.pos += 1
+                return result
+            if char == '}':
+                self.pos += 1
+                continue
+            result.append(self.value())
+
+    def string(self):
+        text = self.text
+        quote = text[self.pos]
+        stop = _STRING_STOP[quote]
+        self.pos += 1
+        parts = []
+        while True:
+            match = stop.search(text, self.pos)
+            if match is None:
+                self.end_of_buffer()
+                parts.append(text[self.pos:])
+                self.pos = len(text)
+                return ''.join(parts)
+            index = match.start()
+            parts.append(text[self.pos:index])
+            if text[index] == '\\':
+                if index + 1 >= len(text):
+                    self.end_of_buffer()
+                    self.pos = len(text)
+                    return ''.join(parts)
+                parts.append(self._escape(index + 1))
+                continue
+            if self._closes_string(index + 1):
+                self.pos = index + 1
+                return ''.join(parts)
+            # Unescaped quote inside the value (e.g. don't, "quoted" word)
+            parts.append(quote)
+            self.pos = index + 1
+
+    def _escape(self, index):
+        text = self.text
+        char = text[index]
+        if char == 'u':
+            digits = text[index + 1:index + 5]
+            if len(digits) < 4 and not self.final:
+                raise _Incomplete()
+            try:
+                self.pos = index + 5
+                return chr(int(digits, 16))
+            except ValueError:
+                pass
+        self.pos = index + 1
+        return _ESCAPES.get(char, '\\' + char)
+
+    def _closes_string(self, index):
+        # A quote only closes the string when followed by a structural character
+        text = self.text
+        after = _WHITESPACE.match(text, index).end()
+        if after >= len(text):
+            if not self.final:
+                raise _Incomplete()
+            return True
+        char = text[after]
+        if char in _VALUE_END:
+            return True
+        # A missing comma before the next key on a new line
+        return char in _STRING_STOP and '\n' in text[index:after]
+
+    def bare(self, as_key=False):
+        match = _BARE_TOKEN.match(self.text, self.pos)
+        if match is None:
+            # Unexpected structural character, skip it
+            self.pos += 1
+            return None
+        if match.end() >= len(self.text):
+            self.end_of_buffer()
+        self.pos = match.end()
+        token = match.group(0)
+        if as_key:
+            return token
+        if token in _LITERALS:
+            return _LITERALS[token]
+        try:
+            return int(token)
+        except ValueError:
+            pass
+        try:
+            return float(token)
+        except ValueError:
+            return token
+
+
+def parse_tolerant_json(text):
+    """
+    Parses potentially malformed JSON produced by an LLM in a single pass.
+
+    Args:
+        text (str): Model output containing a JSON object or array
+
+    Returns:
+        dict or list: The parsed JSON value
+
+    Raises:
+        ValueError: If no JSON object or array is found in the text
+    """
+    return TolerantJSONParser().parse(text)
+
+
 class LLMUtils:
     def clean_json_string(self, json_str):
         """
@@ -46,44 +427,12 @@ class LLMUtils:
         Raises:
             ValueError: If the JSON cannot be parsed
         """
-        # First, try to extract JSON from the response
-        try:
-            json_text = self.extract_json_from_response(text)
-        except ValueError:
-            # If extraction fails, use the complete text
-            json_text = text
-            
-        # Clean the JSON
-        clean_json = self.clean_json_string(json_text)
-        
-        # Try to parse the cleaned JSON
+        # Single pass over the text, repairing common mistakes as it scans
         try:
-            return json.loads(clean_json)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON after initial cleaning: {e}")
-            print(f"Error position: line {e.lineno}, column {e.colno}, char {e.pos}")
-            
-            # Try more aggressive cleaning
-            clean_json = clean_json.replace(";", ",")
-            
-            # Try to fix problems with quotes
-            clean_json = re.sub(r'([^\\])(")(.*?)([^\\])(")(\s*:)', r'\1\2\3\4\5\6', clean_json)
-            
-            # Try to fix problems with commas
-            clean_json = re.sub(r'(}|"])\s*(}|])', r'\1,\2', clean_json)
-            
-            try:
-                return json.loads(clean_json)
-            except json.JSONDecodeError as e2:
-                print(f"Error parsing JSON after aggressive cleaning: {e2}")
-                print(f"Error position: line {e2.lineno}, column {e2.colno}, char {e2.pos}")
-                
-                # Try to manually extract JSON objects
-                try:
-                    return self.manual_json_extraction(json_text)
-                except Exception as e3:
-                    print(f"Manual extraction failed: {e3}")
-                    raise ValueError(f"Could not parse JSON: {e2}")
+            return parse_tolerant_json(text)
+        except ValueError as e:
+            print(f"Error parsing JSON: {e}")
+            raise ValueError(f"Could not parse JSON: {e}")
                     
     def manual_json_extraction(self, text):
         """
@@ -1,5 +1,5 @@
 import os
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -27,6 +27,9 @@ class LLMModel:
             # Use local Ollama
             self.client = OpenAI(base_url="http://localhost:11434/v1", api_key="ollama")
             self.model_name = "llama3.2:1b"
+
+        # Created on first use by the async seeding mode
+        self.async_client = None
         
     def generate_completion(self, messages, temperature=0.7):
         """
@@ -50,3 +53,27 @@ class LLMModel:
             error_msg = f"Error generating response: {str(e)}"
             print(error_msg)  # Log the error
             return error_msg
+
+    async def agenerate_completion(self, messages, temperature=0.7):
+        """
+        Asynchronous version of generate_completion used by the async seeders.
+
+        Unlike generate_completion, errors are raised instead of returned as
+        text, so callers can retry them.
+
+        Args:
+            messages (list): List of message dictionaries with 'role' and 'content' keys.
+            temperature (float, optional): Temperature for response generation. Defaults to 0.7.
+
+        Returns:
+            str: The generated completion text.
+        """
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url)
+
+        response = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
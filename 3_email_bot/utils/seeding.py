@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Asynchronous token-bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` per second up to `capacity`,
+    so short bursts are allowed while the long-term rate stays bounded.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float, optional): Maximum burst size. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    async def acquire(self, tokens=1):
+        """Waits until `tokens` tokens are available and consumes them."""
+        if self._lock is None:
+            # Created lazily so it belongs to the running event loop
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+async def retry_with_jitter(func, *args, retries=4, base_delay=1.0, max_delay=30.0, **kwargs):
+    """
+    Awaits `func(*args, **kwargs)`, retrying failures with exponential backoff
+    and full jitter.
+
+    Args:
+        func (callable): Coroutine function to call
+        retries (int, optional): Number of retries after the first attempt. Defaults to 4.
+        base_delay (float, optional): Backoff base in seconds. Defaults to 1.0.
+        max_delay (float, optional): Upper bound for a single wait. Defaults to 30.0.
+
+    Returns:
+        The result of the first successful call
+
+    Raises:
+        Exception: The last error once all retries are exhausted
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            print(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+
+async def run_bounded(items, worker, concurrency):
+    """
+    Runs `worker(item)` for every item with at most `concurrency` running at once.
+
+    Returns:
+        list: Results in input order; failed items hold the raised exception
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await worker(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+class SeedCheckpoint:
+    """
+    Append-only JSON Lines file recording generated and sent items, so an
+    interrupted seed resumes where it stopped instead of regenerating.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.generated = {}
+        self.sent = set()
+        self._needs_newline = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._needs_newline = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted run
+                    continue
+                if record.get("event") == "generated":
+                    self.generated[record["key"]] = record["item"]
+                elif record.get("event") == "sent":
+                    self.sent.add(record["key"])
+        print(f"Checkpoint loaded: {len(self.generated)} generated, {len(self.sent)} sent.")
+
+    def _append(self, record):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._needs_newline:
+                f.write("\n")
+                self._needs_newline = False
+            f.write(json.dumps(record) + "\n")
+
+    def record_generated(self, key, item):
+        """Stores a generated item under `key`."""
+        self.generated[key] = item
+        self._append({"event": "generated", "key": key, "item": item})
+
+    def record_sent(self, key):
+        """Marks the item stored under `key` as sent."""
+        self.sent.add(key)
+        self._append({"event": "sent", "key": key})
@@ -29,8 +29,10 @@ class EmailSender:
                 server.starttls()
                 server.login(self.email, self.password)
                 server.send_message(msg)
+            return True
         except Exception as e:
             print("Error sending email:", e)
+            return False
 
     def reply_email(self, original_msg, reply_body):
         msg = MIMEMultipart()
@@ -1,23 +1,170 @@
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI, OpenAI
+import asyncio
+import contextvars
 import httpx
+import json
 import os
+import requests
 import sys
+import threading
+import time
 import traceback
 from dotenv import load_dotenv
 from utils.google_calendar import GoogleCalendar
 from utils.google_gmail import GoogleGmail
 from utils.onboarding import Onboarding
 from utils.weather import Weather
+from utils.tool_cache import ToolCache
+from utils.context import ContextBudget
 from utils.logger import agent_logger
 
-class Agent:
-    def __init__(self):
-        """Initialize the OpenAI client with minimal error handling."""
-        load_dotenv()
-        
-        # Track tool usage
-        self.used_tools = []
-        
+# Loaded once per process instead of on every request
+load_dotenv()
+
+# Maximum number of model turns with tool calls before giving up
+MAX_TOOL_ROUNDS = 5
+
+SYSTEM_PROMPT = """You are an advanced AI agent with four specialized tools. 
+    Your primary objective is to understand the user's intent and provide the most relevant information using these tools:
+    1. Personal Calendar Tool
+    - Provides comprehensive event and schedule information
+    - Can retrieve past and upcoming events
+    - Useful for scheduling, planning, and time management
+
+    2. Email Reader Tool
+    - Accesses and summarizes recent unread emails
+    - Extracts key information from email communications
+    - Lists senders, subjects and snippets; fetch a full body with email_body only when needed
+    - Helps users stay informed about their correspondence
+
+    3. Onboarding Information Tool
+    - Retrieves and presents organizational onboarding documents
+    - Offers insights into company policies, procedures, and guidelines
+    - Supports new team members in understanding their work environment
+
+    4. Weather Forecasting Tool
+    - Delivers current and upcoming weather information
+    - Provides detailed meteorological data for planning
+    - Helps users prepare for various weather conditions
+
+    Interaction Guidelines:
+    - Call the tools through function calling
+    - When a question needs several tools, request all of them in the same turn
+    - When you have a complete answer, reply with the answer only
+
+    Special Instructions:
+    - Be concise and direct in your responses
+    - Focus on providing the most relevant information
+    - Always aim to fully address the user's query"""
+
+# Tool declarations for OpenAI function calling
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "calendar",
+            "description": "Returns the user's upcoming Google Calendar events.",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "emails",
+            "description": "Returns the user's recent unread Gmail emails: sender, subject, date and a short snippet, without bodies.",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "email_body",
+            "description": "Returns the full body of one email. Use only when the snippet is not enough to answer.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "description": "The email 'id' returned by the emails tool"}
+                },
+                "required": ["id"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "onboarding",
+            "description": "Searches the organization's onboarding documents (stages, activities, policies).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "What to look for in the onboarding documents"}
+                },
+                "required": ["query"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "weather",
+            "description": "Returns the hourly weather forecast for the next 24 hours.",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+]
+
+class AgentFactory:
+    """
+    Process-wide holder of the clients shared by every Agent.
+
+    The OpenAI client keeps a pooled HTTP transport with keep-alive, so warm TLS
+    connections are reused across requests, tools share one HTTP session and
+    tool results are cached across requests. Agents created by the factory
+    only hold per-request state.
+    """
+
+    def __init__(self, max_connections=20, keepalive_expiry=30.0):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+        # Shared HTTP session for tools calling plain HTTP APIs (weather)
+        self.http_session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.http_session.mount("https://", adapter)
+        self.http_session.mount("http://", adapter)
+
+        # Weather keeps met.no Expires/Last-Modified state, so it is shared too
+        self.weather = Weather(session=self.http_session)
+        self.tool_cache = ToolCache()
+        # Runs the tool calls of a model turn concurrently
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("AGENT_TOOL_WORKERS", "16")),
+            thread_name_prefix="agent-tool"
+        )
+
+    @property
+    def client(self):
+        """OpenAI client created on first use and shared by all agents."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client used by the ASGI server, created on first use."""
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = self._create_client(asynchronous=True)
+        return self._async_client
+
+    def _create_client(self, asynchronous=False):
         openai_key = os.getenv("OPENAI_API_KEY")
         if not openai_key:
             # Log initialization error
@@ -29,10 +176,25 @@ class Agent:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY in .env file.")
 
         try:
-            self.client = OpenAI(
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            timeout = httpx.Timeout(60.0, connect=5.0)
+            if asynchronous:
+                return AsyncOpenAI(
+                    api_key=openai_key,
+                    http_client=httpx.AsyncClient(
+                        transport=httpx.AsyncHTTPTransport(retries=3, limits=limits),
+                        timeout=timeout
+                    )
+                )
+            return OpenAI(
                 api_key=openai_key,
                 http_client=httpx.Client(
-                    transport=httpx.HTTPTransport(retries=3)
+                    transport=httpx.HTTPTransport(retries=3, limits=limits),
+                    timeout=timeout
                 )
             )
         except Exception as e:
@@ -43,12 +205,47 @@ class Agent:
                 context={'api_key_present': bool(openai_key)}
             )
             raise
+
+    def create(self, user_id="default"):
+        """Returns a new Agent for one request, backed by the shared clients."""
+        return Agent(factory=self, user_id=user_id)
+
+class Agent:
+    def __init__(self, factory=None, user_id="default"):
+        """
+        Initialize the per-request agent state.
+
+        Args:
+            factory (AgentFactory, optional): Source of the shared clients. Defaults to the process-wide one.
+            user_id (str, optional): User the request belongs to, used to key cached tool results.
+        """
+        # Track tool usage
+        self.used_tools = []
+        self.user_id = user_id
+
+        factory = factory or agent_factory
+        self.factory = factory
+        self.http_session = factory.http_session
+        self.tool_cache = factory.tool_cache
+        self.weather_service = factory.weather
+        self.tool_executor = factory.tool_executor
+        # Keeps tool results and the prompt within a token budget
+        self.context = ContextBudget()
+
+    @property
+    def client(self):
+        return self.factory.client
+
+    @property
+    def async_client(self):
+        return self.factory.async_client
         
     # Tool: Google Calendar
     def calendar(self):
         try:
-            calendar = GoogleCalendar()
-            events = calendar.consult() 
+            events = self.tool_cache.get_or_call(
+                'calendar', self.user_id, lambda: GoogleCalendar().consult()
+            )
             self.used_tools.append('calendar')
             return events
         except Exception as e:
@@ -61,8 +258,9 @@ class Agent:
     # Tool: Google gmail
     def emails(self):
         try:
-            reader = GoogleGmail() 
-            emails = reader.read_emails(max_results=10, query='is:unread')
+            emails = self.tool_cache.get_or_call(
+                'emails', self.user_id, lambda: GoogleGmail().read_email_summaries(max_results=10, query='is:unread')
+            )
             self.used_tools.append('emails')
             return emails
         except Exception as e:
@@ -72,6 +270,22 @@ class Agent:
             )
             return f"Error accessing emails: {str(e)}"
 
+    # Tool: Google gmail message body, fetched only on demand
+    def email_body(self, message_id):
+        try:
+            body = self.tool_cache.get_or_call(
+                'email_body', self.user_id, lambda message_id: GoogleGmail().get_email_body(message_id), message_id
+            )
+            self.used_tools.append('email_body')
+            return body
+        except Exception as e:
+            agent_logger.log_error(
+                error_type='email_tool_error', 
+                error_message=str(e),
+                context={'message_id': message_id}
+            )
+            return f"Error accessing email body: {str(e)}"
+
     # Tool: Onboarding Document
     def onboarding(self, query=None):
         try:
@@ -109,9 +323,11 @@ class Agent:
     # Tool: Weather API 
     def weather(self):
         try:
-            weather = Weather()
-            forecast = weather.get_forecast()
-            processed_forecast = weather.process_forecast(forecast, hours=24)
+            # Never keep the forecast past the Expires time given by met.no
+            processed_forecast = self.tool_cache.get_or_call(
+                'weather', self.user_id, self._forecast,
+                max_ttl=self.weather_service.seconds_until_expiry
+            )
             self.used_tools.append('weather')
             return processed_forecast
         except Exception as e:
@@ -121,14 +337,43 @@ class Agent:
             )
             return f"Error accessing weather information: {str(e)}"
 
+    def _forecast(self):
+        forecast = self.weather_service.get_forecast()
+        return self.weather_service.process_forecast(forecast, hours=24)
+
     # Function to call GPT model with messages
-    def call_gpt(self, messages):
+    def call_gpt(self, messages, tools=None):
+        """Calls GPT-4o and returns the assistant message, which may contain tool calls."""
         try:
+            kwargs = {"tools": tools, "tool_choice": "auto"} if tools else {}
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-4o",   
-                messages=messages
+                messages=messages,
+                **kwargs
+            )
+            agent_logger.observe_gpt_latency("gpt-4o", time.perf_counter() - started)
+            return response.choices[0].message
+        except Exception as e:
+            agent_logger.log_error(
+                error_type='gpt_call_error', 
+                error_message=str(e),
+                context={'model': 'gpt-4o'}
             )
-            return response.choices[0].message.content
+            raise
+
+    async def acall_gpt(self, messages, tools=None):
+        """Async version of call_gpt, used by the ASGI server."""
+        try:
+            kwargs = {"tools": tools, "tool_choice": "auto"} if tools else {}
+            started = time.perf_counter()
+            response = await self.async_client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                **kwargs
+            )
+            agent_logger.observe_gpt_latency("gpt-4o", time.perf_counter() - started)
+            return response.choices[0].message
         except Exception as e:
             agent_logger.log_error(
                 error_type='gpt_call_error', 
@@ -137,78 +382,171 @@ class Agent:
             )
             raise
 
+    def run_tool(self, name, arguments):
+        """
+        Runs one tool requested by the model.
+
+        Args:
+            name (str): Tool name, as declared in TOOLS
+            arguments (str): JSON-encoded arguments generated by the model
+
+        Returns:
+            str: Tool result serialized for a 'tool' message, within the tool token budget
+        """
+        try:
+            args = json.loads(arguments or "{}")
+        except json.JSONDecodeError:
+            args = {}
+
+        tools = {
+            "calendar": self.calendar,
+            "emails": self.emails,
+            "email_body": lambda: self.email_body(args.get("id")),
+            "onboarding": lambda: self.onboarding(args.get("query")),
+            "weather": self.weather,
+        }
+        if name not in tools:
+            return f"Unknown tool: {name}"
+
+        started = time.perf_counter()
+        result = tools[name]()
+        agent_logger.observe_tool_latency(name, time.perf_counter() - started)
+
+        # Bulky results (email lists, hourly forecasts) are truncated to the tool budget
+        return self.context.compact_tool_result(result)
+
+    def run_tools(self, tool_calls):
+        """Runs the tool calls of one model turn concurrently, keeping their order."""
+        if len(tool_calls) == 1:
+            call = tool_calls[0]
+            return [self.run_tool(call.function.name, call.function.arguments)]
+        # Each worker runs in a copy of the request context (request id for metrics)
+        futures = [
+            self.tool_executor.submit(
+                contextvars.copy_context().run, self.run_tool, call.function.name, call.function.arguments
+            )
+            for call in tool_calls
+        ]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def assistant_message(message):
+        """Converts an assistant message with tool calls into a request message."""
+        return {
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {"name": call.function.name, "arguments": call.function.arguments}
+                }
+                for call in message.tool_calls
+            ]
+        }
+
+    @staticmethod
+    def final_answer(response):
+        """Strips the legacy FINAL: prefix the model sometimes still adds."""
+        return response.replace("FINAL:", "", 1).strip() if response.startswith("FINAL:") else response
+
     def call(self, user_question):
         messages = [
-            {"role": "system", "content": """You are an advanced AI agent with four specialized tools. 
-                Your primary objective is to understand the user's intent and provide the most relevant information using these tools:
-                1. Personal Calendar Tool
-                - Provides comprehensive event and schedule information
-                - Can retrieve past and upcoming events
-                - Useful for scheduling, planning, and time management
-
-                2. Email Reader Tool
-                - Accesses and summarizes recent unread emails
-                - Extracts key information from email communications
-                - Helps users stay informed about their correspondence
-
-                3. Onboarding Information Tool
-                - Retrieves and presents organizational onboarding documents
-                - Offers insights into company policies, procedures, and guidelines
-                - Supports new team members in understanding their work environment
-
-                4. Weather Forecasting Tool
-                - Delivers current and upcoming weather information
-                - Provides detailed meteorological data for planning
-                - Helps users prepare for various weather conditions
-
-                Interaction Guidelines:
-                - If a tool is needed, use the specific ACTION prefix
-                - For Calendar: 'ACTION: CALENDAR'
-                - For Emails: 'ACTION: EMAILS'
-                - For Onboarding: 'ACTION: ONBOARDING <QUERY>'
-                - For Weather: 'ACTION: WEATHER'
-                - When you have a complete answer, use 'FINAL: <answer>'
-
-                Special Instructions:
-                - Be concise and direct in your responses
-                - Focus on providing the most relevant information
-                - If a request involves multiple tools, use them strategically
-                - Always aim to fully address the user's query"""},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_question}
         ]
 
-        while True:
-            try:
-                response = self.call_gpt(messages)
-                print("\nAgent:", response)
-                messages.append({"role": "assistant", "content": response})
-
-                if response.startswith("FINAL:"):
-                    return response.replace("FINAL:", "").strip()
-                elif response.startswith("ACTION: CALENDAR"):
-                    data = response.replace("ACTION: CALENDAR", "").strip()
-                    resultado = self.calendar()
-                    messages.append({"role": "user", "content": f"RESULT: {resultado}"})
-                elif response.startswith("ACTION: EMAILS"):
-                    topic = response.replace("ACTION: EMAILS", "").strip()
-                    resultado = self.emails()
-                    messages.append({"role": "user", "content": f"RESULT: {resultado}"})
-                elif response.startswith("ACTION: ONBOARDING"):
-                    # Extract query for semantic search
-                    query = response.replace("ACTION: ONBOARDING", "").strip()
-                    print(f"Extracted query: {query}")  # Debug print
-                    resultado = self.onboarding(query)
-                    messages.append({"role": "user", "content": f"RESULT: {resultado}"})
-                elif response.startswith("ACTION: WEATHER"):
-                    topic = response.replace("ACTION: WEATHER", "").strip()
-                    resultado = self.weather()
-                    messages.append({"role": "user", "content": f"RESULT: {resultado}"})
-                else:
-                    return "The agent doesn't know what to do. Ending."
-            except Exception as e:
-                agent_logger.log_error(
-                    error_type='agent_call_error', 
-                    error_message=str(e),
-                    context={'user_question': user_question}
-                )
-                return f"An error occurred: {str(e)}"
+        try:
+            for _ in range(MAX_TOOL_ROUNDS + 1):
+                message = self.call_gpt(self.context.fit(messages), tools=TOOLS)
+
+                if not message.tool_calls:
+                    response = message.content or ""
+                    print("\nAgent:", response)
+                    return self.final_answer(response)
+
+                print("\nAgent tool calls:", [(c.function.name, c.function.arguments) for c in message.tool_calls])
+                messages.append(self.assistant_message(message))
+
+                # All tools requested in this turn run at the same time
+                results = self.run_tools(message.tool_calls)
+                for call, result in zip(message.tool_calls, results):
+                    messages.append({"role": "tool", "tool_call_id": call.id, "content": result})
+
+            return "The agent doesn't know what to do. Ending."
+        except Exception as e:
+            agent_logger.log_error(
+                error_type='agent_call_error', 
+                error_message=str(e),
+                context={'user_question': user_question}
+            )
+            return f"An error occurred: {str(e)}"
+
+    async def astream(self, user_question):
+        """
+        Answers a question asynchronously, yielding progress events.
+
+        GPT calls use the async OpenAI client. Tools are blocking, so they run
+        on the factory's thread pool without holding the event loop.
+
+        Args:
+            user_question (str): The user's question
+
+        Yields:
+            dict: Events with an "event" key: "tool_started", "tool_finished" or "final"
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_question}
+        ]
+        loop = asyncio.get_running_loop()
+
+        async def run(call):
+            started = time.perf_counter()
+            result = await loop.run_in_executor(
+                self.tool_executor, contextvars.copy_context().run,
+                self.run_tool, call.function.name, call.function.arguments
+            )
+            return call, result, time.perf_counter() - started
+
+        try:
+            for _ in range(MAX_TOOL_ROUNDS + 1):
+                message = await self.acall_gpt(self.context.fit(messages), tools=TOOLS)
+
+                if not message.tool_calls:
+                    yield {"event": "final", "answer": self.final_answer(message.content or "")}
+                    return
+
+                messages.append(self.assistant_message(message))
+                for call in message.tool_calls:
+                    yield {"event": "tool_started", "id": call.id, "tool": call.function.name, "arguments": call.function.arguments}
+
+                # Report each tool as soon as it finishes, then send results in request order
+                results = {}
+                for finished in asyncio.as_completed([run(call) for call in message.tool_calls]):
+                    call, result, elapsed = await finished
+                    results[call.id] = result
+                    yield {"event": "tool_finished", "id": call.id, "tool": call.function.name, "elapsed_ms": round(elapsed * 1000)}
+
+                for call in message.tool_calls:
+                    messages.append({"role": "tool", "tool_call_id": call.id, "content": results[call.id]})
+
+            yield {"event": "final", "answer": "The agent doesn't know what to do. Ending."}
+        except Exception as e:
+            agent_logger.log_error(
+                error_type='agent_call_error', 
+                error_message=str(e),
+                context={'user_question': user_question}
+            )
+            yield {"event": "final", "answer": f"An error occurred: {str(e)}"}
+
+    async def acall(self, user_question):
+        """Async version of call, returning only the final answer."""
+        answer = None
+        async for event in self.astream(user_question):
+            if event["event"] == "final":
+                answer = event["answer"]
+        return answer
+
+# Process-wide factory shared by all requests
+agent_factory = AgentFactory()
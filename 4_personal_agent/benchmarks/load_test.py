@@ -0,0 +1,295 @@
+"""
+Load-test harness for the personal agent.
+
+Serves index.py with uvicorn against a local OpenAI-compatible stub that
+returns scripted tool calls, and fake calendar, Gmail, onboarding and weather
+backends with configurable latency. Drives POST / with a fixed concurrency
+and reports throughput and p50/p95/p99 latency per tool path (the set of tools
+used by a request).
+
+Nothing leaves the machine: the OpenAI client is pointed at the stub through
+OPENAI_BASE_URL, met.no requests go to the stub's /weather route and the
+Google/onboarding classes used by the agent are replaced by fakes.
+
+Usage:
+    python benchmarks/load_test.py --requests 500 --concurrency 50
+    python benchmarks/load_test.py --concurrency 100 --tool-workers 32 --llm-latency 0.8
+    python benchmarks/load_test.py --stream --cache
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Question -> tools the stub model asks for in its first turn
+SCENARIOS = {
+    "direct": ("Olá, tudo bem?", []),
+    "calendar": ("Quais são meus próximos compromissos?", ["calendar"]),
+    "emails": ("Tenho emails não lidos importantes?", ["emails"]),
+    "weather": ("Vai chover amanhã?", ["weather"]),
+    "onboarding": ("Quais são as etapas de familiarização do onboarding?", ["onboarding"]),
+    "calendar+weather": ("Como está minha agenda e o clima para amanhã?", ["calendar", "weather"]),
+    "all": ("Resuma minha agenda, meus emails e o clima.", ["calendar", "emails", "weather"]),
+}
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentiles(values):
+    values = sorted(values)
+
+    def pick(p):
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+    return len(values), pick(50), pick(95), pick(99)
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible stub and met.no stand-in
+# ---------------------------------------------------------------------------
+
+def build_stub_app(llm_latency, weather_latency, jitter):
+    stub = FastAPI()
+    tools_by_question = {question: tools for question, tools in SCENARIOS.values()}
+
+    async def wait(latency):
+        if latency:
+            await asyncio.sleep(latency * random.uniform(1 - jitter, 1 + jitter))
+
+    def completion(message):
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await wait(llm_latency)
+
+        messages = body["messages"]
+        question = next(m["content"] for m in messages if m["role"] == "user")
+        tools = tools_by_question.get(question, [])
+
+        # First turn asks for every scripted tool at once, the next one answers
+        if tools and not any(m["role"] == "tool" for m in messages):
+            calls = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {
+                        "name": tool,
+                        "arguments": json.dumps({"query": "familiarização"} if tool == "onboarding" else {}),
+                    },
+                }
+                for tool in tools
+            ]
+            return completion({"role": "assistant", "content": None, "tool_calls": calls})
+
+        return completion({"role": "assistant", "content": f"Resposta simulada para: {question}"})
+
+    @stub.get("/weather")
+    async def weather():
+        await wait(weather_latency)
+        timeseries = [
+            {
+                "time": f"2026-01-01T{hour:02d}:00:00Z",
+                "data": {
+                    "instant": {"details": {"air_temperature": 20 + hour % 5, "wind_speed": 3.2, "relative_humidity": 70}},
+                    "next_1_hours": {"summary": {"symbol_code": "cloudy"}, "details": {"precipitation_amount": 0.1}},
+                },
+            }
+            for hour in range(24)
+        ]
+        return {"properties": {"timeseries": timeseries}}
+
+    return stub
+
+
+# ---------------------------------------------------------------------------
+# Fake Google and onboarding backends
+# ---------------------------------------------------------------------------
+
+def build_fakes(calendar_latency, gmail_latency, onboarding_latency):
+    class FakeCalendar:
+        def consult(self):
+            time.sleep(calendar_latency)
+            return [{"summary": f"Reunião {i}", "start": f"2026-01-0{i + 1}T14:00:00-03:00"} for i in range(5)]
+
+    class FakeGmail:
+        def read_email_summaries(self, max_results=10, query='is:unread'):
+            time.sleep(gmail_latency)
+            return [
+                {"from": f"pessoa{i}@example.com", "subject": f"Assunto {i}", "date": None,
+                 "snippet": "Prévia da mensagem", "thread_id": f"t{i}", "message_id": None, "id": f"m{i}"}
+                for i in range(max_results)
+            ]
+
+        def get_email_body(self, message_id):
+            time.sleep(gmail_latency)
+            return f"Corpo da mensagem {message_id}"
+
+    class FakeOnboarding:
+        def semantic_search(self, query, n_results=3):
+            time.sleep(onboarding_latency)
+            return f"# Resultados da Busca de Onboarding\n\n## Resultado 1\n{query}"
+
+        def read_as_markdown(self):
+            return "# Resumo do Processo de Onboarding"
+
+    return FakeCalendar, FakeGmail, FakeOnboarding
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn in a daemon thread."""
+
+    def __init__(self, asgi_app, port):
+        self.server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+async def run_load(url, n_requests, concurrency, stream, seed):
+    rng = random.Random(seed)
+    plan = [rng.choice(list(SCENARIOS)) for _ in range(n_requests)]
+    latencies, errors = {}, 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120.0) as client:
+
+        async def one(i, scenario):
+            nonlocal errors
+            question = SCENARIOS[scenario][0]
+            payload = {"prompt": question, "user_id": f"user-{i % 50}", "stream": stream}
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    if stream:
+                        final = None
+                        async with client.stream("POST", "/", json=payload) as resp:
+                            event = None
+                            async for line in resp.aiter_lines():
+                                if line.startswith("event: "):
+                                    event = line[7:]
+                                elif line.startswith("data: ") and event == "final":
+                                    final = json.loads(line[6:])
+                        data = final or {}
+                    else:
+                        resp = await client.post("/", json=payload)
+                        data = resp.json()
+                    elapsed = time.perf_counter() - start
+                    if data.get("status") != "success":
+                        errors += 1
+                        return
+                except Exception:
+                    errors += 1
+                    return
+            path = "+".join(sorted(set(data.get("tools_used") or []))) or "no tools"
+            latencies.setdefault(path, []).append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i, scenario) for i, scenario in enumerate(plan)))
+        return latencies, errors, time.perf_counter() - started
+
+
+def print_report(latencies, errors, elapsed, args):
+    done = sum(len(values) for values in latencies.values())
+    print(f"\n=== CONCURRENCY {args.concurrency} | TOOL WORKERS {args.tool_workers} | "
+          f"{'SSE' if args.stream else 'JSON'} | CACHE {'on' if args.cache else 'off'} ===")
+    print(f"Requests: {done} ok, {errors} errors in {elapsed:.2f}s ({done / elapsed:.1f} req/s)")
+    print(f"{'tool path':<36}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for path in sorted(latencies):
+        count, p50, p95, p99 = percentiles(latencies[path])
+        print(f"{path:<36}{count:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    if done:
+        count, p50, p95, p99 = percentiles([v for values in latencies.values() for v in values])
+        print(f"{'all':<36}{count:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the personal agent against stubbed LLM and tools.")
+    parser.add_argument("--requests", type=int, default=300, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at the same time")
+    parser.add_argument("--tool-workers", type=int, default=16, help="Size of the agent's tool thread pool")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="Simulated seconds per GPT call")
+    parser.add_argument("--calendar-latency", type=float, default=0.15, help="Simulated seconds per calendar call")
+    parser.add_argument("--gmail-latency", type=float, default=0.25, help="Simulated seconds per Gmail call")
+    parser.add_argument("--weather-latency", type=float, default=0.1, help="Simulated seconds per met.no call")
+    parser.add_argument("--onboarding-latency", type=float, default=0.05, help="Simulated seconds per onboarding search")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative latency jitter (0.2 = +/-20%%)")
+    parser.add_argument("--stream", action="store_true", help="Use the SSE response instead of JSON")
+    parser.add_argument("--cache", action="store_true", help="Keep the tool result cache enabled")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the request mix")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent output")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    stub_port, agent_port = free_port(), free_port()
+
+    # Must be set before the agent modules are imported
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{stub_port}/v1"
+    os.environ["AGENT_TOOL_WORKERS"] = str(args.tool_workers)
+    if not args.cache:
+        for tool in ("CALENDAR", "EMAILS", "EMAIL_BODY", "WEATHER"):
+            os.environ[f"TOOL_CACHE_TTL_{tool}"] = "0"
+
+    import app
+    from utils.weather import Weather
+
+    app.GoogleCalendar, app.GoogleGmail, app.Onboarding = build_fakes(
+        args.calendar_latency, args.gmail_latency, args.onboarding_latency
+    )
+    Weather.BASE_URL = f"http://127.0.0.1:{stub_port}/weather"
+
+    import index
+
+    stub = build_stub_app(args.llm_latency, args.weather_latency, args.jitter)
+    with BackgroundServer(stub, stub_port), BackgroundServer(index.app, agent_port):
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            latencies, errors, elapsed = asyncio.run(run_load(
+                f"http://127.0.0.1:{agent_port}", args.requests, args.concurrency, args.stream, args.seed
+            ))
+    print_report(latencies, errors, elapsed, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,16 @@
-from flask import Flask, request, jsonify
+from fastapi import FastAPI, Request
 
-app = Flask(__name__)
+app = FastAPI()
 
-@app.route('/', methods=['GET', 'POST'])
-def simple_request():
-    if request.method == 'GET':
-        return jsonify({"message": "Hello, this is a simple GET request handler!"})
-    
-    if request.method == 'POST':
-        data = request.json
-        return jsonify({"received": data, "status": "success"})
+@app.get('/')
+async def simple_get():
+    return {"message": "Hello, this is a simple GET request handler!"}
+
+@app.post('/')
+async def simple_post(request: Request):
+    data = await request.json()
+    return {"received": data, "status": "success"}
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    import uvicorn
+    uvicorn.run("simple_http_server:app", port=5000, reload=True)
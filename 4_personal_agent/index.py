@@ -1,90 +1,142 @@
-from app import Agent
-from flask import Flask, request, jsonify
+from app import agent_factory
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from utils.logger import agent_logger
+import json
+import time
 import traceback
+import uuid
 from datetime import datetime
 
-app = Flask(__name__)
+@asynccontextmanager
+async def lifespan(app):
+    # Start Prometheus metrics server
+    agent_logger.start_prometheus_server()
+    yield
+
+app = FastAPI(title="Personal Agent", lifespan=lifespan)
+
+def sse(event, data):
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def wants_stream(request, data):
+    """Clients opt into SSE with Accept: text/event-stream or "stream": true."""
+    return bool(data.get("stream")) or "text/event-stream" in request.headers.get("accept", "")
+
+@app.get('/')
+async def simple_get():
+    # Track request metrics
+    agent_logger.track_request('GET', '/')
+    return {"message": "Hello, this is a simple GET request handler!"}
 
-@app.route('/', methods=['GET', 'POST'])
-def simple_request():
+@app.post('/')
+async def simple_request(request: Request):
     # Track request metrics
-    agent_logger.track_request(request.method, '/')
+    agent_logger.track_request('POST', '/')
+    started = time.perf_counter()
+    agent_logger.set_request_id(request.headers.get("X-Request-Id") or uuid.uuid4().hex[:16])
 
-    if request.method == 'GET':
-        return jsonify({"message": "Hello, this is a simple GET request handler!"})
-    
-    if request.method == 'POST':
+    try:
+        # Ensure request data is not None
         try:
-            # Ensure request data is not None
-            data = request.json or {}
-            
-            # Extract question with MAXIMUM FALLBACK
-            user_question = (
-                data.get("prompt") or 
-                data.get("question") or 
-                data.get("text") or 
-                data.get("message") or 
-                "Pergunta padrão de fallback"
+            data = await request.json() or {}
+        except ValueError:
+            data = {}
+
+        # Extract question with MAXIMUM FALLBACK
+        user_question = (
+            data.get("prompt") or
+            data.get("question") or
+            data.get("text") or
+            data.get("message") or
+            "Pergunta padrão de fallback"
+        )
+
+        # Cached tool results are kept per user
+        user_id = str(data.get("user_id") or request.headers.get("X-User-Id") or "default")
+
+        # Per-request agent backed by the process-wide clients
+        try:
+            agent = agent_factory.create(user_id=user_id)
+            # Fails fast when the OpenAI key is missing
+            agent.async_client
+        except Exception as init_error:
+            return JSONResponse({
+                "agent": f"Erro crítico de inicialização: {str(init_error)}",
+                "status": "error",
+                "question": user_question
+            }, status_code=500)
+
+        if wants_stream(request, data):
+            return StreamingResponse(
+                stream_events(agent, user_question, started),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
             )
- 
-            # FORCE AGENT INITIALIZATION
-            try:
-                agent = Agent()
-            except Exception as init_error:
-                response = jsonify({
-                    "agent": f"Erro crítico de inicialização: {str(init_error)}",
-                    "status": "error",
-                    "question": user_question
-                })
-                return response, 500
-            
-            # FORCE AGENT CALL WITH MAXIMUM ERROR HANDLING
-            try:
-                agent_response = agent.call(user_question)
-            except Exception as call_error:
-                agent_response = f"Erro crítico no processamento: {str(call_error)}"
-            
-            # ENSURE RESPONSE IS NOT EMPTY
-            if not agent_response:
-                agent_response = "Resposta padrão: Nenhuma informação disponível"
-            
-            # FORCE RESPONSE WITH MAXIMUM INFORMATION
-            response = jsonify({
-                "agent": agent_response, 
-                "status": "success",
-                "question": user_question,
-                "tools_used": agent.used_tools if hasattr(agent, 'used_tools') else [],
-                "debug_info": {
-                    "raw_request": data,
-                    "timestamp": str(datetime.now())
+
+        # FORCE AGENT CALL WITH MAXIMUM ERROR HANDLING
+        try:
+            agent_response = await agent.acall(user_question)
+        except Exception as call_error:
+            agent_response = f"Erro crítico no processamento: {str(call_error)}"
+
+        # ENSURE RESPONSE IS NOT EMPTY
+        if not agent_response:
+            agent_response = "Resposta padrão: Nenhuma informação disponível"
+
+        agent_logger.observe_request_latency('POST', '/', time.perf_counter() - started)
+
+        # FORCE RESPONSE WITH MAXIMUM INFORMATION
+        return {
+            "agent": agent_response,
+            "status": "success",
+            "question": user_question,
+            "tools_used": agent.used_tools if hasattr(agent, 'used_tools') else [],
+            "debug_info": {
+                "raw_request": data,
+                "timestamp": str(datetime.now())
+            }
+        }
+
+    except Exception as e:
+        return JSONResponse({
+            "agent": "Erro crítico e inesperado",
+            "status": "error",
+            "error_details": str(e)
+        }, status_code=500)
+
+async def stream_events(agent, user_question, started):
+    """
+    Streams the agent progress as SSE: tool_started, tool_finished and final.
+
+    The final event carries the same fields as the JSON response.
+    """
+    try:
+        async for event in agent.astream(user_question):
+            name = event.pop("event")
+            if name == "final":
+                event = {
+                    "agent": event["answer"] or "Resposta padrão: Nenhuma informação disponível",
+                    "status": "success",
+                    "question": user_question,
+                    "tools_used": agent.used_tools,
+                    "debug_info": {"timestamp": str(datetime.now())}
                 }
-            })
-            
-            return response
-        
-        except Exception as e:
-            response = jsonify({
-                "agent": "Erro crítico e inesperado", 
-                "status": "error",
-                "error_details": str(e)
-            })
-            
-            return response, 500
+            yield sse(name, event)
+    except Exception as e:
+        yield sse("error", {"status": "error", "error_details": str(e)})
+    finally:
+        agent_logger.observe_request_latency('POST', '/', time.perf_counter() - started)
+
+@app.get('/stats')
+async def stats():
+    # Tool cache hit/miss counters
+    return {"tool_cache": agent_factory.tool_cache.stats()}
 
 if __name__ == '__main__':
-    # Configure Flask for MAXIMUM VERBOSITY
-    app.config['PROPAGATE_EXCEPTIONS'] = True
-    
-    # Start Prometheus metrics server
-    agent_logger.start_prometheus_server()
-    
-    # Run the Flask app with EXTREME DEBUGGING
-    app.run(
-        debug=True, 
-        port=5000, 
-        host='0.0.0.0',  # Listen on all available interfaces
-        threaded=True,   # Enable threading
-        processes=1,     # Limit to single process for easier debugging
-        use_reloader=True  # Enable auto-reload for development
-    )
+    import uvicorn
+
+    # A single event loop serves many concurrent conversations
+    uvicorn.run("index:app", host='0.0.0.0', port=5000, reload=True)
@@ -0,0 +1,179 @@
+import json
+import threading
+import tiktoken
+
+# Prompt budget for one GPT call, in tokens
+DEFAULT_MAX_PROMPT_TOKENS = 6000
+
+# Maximum size of a single tool result when it is added to the conversation
+DEFAULT_MAX_TOOL_TOKENS = 1500
+
+# Size of tool results that are older than the kept recent turns
+DEFAULT_STALE_TOOL_TOKENS = 200
+
+# Fixed overhead per message in the chat format
+MESSAGE_OVERHEAD = 4
+
+# Estimate used when the tokenizer files cannot be loaded (e.g. offline)
+CHARS_PER_TOKEN = 4
+
+
+class ContextBudget:
+    """
+    Keeps the agent's prompt within a token budget.
+
+    Tool results are truncated when they are added. Lists keep their first
+    items and report how many were omitted. Before each GPT call, if the prompt
+    is over budget, the results of older tool turns are shrunk further. The
+    system prompt, the question and the most recent turns are never changed.
+    """
+
+    _encoding = None
+    _encoding_loaded = False
+    _encoding_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS,
+        max_tool_tokens=DEFAULT_MAX_TOOL_TOKENS,
+        stale_tool_tokens=DEFAULT_STALE_TOOL_TOKENS,
+        keep_recent=2
+    ):
+        """
+        Args:
+            max_prompt_tokens (int): Target size of the whole prompt
+            max_tool_tokens (int): Maximum size of one tool result
+            stale_tool_tokens (int): Size older tool results are shrunk to when over budget
+            keep_recent (int): Number of recent assistant turns (with their tool results) kept intact
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_tool_tokens = max_tool_tokens
+        self.stale_tool_tokens = stale_tool_tokens
+        self.keep_recent = keep_recent
+
+    @classmethod
+    def encoding(cls):
+        """GPT-4o tokenizer, loaded once per process. None if it cannot be loaded."""
+        if not cls._encoding_loaded:
+            with cls._encoding_lock:
+                if not cls._encoding_loaded:
+                    try:
+                        cls._encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        print(f"Tokenizer unavailable, estimating token counts: {e}")
+                    cls._encoding_loaded = True
+        return cls._encoding
+
+    def count(self, text):
+        """Returns the number of tokens in a string."""
+        encoding = self.encoding()
+        if encoding is None:
+            return -(-len(text or "") // CHARS_PER_TOKEN)
+        return len(encoding.encode(text or "", disallowed_special=()))
+
+    def message_tokens(self, message):
+        """Returns the approximate number of prompt tokens used by one message."""
+        tokens = MESSAGE_OVERHEAD + self.count(message.get("content") or "")
+        for call in message.get("tool_calls") or []:
+            tokens += self.count(call["function"]["name"]) + self.count(call["function"]["arguments"])
+        return tokens
+
+    def total_tokens(self, messages):
+        return sum(self.message_tokens(message) for message in messages)
+
+    def compact_tool_result(self, result, max_tokens=None):
+        """
+        Shrinks a tool result to at most `max_tokens`.
+
+        Args:
+            result: Tool output, either a string or a JSON-serializable value
+            max_tokens (int, optional): Token limit. Defaults to max_tool_tokens
+
+        Returns:
+            str: Result serialized for a 'tool' message
+        """
+        max_tokens = max_tokens or self.max_tool_tokens
+
+        if isinstance(result, str):
+            # Tools may return already serialized JSON
+            try:
+                parsed = json.loads(result)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list):
+                result = parsed
+            elif self.count(result) <= max_tokens:
+                return result
+            else:
+                return self._truncate_text(result, max_tokens)
+
+        text = json.dumps(result, ensure_ascii=False, default=str)
+        if self.count(text) <= max_tokens:
+            return text
+
+        if isinstance(result, list):
+            return self._truncate_list(result, max_tokens)
+        return self._truncate_text(text, max_tokens)
+
+    def _truncate_text(self, text, max_tokens):
+        encoding = self.encoding()
+        if encoding is None:
+            limit = max_tokens * CHARS_PER_TOKEN
+            if len(text) <= limit:
+                return text
+            return f"{text[:limit]}\n[... truncated {self.count(text[limit:])} tokens]"
+
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        kept = encoding.decode(tokens[:max_tokens])
+        return f"{kept}\n[... truncated {len(tokens) - max_tokens} tokens]"
+
+    def _truncate_list(self, items, max_tokens):
+        # Keep whole items while they fit, in order
+        kept, used = [], 2
+        for item in items:
+            item_tokens = self.count(json.dumps(item, ensure_ascii=False, default=str)) + 1
+            if used + item_tokens > max_tokens:
+                break
+            kept.append(item)
+            used += item_tokens
+
+        text = json.dumps(kept, ensure_ascii=False, default=str)
+        if not kept:
+            return self._truncate_text(json.dumps(items, ensure_ascii=False, default=str), max_tokens)
+        return f"{text}\n[... {len(items) - len(kept)} more items omitted]"
+
+    def fit(self, messages):
+        """
+        Shrinks older tool results until the prompt fits the budget.
+
+        Messages are modified in place; the list is also returned.
+
+        Args:
+            messages (list): Chat messages
+
+        Returns:
+            list: The same messages
+        """
+        total = self.total_tokens(messages)
+        if total <= self.max_prompt_tokens:
+            return messages
+
+        # Tool messages before the last `keep_recent` assistant turns, oldest first
+        assistant_turns = [i for i, message in enumerate(messages) if message["role"] == "assistant"]
+        if self.keep_recent <= 0:
+            boundary = len(messages)
+        elif len(assistant_turns) >= self.keep_recent:
+            boundary = assistant_turns[-self.keep_recent]
+        else:
+            boundary = 0
+        stale = [i for i in range(boundary) if messages[i]["role"] == "tool"]
+
+        for i in stale:
+            before = self.message_tokens(messages[i])
+            messages[i]["content"] = self.compact_tool_result(messages[i]["content"], self.stale_tool_tokens)
+            total -= before - self.message_tokens(messages[i])
+            if total <= self.max_prompt_tokens:
+                break
+        return messages
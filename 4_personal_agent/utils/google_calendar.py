@@ -1,37 +1,18 @@
 import datetime
 import os.path
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+from utils.google_services import google_services
 
 # Read-only calendar access scope
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 
 class GoogleCalendar: 
     def __init__(self):
-        self.creds = None
         # Token stored locally after login
         token_path = os.path.join(os.path.dirname(__file__), 'calendar_token.json')
-        if os.path.exists(token_path):
-            self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
-        # Login and authorization via browser (on first execution)
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                self.creds.refresh(Request())
-            else:
-                credentials_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'credentials.json')
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    credentials_path, SCOPES)
-                self.creds = flow.run_local_server(port=0)
-
-            # Save token for reuse
-            with open(token_path, 'w') as token:
-                token.write(self.creds.to_json())
-
-        # API connection
-        self.service = build('calendar', 'v3', credentials=self.creds)
+        # Credentials and API connection are shared by the whole process
+        self.creds = google_services.credentials(token_path, SCOPES)
+        self.service = google_services.service('calendar', 'v3', token_path, SCOPES)
 
     def consult(self):
         now = datetime.datetime.utcnow().isoformat() + 'Z'
@@ -1,46 +1,29 @@
 from __future__ import print_function
 import os.path
 import base64
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import os
+from utils.google_services import google_services
 
 load_dotenv()
 
 # Scope for reading and modifying emails
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly', 'https://www.googleapis.com/auth/gmail.modify']
 
+# Headers requested in metadata mode
+METADATA_HEADERS = ['From', 'Subject', 'Date', 'Message-ID']
+
 # Gmail account data
 class GoogleGmail:
     def __init__(self):
         self.service = self.authenticate_gmail()
         
     def authenticate_gmail(self):
-        """Authenticates with OAuth2 and returns the Gmail API service"""
-        # Dynamically find token and credentials paths
+        """Returns the Gmail API service, reusing the process-wide credentials"""
+        # Dynamically find token path
         token_path = os.path.join(os.path.dirname(__file__), 'gmail_token.json')
-        credentials_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'credentials.json')
-
-        creds = None
-        if os.path.exists(token_path):
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
-
-        service = build('gmail', 'v1', credentials=creds)
-        return service
+        return google_services.service('gmail', 'v1', token_path, SCOPES)
 
     def list_threads(self, service, max_results=1, query=None):
         """Lists recent threads (conversations), with filter option"""
@@ -110,6 +93,70 @@ class GoogleGmail:
                 emails.append(email)
         return emails
 
+    def read_email_summaries(self, max_results=10, query='is:unread'):
+        """
+        Reads emails in metadata mode: selected headers and Gmail's snippet, no bodies
+
+        All threads are fetched in a single batch request, and bodies are not
+        downloaded or parsed. Use get_email_body to fetch one body when needed.
+
+        Args:
+            max_results (int): Maximum number of threads
+            query (str): Gmail search query
+
+        Returns:
+            list: Emails with from, subject, date, snippet, thread_id, message_id and id
+        """
+        threads = self.list_threads(self.service, max_results=max_results, query=query)
+        if not threads:
+            return []
+
+        responses = {}
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                print(f"Error fetching thread metadata: {exception}")
+                return
+            responses[request_id] = response
+
+        batch = self.service.new_batch_http_request(callback=collect)
+        for thread in threads:
+            batch.add(
+                self.service.users().threads().get(
+                    userId='me', id=thread['id'], format='metadata', metadataHeaders=METADATA_HEADERS
+                ),
+                request_id=thread['id']
+            )
+        batch.execute()
+
+        emails = []
+        for thread in threads:
+            for message in responses.get(thread['id'], {}).get('messages', []):
+                headers = {h['name']: h['value'] for h in message['payload'].get('headers', [])}
+                emails.append({
+                    'from': headers.get('From', 'Unknown'),
+                    'subject': headers.get('Subject', 'No subject'),
+                    'date': headers.get('Date'),
+                    'snippet': message.get('snippet', ''),
+                    'thread_id': message['threadId'],
+                    'message_id': headers.get('Message-ID'),
+                    'id': message['id']
+                })
+        return emails
+
+    def get_email_body(self, message_id):
+        """
+        Fetches and parses the body of one message
+
+        Args:
+            message_id (str): Internal Gmail ID of the message
+
+        Returns:
+            str: Plain text body
+        """
+        message = self.service.users().messages().get(userId='me', id=message_id, format='full').execute()
+        return self.parse_message(message)
+
     def find_email_by_message_id(self, message_id):
         """Searches for a specific email by message_id in Gmail"""
         try:
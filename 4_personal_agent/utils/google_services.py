@@ -0,0 +1,149 @@
+import datetime
+import os
+import threading
+import requests
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+
+# Default OAuth client secrets, shared by the calendar and Gmail tools
+CREDENTIALS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'credentials.json')
+
+# Credentials are refreshed this many seconds before they expire
+REFRESH_MARGIN = 300
+
+# Retry delay when a background refresh fails
+REFRESH_RETRY = 60
+
+
+class GoogleServiceCache:
+    """
+    Process-wide cache of Google credentials and API services.
+
+    Credentials are read from disk once per token file and refreshed in the
+    background shortly before they expire, so tool calls never wait on an
+    OAuth round trip. Services are built from the discovery documents bundled
+    with google-api-python-client (no discovery fetch). The underlying httplib2
+    transport is not thread-safe, so each thread gets its own service instance
+    on top of the shared credentials.
+    """
+
+    def __init__(self, refresh_margin=REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self._credentials = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Used only for token refreshes
+        self._auth_request = Request(session=requests.Session())
+
+    def credentials(self, token_path, scopes, credentials_path=CREDENTIALS_PATH):
+        """
+        Returns valid credentials for a token file, loading them only once.
+
+        Args:
+            token_path (str): Authorized user token file
+            scopes (list): OAuth scopes
+            credentials_path (str): OAuth client secrets, used for the first browser login
+
+        Returns:
+            google.oauth2.credentials.Credentials: Shared credentials
+        """
+        creds = self._credentials.get(token_path)
+        if creds is not None and creds.valid:
+            return creds
+
+        with self._lock:
+            creds = self._credentials.get(token_path)
+            if creds is None or not creds.valid:
+                creds = self._load(token_path, scopes, credentials_path, creds)
+                self._credentials[token_path] = creds
+                self._schedule_refresh(token_path)
+            return creds
+
+    def service(self, api, version, token_path, scopes, credentials_path=CREDENTIALS_PATH):
+        """
+        Returns this thread's API service for the given token file.
+
+        Args:
+            api (str): API name, e.g. 'calendar'
+            version (str): API version, e.g. 'v3'
+            token_path (str): Authorized user token file
+            scopes (list): OAuth scopes
+            credentials_path (str): OAuth client secrets, used for the first browser login
+
+        Returns:
+            googleapiclient.discovery.Resource: Service bound to the shared credentials
+        """
+        creds = self.credentials(token_path, scopes, credentials_path)
+
+        services = getattr(self._local, 'services', None)
+        if services is None:
+            services = self._local.services = {}
+
+        key = (api, version, token_path)
+        cached = services.get(key)
+        # Rebuild only if the credentials object was replaced (e.g. new login)
+        if cached is None or cached[0] is not creds:
+            service = build(api, version, credentials=creds, static_discovery=True, cache_discovery=False)
+            cached = services[key] = (creds, service)
+        return cached[1]
+
+    def _load(self, token_path, scopes, credentials_path, creds=None):
+        """Loads credentials from disk, refreshing or logging in when needed."""
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+
+        # Login and authorization via browser (on first execution)
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(self._auth_request)
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
+                creds = flow.run_local_server(port=0)
+
+            self._save(token_path, creds)
+        return creds
+
+    def _save(self, token_path, creds):
+        """Saves the token for reuse by the next process."""
+        with open(token_path, 'w') as token:
+            token.write(creds.to_json())
+
+    def _schedule_refresh(self, token_path, delay=None):
+        """Schedules a background refresh shortly before the token expires."""
+        creds = self._credentials[token_path]
+        if not creds.refresh_token or (delay is None and not creds.expiry):
+            return
+
+        if delay is None:
+            remaining = (creds.expiry - datetime.datetime.utcnow()).total_seconds()
+            delay = max(remaining - self.refresh_margin, 0)
+
+        previous = self._timers.get(token_path)
+        if previous is not None:
+            previous.cancel()
+
+        timer = threading.Timer(delay, self._refresh, args=(token_path,))
+        timer.daemon = True
+        self._timers[token_path] = timer
+        timer.start()
+
+    def _refresh(self, token_path):
+        """Refreshes credentials in place, so existing services keep working."""
+        with self._lock:
+            creds = self._credentials.get(token_path)
+            if creds is None:
+                return
+            try:
+                creds.refresh(self._auth_request)
+                self._save(token_path, creds)
+                self._schedule_refresh(token_path)
+            except Exception as e:
+                print(f"Error refreshing Google credentials ({os.path.basename(token_path)}): {e}")
+                self._schedule_refresh(token_path, delay=REFRESH_RETRY)
+
+
+# Create a global cache instance
+google_services = GoogleServiceCache()
@@ -1,12 +1,17 @@
 import os
 import json
+import atexit
+import contextvars
 import logging
+import queue
+import random
+import time
 import sentry_sdk
 from dotenv import load_dotenv
 import prometheus_client
 import socket
 import threading
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Load environment variables
 load_dotenv()
@@ -30,11 +35,44 @@ ERROR_COUNT = prometheus_client.Counter(
     ['error_type']
 )
 
+# Latency buckets in seconds, from fast cache hits to slow multi-tool turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60)
+
+TOOL_LATENCY = prometheus_client.Histogram(
+    'personal_agent_tool_latency_seconds',
+    'Tool execution latency',
+    ['tool_name'],
+    buckets=LATENCY_BUCKETS
+)
+
+GPT_LATENCY = prometheus_client.Histogram(
+    'personal_agent_gpt_latency_seconds',
+    'GPT call latency',
+    ['model'],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUEST_LATENCY = prometheus_client.Histogram(
+    'personal_agent_request_latency_seconds',
+    'End-to-end request latency',
+    ['method', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+
+# Request id of the current request, attached to histogram samples as exemplar
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Fraction of errors sent to Sentry, and window in seconds in which repeated
+# errors of the same type are aggregated into a single Sentry event
+SENTRY_ERROR_SAMPLE_RATE = float(os.getenv('SENTRY_ERROR_SAMPLE_RATE', '1.0'))
+SENTRY_AGGREGATION_WINDOW = float(os.getenv('SENTRY_AGGREGATION_WINDOW', '60'))
+
 # Configure Sentry for error tracking
 sentry_sdk.init(
     dsn=os.getenv('SENTRY_DSN', ''),
     traces_sample_rate=0.1,
-    environment=os.getenv('FLASK_ENV', 'development')
+    # FLASK_ENV is still read so existing .env files keep their environment
+    environment=os.getenv('APP_ENV', os.getenv('FLASK_ENV', 'development'))
 )
 
 class CustomFormatter(logging.Formatter):
@@ -66,6 +104,7 @@ class AgentLogger:
         
         # Clear any existing handlers
         self.logger.handlers.clear()
+        self.logger.propagate = False
         
         # Rotating File Handler
         file_handler = RotatingFileHandler(
@@ -80,9 +119,16 @@ class AgentLogger:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Requests only enqueue records; a background thread formats and writes them
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(log_queue))
+        self.listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+        # Sentry aggregation state: error_type -> (window start, suppressed count)
+        self._sentry_windows = {}
+        self._sentry_lock = threading.Lock()
         
         # Reduce logging for noisy libraries
         logging.getLogger('werkzeug').setLevel(logging.ERROR)
@@ -132,15 +178,88 @@ class AgentLogger:
         # Log to standard logger
         self.logger.error(json.dumps(log_message))
         
-        # Send error to Sentry
-        sentry_sdk.capture_message(
-            f"{error_type}: {error_message}",
-            level='error'
-        )
+        # Send error to Sentry, sampled and aggregated per error type
+        suppressed = self._sentry_gate(error_type)
+        if suppressed is not None:
+            sentry_sdk.capture_message(
+                f"{error_type}: {error_message}",
+                level='error',
+                tags={'error_type': error_type},
+                extras={'suppressed_since_last_event': suppressed}
+            )
         
         # Log to Prometheus metrics
         ERROR_COUNT.labels(error_type=error_type).inc()
 
+    def _sentry_gate(self, error_type):
+        """
+        Decides whether an error is sent to Sentry
+
+        At most one event per error type is sent per aggregation window. The
+        next event reports how many errors were suppressed in between.
+
+        Args:
+            error_type (str): Type of error
+
+        Returns:
+            int or None: Number of suppressed errors if the event should be sent, None otherwise
+        """
+        if random.random() >= SENTRY_ERROR_SAMPLE_RATE:
+            return None
+
+        now = time.monotonic()
+        with self._sentry_lock:
+            window = self._sentry_windows.get(error_type)
+            if window and now - window[0] < SENTRY_AGGREGATION_WINDOW:
+                self._sentry_windows[error_type] = (window[0], window[1] + 1)
+                return None
+            self._sentry_windows[error_type] = (now, 0)
+            return window[1] if window else 0
+
+    def set_request_id(self, request_id):
+        """
+        Sets the request id used as exemplar for latency samples of the current request
+
+        Args:
+            request_id (str): Request identifier
+        """
+        request_id_var.set(request_id)
+
+    def _exemplar(self):
+        request_id = request_id_var.get()
+        return {'request_id': request_id} if request_id else None
+
+    def observe_tool_latency(self, tool_name, seconds):
+        """
+        Record tool execution latency
+
+        Args:
+            tool_name (str): Tool name
+            seconds (float): Elapsed time
+        """
+        TOOL_LATENCY.labels(tool_name=tool_name).observe(seconds, exemplar=self._exemplar())
+
+    def observe_gpt_latency(self, model, seconds):
+        """
+        Record GPT call latency
+
+        Args:
+            model (str): Model name
+            seconds (float): Elapsed time
+        """
+        GPT_LATENCY.labels(model=model).observe(seconds, exemplar=self._exemplar())
+
+    def observe_request_latency(self, method, endpoint, seconds):
+        """
+        Record end-to-end request latency
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Request endpoint
+            seconds (float): Elapsed time
+        """
+        REQUEST_LATENCY.labels(method=method, endpoint=endpoint).observe(seconds, exemplar=self._exemplar())
+
     def track_request(self, method, endpoint):
         """
         Track request metrics
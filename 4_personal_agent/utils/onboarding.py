@@ -1,14 +1,46 @@
 import os
 import csv
+import hashlib
+import threading
 import traceback
 import pandas as pd
 import chromadb
 import numpy as np
+from chromadb.utils import embedding_functions
+
+# Directory of the persistent onboarding vector index
+ONBOARDING_INDEX_PATH = os.getenv("ONBOARDING_INDEX_PATH", "./db/onboarding_index")
+
+
+def file_sha256(path):
+    """
+    Computes the SHA-256 of a file in chunks
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class Onboarding:
-    def __init__(self, path="./assets/onboarding.csv"):
+    # Shared by every instance in the process, so requests reuse the same index
+    _clients = {}
+    _collections = {}
+    _embedding_fn = None
+    _overviews = {}
+    _index_lock = threading.Lock()
+
+    def __init__(self, path="./assets/onboarding.csv", index_path=ONBOARDING_INDEX_PATH):
         try:
             self.path = os.path.abspath(path)
+            self.index_path = os.path.abspath(index_path)
 
             if not os.path.exists(self.path):
                 raise FileNotFoundError(f"Onboarding file not found: {self.path}")
@@ -18,16 +50,89 @@ class Onboarding:
             if file_size == 0:
                 raise ValueError("CSV file is empty")
 
-            self.chroma_client = chromadb.Client()
-            self.collection = self.chroma_client.get_or_create_collection(name="onboarding_docs")
-
-            if self.collection.count() == 0:
-                self.embed_documents()
+            self.collection = self.get_collection()
             
         except Exception as init_error:
             print("[DEBUG] Exception during Onboarding.__init__:", init_error)
             raise ValueError(f"Erro de inicialização do onboarding: {str(init_error)}")
 
+    def get_collection(self):
+        """
+        Returns the shared vector index for the CSV, building it when needed.
+
+        The CSV modification time is checked on every call; the index is only
+        reopened when it changes. The persisted collection stores the SHA-256
+        of the CSV it was built from, and is rebuilt when the hash differs.
+
+        Returns:
+            chromadb.Collection: Collection with one embedded document per CSV row
+        """
+        mtime = os.path.getmtime(self.path)
+        key = (self.path, self.index_path)
+
+        cached = Onboarding._collections.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with Onboarding._index_lock:
+            cached = Onboarding._collections.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            collection = self._open_index(mtime)
+            Onboarding._collections[key] = (mtime, collection)
+            return collection
+
+    def _open_index(self, mtime):
+        """
+        Opens the persisted collection for the CSV, rebuilding it if it is stale.
+
+        Args:
+            mtime (float): Current modification time of the CSV
+
+        Returns:
+            chromadb.Collection: Up to date collection
+        """
+        source_hash = file_sha256(self.path)
+
+        if Onboarding._embedding_fn is None:
+            Onboarding._embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+
+        client = Onboarding._clients.get(self.index_path)
+        if client is None:
+            os.makedirs(self.index_path, exist_ok=True)
+            client = chromadb.PersistentClient(path=self.index_path)
+            Onboarding._clients[self.index_path] = client
+
+        # One collection per CSV file
+        name = "onboarding_" + hashlib.md5(self.path.encode("utf-8")).hexdigest()[:12]
+
+        try:
+            collection = client.get_collection(name=name, embedding_function=Onboarding._embedding_fn)
+            if (collection.metadata or {}).get("source_sha256") == source_hash:
+                return collection
+            print(f"[Onboarding] {self.path} changed, rebuilding index")
+            client.delete_collection(name=name)
+        except Exception:
+            # Collection does not exist yet
+            pass
+
+        collection = client.create_collection(
+            name=name,
+            embedding_function=Onboarding._embedding_fn,
+            metadata={"hnsw:space": "cosine", "source_mtime": mtime}
+        )
+        try:
+            self.embed_documents(collection)
+        except BaseException:
+            # Never leave a partial index behind, it would look up to date
+            client.delete_collection(name=name)
+            raise
+        # The hash is stamped only once every document is embedded.
+        # hnsw:space is left out: it is kept by the collection and cannot be modified.
+        collection.modify(metadata={"source_sha256": source_hash, "source_mtime": mtime})
+        return collection
+
     def preprocess_document(self, row):
         """
         Create a more meaningful document representation
@@ -65,9 +170,15 @@ class Onboarding:
         
         return document
 
-    def embed_documents(self):
+    def embed_documents(self, collection=None):
         """
         Read CSV and create embeddings in ChromaDB with comprehensive error handling
+
+        Args:
+            collection (chromadb.Collection, optional): Target collection. Defaults to self.collection
+
+        Returns:
+            list: Embedded documents
         """
         try:
             # Read CSV
@@ -80,9 +191,8 @@ class Onboarding:
             if not documents:
                 return []
             
-            # Add to ChromaDB with simple numeric embeddings
-            self.collection.add(
-                embeddings=[[float(i)] * 10 for i in range(len(documents))],  # Simple numeric embeddings
+            # Embeddings are computed by the collection's embedding function
+            (collection or self.collection).add(
                 documents=documents,
                 ids=[f"doc_{i}" for i in range(len(documents))]
             )
@@ -111,16 +221,9 @@ class Onboarding:
             # Preprocess query
             query = query.lower().strip()
             
-            # Ensure documents are embedded if collection is empty
-            if self.collection.count() == 0:
-                self.embed_documents()
-            
-            # Simple numeric embedding for query
-            query_embedding = [float(hash(query) % 10)] * 10
-            
             # Perform semantic search
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_texts=[query],
                 n_results=n_results
             )
             
@@ -161,59 +264,81 @@ class Onboarding:
             return f"Erro ao realizar busca semântica para: {query}"
 
     def read_as_markdown(self):
-        print('read_as_markdown called')  # Debug print
         """
         Provide a default markdown representation of onboarding documents
-        
+
+        The overview is built once per CSV modification time and then served from memory.
+
         Returns:
             str: Markdown-formatted overview of onboarding documents
         """
         try:
-            # Read the entire CSV file
-            df = pd.read_csv(self.path, header=None)
-            
-            # Prepare a comprehensive overview
-            markdown_results = [
-                "# Resumo do Processo de Onboarding",
-                "\n## Visão Geral",
-                "O processo de onboarding é composto por várias etapas fundamentais para integração de novos membros da equipe.",
-                "\n## Etapas Principais:"
-            ]
-            
-            # Extract unique stages and activities
-            stages = {}
-            for _, row in df.iterrows():
-                # Assuming the first column contains stage information
-                stage = str(row.iloc[0]).strip()
-                if stage and stage.lower() not in ['não feito', '-', '']:
-                    if stage not in stages:
-                        stages[stage] = []
-                
-                # Try to extract activity from other columns
-                for col in row.index[1:]:
-                    activity = str(row.iloc[col]).strip()
-                    if activity and activity.lower() not in ['não feito', '-', '']:
-                        stages[stage].append(activity)
-            
-            # Add stages to markdown
-            for stage, activities in stages.items():
-                markdown_results.append(f"\n### {stage}")
-                for activity in activities:
-                    markdown_results.append(f"- {activity}")
-            
-            # Add total number of stages and activities
-            markdown_results.append(f"\n**Total de Etapas**: {len(stages)}")
-            markdown_results.append(f"**Total de Atividades**: {sum(len(activities) for activities in stages.values())}")
-            
-            # Add a closing note
-            markdown_results.append("\n## Observação")
-            markdown_results.append("Este resumo destaca as principais etapas e atividades do processo de onboarding. Cada etapa é crucial para a integração efetiva de novos membros da equipe.")
-            
-            return "\n".join(markdown_results)
+            mtime = os.path.getmtime(self.path)
+            cached = Onboarding._overviews.get(self.path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            markdown = self.build_overview()
+            Onboarding._overviews[self.path] = (mtime, markdown)
+            return markdown
         
         except Exception as e:
             return f"Erro ao gerar resumo do onboarding: {str(e)}"
 
+    def build_overview(self):
+        """
+        Build the stage -> activities overview with vectorized pandas operations
+
+        Returns:
+            str: Markdown-formatted overview of onboarding documents
+        """
+        ignored = ['não feito', '-', '', 'nan']
+
+        # Read the entire CSV file as text
+        df = pd.read_csv(self.path, header=None, dtype=str)
+
+        # The first column holds the stage; blank cells belong to the stage above
+        stage_column = df.iloc[:, 0].str.strip()
+        stage_column = stage_column.where(
+            stage_column.notna() & ~stage_column.str.lower().isin(ignored)
+        ).ffill()
+
+        # Flatten the other columns row by row, keeping the original order
+        activity_columns = df.iloc[:, 1:]
+        activities = pd.DataFrame({
+            "stage": np.repeat(stage_column.to_numpy(), activity_columns.shape[1]),
+            "activity": activity_columns.to_numpy().ravel(),
+        }).dropna()
+        activities["activity"] = activities["activity"].str.strip()
+        activities = activities[~activities["activity"].str.lower().isin(ignored)]
+
+        # Stages in order of first appearance, including those without activities
+        stages = dict.fromkeys(stage_column.dropna().unique(), [])
+        stages.update(activities.groupby("stage", sort=False)["activity"].agg(list).to_dict())
+
+        # Prepare a comprehensive overview
+        markdown_results = [
+            "# Resumo do Processo de Onboarding",
+            "\n## Visão Geral",
+            "O processo de onboarding é composto por várias etapas fundamentais para integração de novos membros da equipe.",
+            "\n## Etapas Principais:"
+        ]
+
+        # Add stages to markdown
+        for stage, stage_activities in stages.items():
+            markdown_results.append(f"\n### {stage}")
+            markdown_results.extend(f"- {activity}" for activity in stage_activities)
+
+        # Add total number of stages and activities
+        markdown_results.append(f"\n**Total de Etapas**: {len(stages)}")
+        markdown_results.append(f"**Total de Atividades**: {len(activities)}")
+
+        # Add a closing note
+        markdown_results.append("\n## Observação")
+        markdown_results.append("Este resumo destaca as principais etapas e atividades do processo de onboarding. Cada etapa é crucial para a integração efetiva de novos membros da equipe.")
+
+        return "\n".join(markdown_results)
+
 if __name__ == "__main__":
     obj = Onboarding()
     
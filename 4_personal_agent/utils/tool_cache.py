@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+# Default time-to-live in seconds for each cached tool
+DEFAULT_TTLS = {
+    'calendar': 300,
+    'emails': 120,
+    'email_body': 600,
+    'weather': 600,
+}
+
+class ToolCache:
+    """
+    Thread-safe in-memory cache of tool results with a TTL per tool.
+
+    Entries are keyed by tool, user and arguments, so repeated questions from
+    the same user within the TTL are served locally instead of calling the
+    external APIs again.
+    """
+
+    def __init__(self, ttls=None, max_entries=1024):
+        """
+        Args:
+            ttls (dict, optional): TTL in seconds per tool name. Overrides DEFAULT_TTLS
+                and the TOOL_CACHE_TTL_<TOOL> environment variables.
+            max_entries (int): Maximum number of cached results
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        for tool in DEFAULT_TTLS:
+            env_ttl = os.getenv(f"TOOL_CACHE_TTL_{tool.upper()}")
+            if env_ttl:
+                self.ttls[tool] = float(env_ttl)
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, tool, outcome):
+        tool_stats = self._stats.setdefault(tool, {'hits': 0, 'misses': 0})
+        tool_stats[outcome] += 1
+
+    def get(self, tool, user_id, *args):
+        """
+        Returns the cached result for a tool call.
+
+        Returns:
+            tuple: (True, value) on a fresh hit, (False, None) otherwise
+        """
+        key = (tool, user_id, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._count(tool, 'hits')
+                return True, entry[1]
+            if entry:
+                del self._entries[key]
+            self._count(tool, 'misses')
+            return False, None
+
+    def set(self, tool, user_id, value, *args, max_ttl=None):
+        """
+        Stores a tool result for the tool's TTL. Tools without a TTL are not cached.
+
+        Args:
+            max_ttl (float, optional): Upper bound for the TTL of this result, e.g. the
+                time left before the upstream data expires. 0 or less skips caching.
+        """
+        ttl = self.ttls.get(tool)
+        if max_ttl is not None:
+            ttl = min(ttl or 0, max_ttl)
+        if not ttl or ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[(tool, user_id, args)] = (time.monotonic() + ttl, value)
+
+    def get_or_call(self, tool, user_id, func, *args, max_ttl=None):
+        """
+        Returns the cached result or calls `func(*args)` and caches its result.
+        Exceptions raised by `func` are propagated and never cached.
+
+        Args:
+            max_ttl (callable, optional): Called after `func` to get the upper bound
+                for the TTL of its result (see `set`).
+        """
+        hit, value = self.get(tool, user_id, *args)
+        if hit:
+            return value
+        value = func(*args)
+        self.set(tool, user_id, value, *args, max_ttl=max_ttl() if max_ttl else None)
+        return value
+
+    def _evict(self):
+        # Drop expired entries first, then the ones closest to expiring
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            oldest = sorted(self._entries, key=lambda key: self._entries[key][0])
+            for key in oldest[:max(1, len(oldest) // 10)]:
+                del self._entries[key]
+
+    def invalidate(self, tool=None, user_id=None):
+        """Removes cached results, optionally only for one tool and/or user."""
+        with self._lock:
+            for key in list(self._entries):
+                if (tool is None or key[0] == tool) and (user_id is None or key[1] == user_id):
+                    del self._entries[key]
+
+    def stats(self):
+        """
+        Returns hit/miss counters per tool and the number of cached entries.
+
+        Returns:
+            dict: {'entries': int, 'tools': {tool: {'hits', 'misses', 'hit_rate'}}}
+        """
+        with self._lock:
+            tools = {}
+            for tool, counts in self._stats.items():
+                total = counts['hits'] + counts['misses']
+                tools[tool] = {**counts, 'hit_rate': round(counts['hits'] / total, 3) if total else 0.0}
+            return {'entries': len(self._entries), 'tools': tools}
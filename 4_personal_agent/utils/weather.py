@@ -1,30 +1,90 @@
+from email.utils import parsedate_to_datetime
 import requests
+import threading
+import time
 
 class Weather:
     BASE_URL = "https://api.met.no/weatherapi/locationforecast/2.0/compact"
 
-    def __init__(self, user_agent="MyWeatherApp/1.0 lucas@email.com", default_lat=-23.4773222, default_lon=-47.5078991):
+    def __init__(self, user_agent="MyWeatherApp/1.0 lucas@email.com", default_lat=-23.4773222, default_lon=-47.5078991, session=None):
         self.user_agent = user_agent
         self.default_lat = default_lat
         self.default_lon = default_lon
+        # Reuse a shared session to keep connections to met.no alive
+        self.session = session or requests.Session()
+        # Last response per location, used to honour Expires and If-Modified-Since
+        self._responses = {}
+        self._lock = threading.Lock()
 
     def get_forecast(self, lat=None, lon=None):
-        lat = lat or self.default_lat
-        lon = lon or self.default_lon
+        """
+        Returns the met.no forecast for a location.
+
+        Follows the met.no terms of service: a cached response is reused until
+        its Expires time, and later requests are conditional (If-Modified-Since)
+        so an unchanged forecast costs a 304 without a body.
+        """
+        key = self._key(lat, lon)
+        lat, lon = key
+
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached and cached["expires"] > time.time():
+            return cached["body"]
 
         headers = {
             "User-Agent": self.user_agent
         }
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
         params = {
             "lat": lat,
             "lon": lon,
         }
-        resp = requests.get(self.BASE_URL, headers=headers, params=params)
+        resp = self.session.get(self.BASE_URL, headers=headers, params=params)
+        if resp.status_code == 304 and cached:
+            with self._lock:
+                cached["expires"] = self._expires_at(resp)
+            return cached["body"]
         if resp.status_code == 200:
-            return resp.json()
+            body = resp.json()
+            with self._lock:
+                self._responses[key] = {
+                    "body": body,
+                    "expires": self._expires_at(resp),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                }
+            return body
         else:
             raise Exception(f"Error fetching forecast from met.no: {resp.text}")
 
+    def _key(self, lat, lon):
+        # met.no recommends at most 4 decimals, which also improves cache hits
+        return round(lat or self.default_lat, 4), round(lon or self.default_lon, 4)
+
+    def seconds_until_expiry(self, lat=None, lon=None):
+        """
+        Returns how long the last forecast of a location stays valid according
+        to its Expires header, in seconds (0 if expired or never fetched).
+        Caches layered on top of get_forecast should not keep it longer.
+        """
+        with self._lock:
+            cached = self._responses.get(self._key(lat, lon))
+        if not cached:
+            return 0
+        return max(0.0, cached["expires"] - time.time())
+
+    @staticmethod
+    def _expires_at(resp):
+        """Returns the Expires header as a timestamp, or now if it is missing."""
+        expires = resp.headers.get("Expires")
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                pass
+        return time.time()
+
     def process_forecast(self, forecast_json, hours=6):
         """Returns a friendly summary for the next `hours` forecast periods."""
         summary = []
@@ -1,55 +1,170 @@
 import streamlit as st
 import io
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from streamlit_mic_recorder import mic_recorder
 
-from src.pipelines.pdf_pipeline import process_pdf_file
-from src.pipelines.rag_pipeline import RAG
-from src.pipelines.summarizer import Summarizer
+from src.config import SUMMARY_QUESTIONS_MODE
+from src.core.document_cache import DocumentCache, assign_chunk_ids, hash_bytes
 from src.core.chunking import TextChunker
-from src.services.transcription_service import TranscriptionService
+
+# Heavy components (ChromaDB, ONNX embeddings, LLM clients, PDF parsing) are
+# imported and built on first use and shared by every session of the process.
+
+@st.cache_resource
+def get_document_cache():
+    """Document cache shared by every session of this process."""
+    return DocumentCache()
+
+@st.cache_resource
+def get_rag():
+    """RAG system (vector store + LLM client), created on first use."""
+    from src.pipelines.rag_pipeline import RAG
+    return RAG()
+
+@st.cache_resource
+def get_summarizer():
+    """Summarizer, created on first use."""
+    from src.pipelines.summarizer import Summarizer
+    return Summarizer()
+
+@st.cache_resource
+def get_transcription_service():
+    """Transcription service, created on first use."""
+    from src.services.transcription_service import TranscriptionService
+    return TranscriptionService()
+
+def process_pdf_file(pdf_stream):
+    """Imports the PDF pipeline (PyPDF2) only when a PDF is uploaded."""
+    from src.pipelines.pdf_pipeline import process_pdf_file as process
+    return process(pdf_stream)
 
 def init_session_state():
     """Initialize session state variables."""
-    st.session_state.setdefault("rag_system", RAG())
-    st.session_state.setdefault("summarizer", Summarizer())
-    st.session_state.setdefault("transcription", TranscriptionService())
-
     st.session_state.setdefault("input_key_counter", 0)
     st.session_state.setdefault("mic_input_key", 0)
     st.session_state.setdefault("response", "")
+    st.session_state.setdefault("pending_query", "")
 
     st.session_state.setdefault("audio_to_process", None)
     st.session_state.setdefault("processing_audio_step", "")
     st.session_state.setdefault("last_processed_audio_hash", None)
 
+def summary_progress_callback(progress_bar):
+    """Returns a callback that shows map-reduce summarization progress."""
+    def update(done, total, level):
+        step = "Summarizing sections" if level == 0 else f"Combining partial summaries (round {level})"
+        progress_bar.progress(done / total, text=f"{step}: {done}/{total}")
+    return update
+
+def show_summary_and_questions(doc_hash, full_text):
+    """Show the summary and questions of a document, generating only what is not cached."""
+    cache = get_document_cache()
+    entry = cache.get(doc_hash)
+    summarizer = get_summarizer()
+    num_questions = st.session_state.num_questions
+
+    summary = entry.get("summary")
+    questions = entry["questions"].get(str(num_questions))
+
+    if summary is None and questions is None and SUMMARY_QUESTIONS_MODE == "merged" and summarizer.can_merge(full_text):
+        # One request returns both, so the document is sent only once
+        summary, questions = summarizer.generate_summary_and_questions(full_text, num_questions, mode="merged")
+        cache.update(doc_hash, summary=summary)
+        cache.set_questions(doc_hash, num_questions, questions)
+
+    st.subheader("Summary:")
+    if summary is not None:
+        st.write(summary)
+    if summary is not None and questions is not None:
+        show_questions(questions)
+        return
+
+    # Long texts are condensed once; the summary and the questions then use the section summaries.
+    # The condensed text is cached, so a new question count does not repeat the map-reduce calls.
+    condensed = entry.get("condensed")
+    reduced = condensed is not None
+    if not reduced and len(full_text) > summarizer.chunk_chars:
+        progress_bar = st.empty()
+        condensed, reduced = summarizer.condense(full_text, progress_callback=summary_progress_callback(progress_bar))
+        progress_bar.empty()
+        if reduced:
+            cache.update(doc_hash, condensed=condensed)
+    if not reduced:
+        condensed = full_text
+
+    # Questions are generated while the summary streams, if the parallelism cap allows a second call
+    parallel = summarizer.max_parallel_calls >= 2
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        questions_future = None
+        if questions is None and parallel:
+            questions_future = executor.submit(summarizer.generate_questions, condensed, num_questions)
+
+        if summary is None:
+            summary = st.write_stream(summarizer.stream_summary(condensed, reduced=reduced))
+            cache.update(doc_hash, summary=summary)
+
+        if questions is None:
+            if questions_future is not None:
+                questions = questions_future.result()
+            else:
+                questions = summarizer.generate_questions(condensed, num_questions)
+            cache.set_questions(doc_hash, num_questions, questions)
+
+    show_questions(questions)
+
+def show_questions(questions):
+    """Show generated questions with their answers."""
+    st.subheader("Generated Questions:")
+    for q in questions:
+        st.markdown(f"**Q:** {q['question']}  \n**A:** {q['answer']}")
+
+def show_page_reader(doc_hash):
+    """Show a page range of a PDF from the page store, without parsing the file again."""
+    pages = get_document_cache().get_pages(doc_hash)
+    if not pages:
+        return
+
+    with st.expander("Read pages"):
+        first_number, last_number = pages[0][0], pages[-1][0]
+        col_from, col_to = st.columns(2)
+        first_page = col_from.number_input("From page", first_number, last_number, first_number, key="page_from")
+        last_page = col_to.number_input("To page", first_number, last_number, first_number, key="page_to")
+        for page_number, text in get_document_cache().get_pages(doc_hash, first_page, last_page):
+            st.markdown(f"**Page {page_number}**")
+            st.write(text)
+
 def handle_pdf_upload():
     st.header("PDF Upload")
     pdf_file = st.file_uploader("Upload a PDF with study content", type=["pdf"])
 
     if pdf_file:
-        with st.spinner("Processing PDF..."):
-            try:
-                chunks = process_pdf_file(pdf_file)
-                st.session_state.rag_system.add_documents(chunks)
-                full_text = " ".join(chunk["text"] for chunk in chunks)
-                st.session_state.full_text = full_text
-                st.success(f"PDF '{pdf_file.name}' loaded with {len(chunks)} chunks.")
-            except Exception as e:
-                st.error(f"Error processing PDF: {str(e)}")
-                return
+        # Reruns and re-uploads of the same file reuse the cached results
+        doc_hash = hash_bytes(pdf_file.getvalue())
+        cache = get_document_cache()
+        entry = cache.get(doc_hash)
+
+        if entry is None:
+            with st.spinner("Processing PDF..."):
+                try:
+                    chunks, pages = process_pdf_file(pdf_file)
+                    entry = cache.put(doc_hash, pdf_file.name, assign_chunk_ids(chunks, doc_hash))
+                    cache.put_pages(doc_hash, pages)
+                except Exception as e:
+                    st.error(f"Error processing PDF: {str(e)}")
+                    return
+
+        chunks = entry["chunks"]
+        get_rag().add_document(doc_hash, chunks)
+        # Documents cached before pages were stored fall back to their chunks
+        full_text = cache.get_text(doc_hash) or " ".join(chunk["text"] for chunk in chunks)
+        st.session_state.full_text = full_text
+        st.success(f"PDF '{pdf_file.name}' loaded with {len(chunks)} chunks.")
+        show_page_reader(doc_hash)
 
         with st.spinner("Generating summary and questions..."):
-            summarizer = st.session_state.summarizer
             try:
-                summary = summarizer.generate_summary(full_text)
-                st.subheader("Summary:")
-                st.write(summary)
-
-                num_questions = st.session_state.num_questions
-                questions = summarizer.generate_questions(full_text, num_questions)
-                st.subheader("Generated Questions:")
-                for q in questions:
-                    st.markdown(f"**Q:** {q['question']}  \n**A:** {q['answer']}")
+                show_summary_and_questions(doc_hash, full_text)
             except Exception as e:
                 st.error(f"Error generating summary and questions: {str(e)}")
 
@@ -63,45 +178,44 @@ def handle_manual_text():
             return
 
         with st.spinner("Processing text..."):
-            rag_system = st.session_state.rag_system
-            summarizer = st.session_state.summarizer
-
-            chunks = TextChunker().create_chunks(content, source="manual_input")
-            rag_system.add_documents(chunks)
+            doc_hash = hash_bytes(content)
+            cache = get_document_cache()
+            entry = cache.get(doc_hash)
+            if entry is None:
+                chunks = assign_chunk_ids(TextChunker().create_chunks(content, source="manual_input"), doc_hash)
+                entry = cache.put(doc_hash, "manual_input", chunks)
+
+            get_rag().add_document(doc_hash, entry["chunks"])
             st.session_state.full_text = content
 
-            summary = summarizer.generate_summary(content)
-            st.subheader("Summary:")
-            st.write(summary)
-
-            num_questions = st.session_state.num_questions
-            questions = summarizer.generate_questions(content, num_questions)
-            st.subheader("Generated Questions:")
-            for q in questions:
-                st.markdown(f"**Q:** {q['question']}  \n**A:** {q['answer']}")
+            show_summary_and_questions(doc_hash, content)
 
 def process_query_and_get_response(query_text: str):
+    """Queue a question; its answer is streamed where responses are shown."""
+    st.session_state.response = ""
     if not query_text.strip():
         st.toast("Please enter or record a valid question.")
-        st.session_state.response = ""
+        st.session_state.pending_query = ""
         return
+    st.session_state.pending_query = query_text
 
-    st.session_state.response = ""
-
-    spinner_placeholder_ai = st.empty()
-    with spinner_placeholder_ai.container():
-        st.info("Consulting AI...")
+def stream_pending_response():
+    """Stream the answer to the pending question and keep it for later reruns."""
+    query_text = st.session_state.pending_query
+    st.session_state.pending_query = ""
 
     try:
-        rag = st.session_state.rag_system
-        response = rag.query_and_respond(query_text, n_results=1)
-        st.session_state.response = response
+        rag = get_rag()
+        with st.spinner("Consulting AI..."):
+            stream = rag.stream_response(query_text, n_results=1)
+            # Retrieval runs before the first piece is yielded
+            first = next(stream, "")
+        st.subheader("Response Found:")
+        st.session_state.response = st.write_stream(itertools.chain([first], stream))
         st.toast("Response generated!")
     except Exception as e:
         st.error(f"Error fetching response: {e}")
         st.session_state.response = f"Could not obtain a response: {e}"
-    finally:
-        spinner_placeholder_ai.empty()
 
 def on_text_input_submit():
     key = f"user_question_input_{st.session_state.input_key_counter}"
@@ -145,7 +259,7 @@ def handle_questioning():
         st.audio(st.session_state.audio_to_process, format="audio/wav")
         with st.spinner("Transcribing..."):
             try:
-                transcript = st.session_state.transcription.transcribe(io.BytesIO(st.session_state.audio_to_process))
+                transcript = get_transcription_service().transcribe(io.BytesIO(st.session_state.audio_to_process))
                 st.toast("Transcription completed!")
                 process_query_and_get_response(transcript)
 
@@ -164,7 +278,9 @@ def handle_questioning():
                 st.session_state.audio_to_process = None
                 st.session_state.mic_input_key += 1  # prevent loop
 
-    if st.session_state.response:
+    if st.session_state.pending_query:
+        stream_pending_response()
+    elif st.session_state.response:
         st.subheader("Response Found:")
         st.write(st.session_state.response)
 
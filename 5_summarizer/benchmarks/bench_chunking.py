@@ -0,0 +1,103 @@
+"""
+Chunking benchmark: legacy TextChunker vs the rolling-window implementation.
+
+Builds a synthetic document of N pages and reports, for each chunker, the
+number of chunks, the average/maximum chunk size, the total size sent to the
+embedding model (sum of chunk lengths) and the throughput in pages per second.
+
+The legacy chunker kept `chunk_overlap` *sentences* of overlap and recomputed
+the chunk length on every flush, so its chunks grow with the document.
+
+Usage:
+    python benchmarks/bench_chunking.py --pages 1000
+    python benchmarks/bench_chunking.py --pages 1000 --unit tokens --chunk-size 256 --chunk-overlap 32
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chunking import TextChunker, split_sentences
+
+WORDS = (
+    "cell membrane protein energy photosynthesis mitochondria enzyme reaction gene "
+    "chromosome organism evolution species population ecosystem nutrient molecule "
+    "structure function process system theory experiment result analysis data"
+).split()
+
+
+def build_pages(n_pages, sentences_per_page=30, seed=42):
+    rng = random.Random(seed)
+    pages = []
+    for page_number in range(1, n_pages + 1):
+        sentences = []
+        for _ in range(sentences_per_page):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        pages.append((page_number, " ".join(sentences)))
+    return pages
+
+
+def legacy_create_chunks(text, chunk_size=700, chunk_overlap=200):
+    """The previous TextChunker.create_chunks, without IDs and metadata."""
+    sentences = split_sentences(text)
+    chunks = []
+    current_chunk, current_length = [], 0
+
+    for sentence in sentences:
+        sentence_length = len(sentence)
+
+        if current_length + sentence_length > chunk_size:
+            chunks.append(" ".join(current_chunk).strip())
+            current_chunk = current_chunk[-chunk_overlap:] if chunk_overlap else []
+            current_length = sum(len(s) for s in current_chunk)
+
+        current_chunk.append(sentence)
+        current_length += sentence_length
+
+    if current_chunk:
+        chunks.append(" ".join(current_chunk).strip())
+    return chunks
+
+
+def report(name, texts, elapsed, n_pages, measure):
+    sizes = [measure(text) for text in texts]
+    print(f"{name:<12}{len(texts):>10}{sum(sizes) / len(sizes):>12.0f}{max(sizes):>12}"
+          f"{sum(sizes):>16}{n_pages / elapsed:>14.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the summarizer's TextChunker.")
+    parser.add_argument("--pages", type=int, default=1000, help="Number of synthetic pages")
+    parser.add_argument("--chunk-size", type=int, default=700, help="Chunk size in --unit")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk overlap in --unit")
+    parser.add_argument("--unit", choices=["chars", "tokens"], default="chars", help="Budget unit of the new chunker")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only run the new chunker")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = build_pages(args.pages)
+    text = "\n\n".join(page_text for _, page_text in pages)
+    chunker = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, unit=args.unit)
+
+    print(f"Document: {args.pages} pages, {len(text):,} characters")
+    print(f"{'chunker':<12}{'chunks':>10}{'avg size':>12}{'max size':>12}{'total embedded':>16}{'pages/s':>14}"
+          f"   (sizes in {args.unit})")
+
+    start = time.perf_counter()
+    chunks = chunker.create_chunks_from_pages(pages, source="bench")
+    report("rolling", [c["text"] for c in chunks], time.perf_counter() - start, args.pages, chunker.measure)
+
+    if not args.skip_legacy:
+        start = time.perf_counter()
+        legacy = legacy_create_chunks(text, 700, 200)
+        report("legacy", legacy, time.perf_counter() - start, args.pages, chunker.measure)
+
+
+if __name__ == "__main__":
+    main()
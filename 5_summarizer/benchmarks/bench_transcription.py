@@ -0,0 +1,129 @@
+"""
+Transcription benchmark against a local stand-in for the OpenAI transcription API.
+
+Generates a synthetic recording (tones separated by short pauses), serves a
+stub /v1/audio/transcriptions endpoint whose latency grows with the length of
+the uploaded audio, and reports the number of segments and the wall-clock
+time with one request at a time, with parallel requests and from the
+transcript cache. Nothing leaves the machine.
+
+The stand-in can also be served on its own, to try the app offline:
+    python benchmarks/bench_transcription.py --serve --port 8765
+    TRANSCRIPTION_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+
+Usage:
+    python benchmarks/bench_transcription.py --minutes 30
+    python benchmarks/bench_transcription.py --minutes 60 --segment-seconds 120 --parallel 8
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_audio(minutes, seed=42):
+    """Tones of 2-8 s separated by 0.6 s pauses, at 16 kHz mono."""
+    import random
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+
+    rng = random.Random(seed)
+    pause = AudioSegment.silent(duration=600, frame_rate=16000)
+    tones = {}
+    audio = AudioSegment.silent(duration=0, frame_rate=16000)
+    while len(audio) < minutes * 60_000:
+        key = (rng.choice([220, 330, 440]), rng.randint(2, 8) * 1000)
+        if key not in tones:
+            tones[key] = Sine(key[0], sample_rate=16000).to_audio_segment(duration=key[1], volume=-10).set_channels(1)
+        audio += tones[key] + pause
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def wav_seconds(body):
+    """Length of the WAV file inside a multipart upload."""
+    start = body.find(b"RIFF")
+    if start < 0:
+        return 0.0
+    with wave.open(io.BytesIO(body[start:])) as w:
+        return w.getnframes() / w.getframerate()
+
+
+def build_handler(seconds_per_audio_minute):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            seconds = wav_seconds(body)
+            time.sleep(seconds / 60 * seconds_per_audio_minute)
+            out = json.dumps({"text": f"Transcript of {seconds:.1f} seconds of audio."}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInHandler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark chunked transcription against a local stand-in server.")
+    parser.add_argument("--minutes", type=float, default=30, help="Length of the synthetic recording")
+    parser.add_argument("--segment-seconds", type=int, default=300, help="Maximum segment length")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent transcription requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stand-in seconds per minute of audio")
+    parser.add_argument("--serve", action="store_true", help="Only run the stand-in server")
+    parser.add_argument("--port", type=int, default=0, help="Stand-in server port (0 picks a free one)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), build_handler(args.latency))
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    if args.serve:
+        print(f"Stand-in transcription server on {base_url}")
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    from src.services.transcription_service import TranscriptCache, TranscriptionService
+
+    audio = build_audio(args.minutes)
+    print(f"Recording: {args.minutes:g} min, {len(audio) / 1e6:.1f} MB WAV")
+    print(f"{'run':<12}{'seconds':>10}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, parallel in (("sequential", 1), ("parallel", args.parallel)):
+            service = TranscriptionService(
+                base_url=base_url, segment_seconds=args.segment_seconds,
+                max_parallel_calls=parallel, cache=TranscriptCache(os.path.join(cache_dir, name))
+            )
+            start = time.perf_counter()
+            service.transcribe(audio)
+            print(f"{name:<12}{time.perf_counter() - start:>10.2f}")
+
+        start = time.perf_counter()
+        service.transcribe(audio)
+        print(f"{'cached':<12}{time.perf_counter() - start:>10.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Import-time report for the summarizer.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each module, and prints the wall-clock cold start (best of --repeat runs) and
+the imports with the largest cumulative time. Use it to check that heavy
+dependencies (chromadb, onnxruntime, openai, nltk, PyPDF2) stay off the
+startup path of app.py.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --modules app src.pipelines.rag_pipeline --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "app",
+    "src.core.chunking",
+    "src.pipelines.pdf_pipeline",
+    "src.pipelines.summarizer",
+    "src.pipelines.rag_pipeline",
+    "src.services.transcription_service",
+]
+
+
+def import_profile(module):
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (wall seconds, {imported package: cumulative microseconds}) or (None, error message)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    cumulative = {}
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        cumulative[parts[2].strip()] = int(parts[1])
+
+    if result.returncode != 0:
+        return None, errors[-1] if errors else f"exit code {result.returncode}"
+    return elapsed, cumulative
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report cold import time of the summarizer modules.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    summary = []
+
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        if any(elapsed is None for elapsed, _ in runs):
+            error = next(detail for elapsed, detail in runs if elapsed is None)
+            print(f"\n=== {module}: import failed ({error})")
+            continue
+
+        elapsed, cumulative = min(runs, key=lambda run: run[0])
+        summary.append((module, elapsed, cumulative.get(module, 0) / 1e6))
+
+        print(f"\n=== {module}: {elapsed * 1000:.0f} ms cold start, {cumulative.get(module, 0) / 1000:.0f} ms importing")
+        # Only top-level entries (no leading spaces) are direct imports of the module tree
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+        print(f"{'cumulative ms':>14}  package")
+        for name, micros in [item for item in slowest if item[0] != module][:args.top]:
+            print(f"{micros / 1000:>14.1f}  {name}")
+
+    print(f"\n{'module':<40}{'cold start ms':>15}{'import ms':>12}")
+    for module, elapsed, import_seconds in summary:
+        print(f"{module:<40}{elapsed * 1000:>15.0f}{import_seconds * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
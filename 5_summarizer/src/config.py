@@ -5,11 +5,58 @@ load_dotenv()
 # Path where ChromaDB will persist data
 CHROMA_PERSIST_PATH = "./db/chroma_persist"
 
+# Directory of processed documents (chunks, summary, questions) keyed by content hash
+DOCUMENT_CACHE_PATH = "./db/document_cache"
+
 # Collection name used for embeddings
 VECTOR_STORE_COLLECTION = "rag_collection"
 
 # Default embedding model (in case you want to change it in the future)
 EMBEDDING_MODEL = "default"
 
+# ONNX Runtime threads per embedding batch (0 lets ONNX Runtime decide)
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+# Use an int8-quantized copy of the embedding model (needs the onnx package)
+EMBEDDING_QUANTIZED = os.getenv("EMBEDDING_QUANTIZED", "false").lower() == "true"
+
+# Concurrent embedding requests are merged into batches of up to this many texts,
+# waiting at most EMBEDDING_BATCH_WAIT_MS for more requests to arrive
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
 USE_OPENAI = os.getenv("USE_OPENAI", "true").lower() == "true"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Ollama native chat endpoint, used when USE_OPENAI is false
+OLLAMA_CHAT_URL = os.getenv("OLLAMA_CHAT_URL", "http://localhost:11434/api/chat")
+
+# Map-reduce summarization: texts longer than this (in characters) are split into
+# sections that are summarized in parallel and then combined
+SUMMARY_CHUNK_CHARS = int(os.getenv("SUMMARY_CHUNK_CHARS", "8000"))
+
+# Maximum number of LLM calls running at the same time while summarizing
+SUMMARY_MAX_PARALLEL_CALLS = int(os.getenv("SUMMARY_MAX_PARALLEL_CALLS", "4"))
+
+# How a new document gets its summary and questions: "concurrent" sends both
+# requests at the same time, "merged" asks for both in one JSON request
+# (texts up to SUMMARY_CHUNK_CHARS only; longer texts fall back to concurrent)
+SUMMARY_QUESTIONS_MODE = os.getenv("SUMMARY_QUESTIONS_MODE", "concurrent").lower()
+
+# Directory of audio transcripts keyed by the SHA-256 of the audio
+TRANSCRIPT_CACHE_PATH = "./db/transcripts"
+
+# OpenAI-compatible transcription endpoint; unset uses the OpenAI API.
+# Point it to a local stand-in server to run transcription offline.
+TRANSCRIPTION_BASE_URL = os.getenv("TRANSCRIPTION_BASE_URL") or None
+TRANSCRIPTION_MODEL = os.getenv("TRANSCRIPTION_MODEL", "whisper-1")
+
+# Long recordings are cut near silences into segments of at most this many
+# seconds, transcribed in parallel and stitched back together
+TRANSCRIPTION_SEGMENT_SECONDS = int(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "300"))
+
+# Audio repeated on both sides of a cut when no silence is found near it
+TRANSCRIPTION_OVERLAP_SECONDS = float(os.getenv("TRANSCRIPTION_OVERLAP_SECONDS", "2"))
+
+# Maximum number of transcription requests running at the same time
+TRANSCRIPTION_MAX_PARALLEL_CALLS = int(os.getenv("TRANSCRIPTION_MAX_PARALLEL_CALLS", "4"))
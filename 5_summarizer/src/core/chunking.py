@@ -1,20 +1,128 @@
+import re
+import threading
 import uuid
-import nltk
-from nltk.tokenize import sent_tokenize
+from collections import deque
 
-nltk.download('punkt')
+# Separator between pages in the text of a paged document
+PAGE_SEPARATOR = "\n\n"
+
+# Set once the punkt tokenizer data has been verified (or found to be unavailable)
+_punkt_state = {"checked": False, "available": False}
+_punkt_lock = threading.Lock()
+
+def _ensure_punkt():
+    """
+    Verify the NLTK punkt data once per process, downloading it only if missing.
+
+    Returns:
+        bool: True if NLTK sentence tokenization can be used.
+    """
+    if _punkt_state["checked"]:
+        return _punkt_state["available"]
+
+    with _punkt_lock:
+        if not _punkt_state["checked"]:
+            import nltk
+            from nltk.tokenize import sent_tokenize
+
+            try:
+                sent_tokenize("Check. Check.")
+                _punkt_state["available"] = True
+            except LookupError:
+                # Recent NLTK versions use punkt_tab, older ones punkt
+                for resource in ("punkt_tab", "punkt"):
+                    nltk.download(resource, quiet=True)
+                try:
+                    sent_tokenize("Check. Check.")
+                    _punkt_state["available"] = True
+                except LookupError:
+                    print("[TextChunker] NLTK punkt data unavailable, using a simple sentence splitter.")
+            _punkt_state["checked"] = True
+
+    return _punkt_state["available"]
+
+def split_sentences(text):
+    """
+    Split text into sentences with NLTK punkt, loaded on first use.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list: Sentences.
+    """
+    if _ensure_punkt():
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+def sentence_offsets(text):
+    """
+    Split text into sentences and locate each one in the text.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list: (sentence, offset) pairs, where offset is the index of the
+            sentence's first character in text.
+    """
+    result = []
+    position = 0
+    for sentence in split_sentences(text):
+        offset = text.find(sentence, position)
+        if offset < 0:
+            # The tokenizer changed the sentence; keep the running position
+            offset = position
+        result.append((sentence, offset))
+        position = offset + len(sentence)
+    return result
 
 class TextChunker:
-    def __init__(self, chunk_size=700, chunk_overlap=200):
+    _encoding = None
+
+    def __init__(self, chunk_size=700, chunk_overlap=200, unit="chars"):
         """
         Initialize a TextChunker for breaking text into semantic chunks.
 
+        Chunks are built from whole sentences. Consecutive chunks share the
+        trailing sentences of the previous chunk, up to chunk_overlap.
+
         Args:
-            chunk_size (int, optional): Maximum number of characters per chunk. Defaults to 700.
-            chunk_overlap (int, optional): Number of characters to overlap between chunks. Defaults to 200.
+            chunk_size (int, optional): Maximum size of a chunk, in `unit`. Defaults to 700.
+            chunk_overlap (int, optional): Maximum size of the overlap between consecutive chunks,
+                in `unit`. Defaults to 200.
+            unit (str, optional): "chars" to budget by characters or "tokens" to budget by
+                model tokens (tiktoken cl100k_base). Defaults to "chars".
+
+        Raises:
+            ValueError: If the unit is unknown or the overlap is not smaller than the chunk size.
         """
+        if unit not in ("chars", "tokens"):
+            raise ValueError(f"Unknown chunk unit: {unit}")
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.unit = unit
+
+    def measure(self, text):
+        """
+        Return the size of a text in the chunker's unit.
+
+        Args:
+            text (str): Text to measure.
+
+        Returns:
+            int: Number of characters or tokens.
+        """
+        if self.unit == "chars":
+            return len(text)
+        if TextChunker._encoding is None:
+            import tiktoken
+            TextChunker._encoding = tiktoken.get_encoding("cl100k_base")
+        return len(TextChunker._encoding.encode(text, disallowed_special=()))
 
     def create_chunks(self, text, source="unknown"):
         """
@@ -29,7 +137,8 @@ class TextChunker:
                 - id: Unique identifier for the chunk
                 - chunk_index: Index of the chunk in the sequence
                 - text: The actual text content of the chunk
-                - metadata: Additional metadata about the chunk
+                - metadata: Additional metadata about the chunk, including the
+                  'char_start' and 'char_end' offsets of the chunk in the text
 
         Raises:
             TypeError: If the input text is not a string.
@@ -37,38 +146,91 @@ class TextChunker:
         if not isinstance(text, str):
             raise TypeError(f"Expected text to be str, got {type(text)}")
 
-        sentences = sent_tokenize(text)
+        return self._chunk(
+            ((sentence, None, offset) for sentence, offset in sentence_offsets(text)), source
+        )
+
+    def create_chunks_from_pages(self, pages, source="unknown"):
+        """
+        Break a paged document into chunks that record the pages they come from.
+
+        Sentences are not split at page boundaries: a chunk may span pages,
+        and its metadata holds the first and last page it covers. Character
+        offsets refer to the document text, the pages joined by PAGE_SEPARATOR.
+
+        Args:
+            pages (iterable): (page_number, text) pairs, in page order. It is
+                consumed once, so a generator that extracts pages lazily works.
+            source (str, optional): Source identifier for the document. Defaults to "unknown".
+
+        Returns:
+            list: Chunks as returned by create_chunks, with 'page_start' and
+                'page_end' in their metadata.
+        """
+        def sentences():
+            page_offset = 0
+            for page_number, page_text in pages:
+                if not isinstance(page_text, str):
+                    raise TypeError(f"Expected page text to be str, got {type(page_text)}")
+                for sentence, offset in sentence_offsets(page_text):
+                    yield sentence, page_number, page_offset + offset
+                page_offset += len(page_text) + len(PAGE_SEPARATOR)
+
+        return self._chunk(sentences(), source)
+
+    def _chunk(self, sentences, source):
+        """
+        Group (sentence, page, offset) tuples into chunks.
+
+        The current chunk is a window of sentences with a running size. When
+        the next sentence does not fit, the window is emitted and sentences are
+        dropped from its start until only the overlap remains. Each sentence is
+        added and removed once, so the work per sentence is constant.
+        """
         chunks = []
-        current_chunk, current_length = [], 0
-        chunk_index = 0
-
-        for sentence in sentences:
-            sentence_length = len(sentence)
-
-            if current_length + sentence_length > self.chunk_size:
-                chunk_text = " ".join(current_chunk).strip()
-                chunks.append({
-                    "id": str(uuid.uuid4()),
-                    "chunk_index": chunk_index,
-                    "text": chunk_text,
-                    "metadata": {"source": source}
-                })
-                chunk_index += 1
-                # Start new chunk with overlap
-                current_chunk = current_chunk[-self.chunk_overlap:] if self.chunk_overlap else []
-                current_length = sum(len(s) for s in current_chunk)
-
-            current_chunk.append(sentence)
-            current_length += sentence_length
+        window = deque()  # (sentence, page, offset, size)
+        window_size = 0
+        has_new_sentences = False
+        separator = 1 if self.unit == "chars" else 0
+
+        for sentence, page, offset in sentences:
+            sentence_size = self.measure(sentence) + separator
+
+            if has_new_sentences and window_size + sentence_size > self.chunk_size:
+                chunks.append(self._make_chunk(window, len(chunks), source))
+                has_new_sentences = False
+
+                # Keep only the trailing overlap, and leave room for the new sentence
+                while window and (
+                    window_size > self.chunk_overlap or window_size + sentence_size > self.chunk_size
+                ):
+                    window_size -= window.popleft()[3]
+
+            window.append((sentence, page, offset, sentence_size))
+            window_size += sentence_size
+            has_new_sentences = True
 
         # Last chunk
-        if current_chunk:
-            chunk_text = " ".join(current_chunk).strip()
-            chunks.append({
-                "id": str(uuid.uuid4()),
-                "chunk_index": chunk_index,
-                "text": chunk_text,
-                "metadata": {"source": source}
-            })
+        if has_new_sentences:
+            chunks.append(self._make_chunk(window, len(chunks), source))
 
         return chunks
+
+    def _make_chunk(self, window, chunk_index, source):
+        last_sentence, _, last_offset, _ = window[-1]
+        metadata = {
+            "source": source,
+            "char_start": window[0][2],
+            "char_end": last_offset + len(last_sentence)
+        }
+        pages = [page for _, page, _, _ in window if page is not None]
+        if pages:
+            metadata["page_start"] = pages[0]
+            metadata["page_end"] = pages[-1]
+
+        return {
+            "id": str(uuid.uuid4()),
+            "chunk_index": chunk_index,
+            "text": " ".join(sentence for sentence, _, _, _ in window).strip(),
+            "metadata": metadata
+        }
@@ -0,0 +1,204 @@
+from src.config import DOCUMENT_CACHE_PATH
+from src.core.chunking import PAGE_SEPARATOR
+import hashlib
+import json
+import os
+import threading
+
+def hash_bytes(data):
+    """
+    Compute the content hash used to identify a document.
+
+    Args:
+        data (bytes | str): Raw document bytes or text.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def assign_chunk_ids(chunks, doc_hash):
+    """
+    Replace random chunk IDs with IDs derived from the document hash.
+
+    The same document always produces the same IDs, so adding it to the
+    vector store twice cannot duplicate vectors.
+
+    Args:
+        chunks (list): Chunks returned by TextChunker.
+        doc_hash (str): Hash of the document.
+
+    Returns:
+        list: The same chunks, with stable IDs and the hash in their metadata.
+    """
+    for chunk in chunks:
+        chunk["id"] = f"{doc_hash[:16]}_{chunk['chunk_index']}"
+        chunk["metadata"] = {**(chunk.get("metadata") or {}), "doc_hash": doc_hash}
+    return chunks
+
+class DocumentCache:
+    def __init__(self, path=DOCUMENT_CACHE_PATH):
+        """
+        Initialize a persistent cache of processed documents, keyed by content hash.
+
+        Each entry is a JSON file holding the document's chunks, its summary,
+        the condensed text of long documents (their combined section summaries)
+        and the generated questions per question count. The text of each page of a
+        paged document is stored in a separate file and only read when a page
+        range is requested. Entries are also kept in memory, so Streamlit reruns
+        do not touch the disk.
+
+        Args:
+            path (str, optional): Directory where entries are stored.
+        """
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+        self._entries = {}
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _file(self, doc_hash):
+        return os.path.join(self.path, f"{doc_hash}.json")
+
+    def _pages_file(self, doc_hash):
+        return os.path.join(self.path, f"{doc_hash}.pages.json")
+
+    def get(self, doc_hash):
+        """
+        Return the cached entry for a document.
+
+        Args:
+            doc_hash (str): Hash of the document.
+
+        Returns:
+            dict | None: Entry with 'name', 'chunks', 'summary' and 'questions', or None.
+                Entries of summarized long documents also hold 'condensed'.
+        """
+        with self._lock:
+            entry = self._entries.get(doc_hash)
+            if entry is None and os.path.exists(self._file(doc_hash)):
+                try:
+                    with open(self._file(doc_hash), "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                    self._entries[doc_hash] = entry
+                except (OSError, ValueError) as e:
+                    print(f"[DocumentCache] Ignoring unreadable entry {doc_hash}: {e}")
+            return entry
+
+    def put(self, doc_hash, name, chunks):
+        """
+        Store the chunks of a newly processed document.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            name (str): Display name of the document.
+            chunks (list): Document chunks.
+
+        Returns:
+            dict: The new entry.
+        """
+        entry = {"name": name, "chunks": chunks, "summary": None, "questions": {}}
+        with self._lock:
+            self._entries[doc_hash] = entry
+            self._save(doc_hash, entry)
+        return entry
+
+    def update(self, doc_hash, **fields):
+        """
+        Update fields of an existing entry and persist it.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            **fields: Fields to set, e.g. summary="..."
+        """
+        with self._lock:
+            entry = self._entries[doc_hash]
+            entry.update(fields)
+            self._save(doc_hash, entry)
+
+    def set_questions(self, doc_hash, num_questions, questions):
+        """
+        Store the questions generated for a given question count.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            num_questions (int): Number of questions requested.
+            questions (list): Generated questions.
+        """
+        with self._lock:
+            entry = self._entries[doc_hash]
+            entry["questions"][str(num_questions)] = questions
+            self._save(doc_hash, entry)
+
+    def put_pages(self, doc_hash, pages):
+        """
+        Store the text of each page of a document.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            pages (list): (page_number, text) pairs, in page order, as given to the chunker.
+        """
+        pages = [(page_number, text) for page_number, text in pages]
+        with self._lock:
+            self._pages[doc_hash] = pages
+            self._write(self._pages_file(doc_hash), pages)
+
+    def get_pages(self, doc_hash, first_page=None, last_page=None):
+        """
+        Return the pages of a document within a page range.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            first_page (int, optional): First page to return. Defaults to the first page.
+            last_page (int, optional): Last page to return. Defaults to the last page.
+
+        Returns:
+            list | None: (page_number, text) pairs, or None if the document has no stored pages.
+                Pages without text are not stored, so their numbers are missing.
+        """
+        with self._lock:
+            pages = self._pages.get(doc_hash)
+            if pages is None:
+                if not os.path.exists(self._pages_file(doc_hash)):
+                    return None
+                with open(self._pages_file(doc_hash), "r", encoding="utf-8") as f:
+                    pages = [tuple(page) for page in json.load(f)]
+                self._pages[doc_hash] = pages
+
+        return [
+            (page_number, text) for page_number, text in pages
+            if (first_page is None or page_number >= first_page)
+            and (last_page is None or page_number <= last_page)
+        ]
+
+    def get_text(self, doc_hash, first_page=None, last_page=None):
+        """
+        Return the text of a page range of a document.
+
+        The pages are joined with PAGE_SEPARATOR, so for the whole document the
+        'char_start' and 'char_end' offsets of its chunks index into the result.
+
+        Args:
+            doc_hash (str): Hash of the document.
+            first_page (int, optional): First page. Defaults to the first page.
+            last_page (int, optional): Last page. Defaults to the last page.
+
+        Returns:
+            str | None: The text, or None if the document has no stored pages.
+        """
+        pages = self.get_pages(doc_hash, first_page, last_page)
+        if pages is None:
+            return None
+        return PAGE_SEPARATOR.join(text for _, text in pages)
+
+    def _save(self, doc_hash, entry):
+        self._write(self._file(doc_hash), entry)
+
+    def _write(self, file, data):
+        # Write to a temporary file first so a crash never leaves a partial entry
+        tmp_file = file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, file)
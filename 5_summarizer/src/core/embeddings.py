@@ -0,0 +1,211 @@
+from src.config import (
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_MAX_BATCH,
+    EMBEDDING_ONNX_THREADS,
+    EMBEDDING_QUANTIZED,
+)
+from concurrent.futures import Future
+from functools import cached_property
+import os
+import queue
+import threading
+import numpy as np
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+class BatchedEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    Chroma's default ONNX MiniLM embedding function, served by one worker thread.
+
+    Calls from any thread are put on a queue. The worker takes the waiting
+    requests, up to max_batch texts, and embeds them in one model run, so
+    concurrent users share batches instead of running the model one request
+    at a time. The name and vector space are those of the default function,
+    so existing collections keep working.
+    """
+
+    def __init__(self, intra_op_threads=EMBEDDING_ONNX_THREADS, quantized=EMBEDDING_QUANTIZED,
+                 max_batch=EMBEDDING_MAX_BATCH, batch_wait_ms=EMBEDDING_BATCH_WAIT_MS):
+        """
+        Initialize the embedding function. The model is loaded on first use.
+
+        Args:
+            intra_op_threads (int, optional): ONNX Runtime threads per model run. 0 lets ONNX Runtime decide.
+            quantized (bool, optional): Use an int8 copy of the model, created on first use.
+                Requires the onnx package.
+            max_batch (int, optional): Maximum number of texts embedded in one model run.
+            batch_wait_ms (float, optional): How long the worker waits for more requests
+                before running a batch that is not full.
+        """
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        self.intra_op_threads = intra_op_threads
+        self.quantized = quantized
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    @staticmethod
+    def name():
+        # Same name as chroma's DefaultEmbeddingFunction, which created the existing collections
+        return "default"
+
+    def collection_name(self, base_name):
+        """
+        Return the collection that holds the vectors of this model.
+
+        The int8 model gives slightly different vectors, so it uses its own
+        collection instead of mixing them with the float32 ones.
+
+        Args:
+            base_name (str): Collection name used with the float32 model.
+
+        Returns:
+            str: The collection name.
+        """
+        return f"{base_name}_int8" if self.quantized else base_name
+
+    @cached_property
+    def tokenizer(self):
+        tokenizer = self.Tokenizer.from_file(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "tokenizer.json")
+        )
+        tokenizer.enable_truncation(max_length=self.max_tokens())
+        # No fixed length: _forward pads each batch to its longest text
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        return tokenizer
+
+    def _forward(self, documents, batch_size=32):
+        """
+        Embed texts in batches, each padded only to its longest text.
+
+        Same computation as the parent class, which pads every text to 256
+        tokens. Mean pooling ignores padded positions, so the vectors match
+        those of the default function.
+
+        Args:
+            documents (list): Texts to embed.
+            batch_size (int, optional): Maximum number of texts per model run.
+
+        Returns:
+            np.ndarray: One normalized float32 vector per text.
+        """
+        all_embeddings = []
+        for i in range(0, len(documents), batch_size):
+            encoded = self.tokenizer.encode_batch(documents[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+
+            last_hidden_state = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+
+            # Mean pooling over the real tokens
+            mask = np.expand_dims(attention_mask, -1).astype(last_hidden_state.dtype)
+            embeddings = np.sum(last_hidden_state * mask, 1) / np.clip(mask.sum(1), a_min=1e-9, a_max=None)
+            all_embeddings.append(self._normalize(embeddings).astype(np.float32))
+
+        return np.concatenate(all_embeddings)
+
+    @cached_property
+    def model(self):
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.intra_op_num_threads = self.intra_op_threads
+        # Batches run one at a time, so there is no parallelism between operators to use
+        so.inter_op_num_threads = 1
+
+        return self.ort.InferenceSession(self._model_path(), providers=self._preferred_providers, sess_options=so)
+
+    def _model_path(self):
+        model_dir = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        model_path = os.path.join(model_dir, "model.onnx")
+        if not self.quantized:
+            return model_path
+
+        quantized_path = os.path.join(model_dir, "model_int8.onnx")
+        if not os.path.exists(quantized_path):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError as e:
+                print(f"[Embeddings] Cannot quantize the model, using float32: {e}")
+                return model_path
+            tmp_path = quantized_path + ".tmp"
+            quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+            print("[Embeddings] Created int8 model.")
+        return quantized_path
+
+    def __call__(self, input):
+        """
+        Embed texts, batched with the requests of other threads.
+
+        Args:
+            input (list): Texts to embed.
+
+        Returns:
+            list: One float32 vector per text.
+        """
+        if not input:
+            return []
+        self._ensure_worker()
+        future = Future()
+        self._requests.put((list(input), future))
+        return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    # Load the model before serving, so the first batch is not delayed by it
+                    self._download_model_if_not_exists()
+                    self.model
+                    self._worker = threading.Thread(target=self._serve, name="embedding-worker", daemon=True)
+                    self._worker.start()
+
+    def _serve(self):
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0][0])
+
+            # Take the requests that arrive in the next moment, up to max_batch texts
+            while size < self.max_batch:
+                try:
+                    request = self._requests.get(timeout=self.batch_wait)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+
+            texts = [text for texts, _ in batch for text in texts]
+            try:
+                embeddings = self._forward(texts, batch_size=self.max_batch)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for request_texts, future in batch:
+                future.set_result(list(embeddings[start:start + len(request_texts)]))
+                start += len(request_texts)
+
+_shared_embedding_fn = None
+_shared_lock = threading.Lock()
+
+def get_embedding_function():
+    """
+    Return the process-wide embedding function, creating it on first use.
+
+    Returns:
+        BatchedEmbeddingFunction: The shared embedding function.
+    """
+    global _shared_embedding_fn
+    if _shared_embedding_fn is None:
+        with _shared_lock:
+            if _shared_embedding_fn is None:
+                _shared_embedding_fn = BatchedEmbeddingFunction()
+    return _shared_embedding_fn
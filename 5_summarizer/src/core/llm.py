@@ -1,10 +1,37 @@
+import asyncio
+import json
 import os
+import threading
+import weakref
+import httpx
 import requests
-from openai import OpenAI
-from src.config import USE_OPENAI, OPENAI_API_KEY
+from requests.adapters import HTTPAdapter
+from openai import AsyncOpenAI, OpenAI
+from src.config import USE_OPENAI, OPENAI_API_KEY, OLLAMA_CHAT_URL
+
+# Keep-alive connections kept per backend host
+POOL_SIZE = 16
 
 class LLMClient:
+    # Transports shared by every LLMClient in the process
+    _shared = {}
+    # Async transports, one set per event loop: their pools cannot be used from another loop
+    _async_shared = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
     def __init__(self, use_openai=USE_OPENAI):
+        """
+        Initialize an LLM client for OpenAI or a local Ollama server.
+
+        HTTP connections are pooled and shared by all clients in the process,
+        so consecutive calls reuse warm keep-alive connections.
+
+        Args:
+            use_openai (bool, optional): Whether to use OpenAI instead of Ollama.
+
+        Raises:
+            ValueError: If OpenAI is selected and OPENAI_API_KEY is not defined.
+        """
         self.use_openai = use_openai
         self.model = "gpt-4o" if self.use_openai else "llama3.2:1b"
 
@@ -12,22 +39,191 @@ class LLMClient:
             if not OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY not defined.")
             os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
-            self.client = OpenAI()
+            self.client = self._get_shared("openai", lambda: OpenAI(
+                http_client=httpx.Client(limits=self._limits(), timeout=httpx.Timeout(120.0, connect=5.0))
+            ))
         else:
-            self.ollama_url = "http://localhost:11434/api/chat"
+            self.ollama_url = OLLAMA_CHAT_URL
+            self.session = self._get_shared("ollama_session", self._create_session)
+
+    @staticmethod
+    def _limits():
+        return httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def _get_shared(cls, name, factory):
+        if name not in cls._shared:
+            with cls._lock:
+                if name not in cls._shared:
+                    cls._shared[name] = factory()
+        return cls._shared[name]
+
+    @property
+    def async_client(self):
+        """
+        Async OpenAI client or Ollama httpx client of the running event loop.
+
+        Each loop gets its own pooled client, created on first use and dropped
+        with the loop, so successive asyncio.run calls never share a pool.
+        """
+        loop = asyncio.get_running_loop()
+        name = "openai" if self.use_openai else "ollama"
+        with self._lock:
+            clients = self._async_shared.setdefault(loop, {})
+            if name not in clients:
+                http_client = httpx.AsyncClient(limits=self._limits(), timeout=httpx.Timeout(120.0, connect=5.0))
+                clients[name] = AsyncOpenAI(http_client=http_client) if self.use_openai else http_client
+            return clients[name]
+
+    def _ollama_payload(self, messages, stream, json_mode=False):
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream
+        }
+        if json_mode:
+            payload["format"] = "json"
+        return payload
 
-    def chat(self, messages, max_tokens=500):
+    def chat(self, messages, max_tokens=500, json_mode=False):
+        """
+        Send a chat request and return the full answer.
+
+        Args:
+            messages (list): Chat messages.
+            max_tokens (int, optional): Maximum number of tokens to generate, for OpenAI. Ollama
+                keeps its own limit. Defaults to 500.
+            json_mode (bool, optional): Constrain the answer to a JSON object. The prompt
+                must still ask for JSON. Defaults to False.
+
+        Returns:
+            str: The model's answer.
+        """
         if self.use_openai:
+            extra = {"response_format": {"type": "json_object"}} if json_mode else {}
             res = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **extra
             )
             return res.choices[0].message.content.strip()
         else:
-            res = requests.post(
+            res = self.session.post(
                 self.ollama_url,
-                json={"model": self.model, "messages": messages, "stream": False}
+                json=self._ollama_payload(messages, stream=False, json_mode=json_mode)
             )
             data = res.json()
             return data.get("message", {}).get("content", "").strip()
+
+    def stream_chat(self, messages, max_tokens=500):
+        """
+        Send a chat request and yield the answer as it is generated.
+
+        Args:
+            messages (list): Chat messages.
+            max_tokens (int, optional): Maximum number of tokens to generate, for OpenAI. Ollama
+                keeps its own limit. Defaults to 500.
+
+        Yields:
+            str: Pieces of the answer, in order.
+        """
+        if self.use_openai:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            # Ollama streams one JSON object per line
+            with self.session.post(
+                self.ollama_url,
+                json=self._ollama_payload(messages, stream=True),
+                stream=True
+            ) as res:
+                for line in res.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        break
+
+    async def achat(self, messages, max_tokens=500, json_mode=False):
+        """
+        Async version of chat.
+
+        Args:
+            messages (list): Chat messages.
+            max_tokens (int, optional): Maximum number of tokens to generate, for OpenAI. Ollama
+                keeps its own limit. Defaults to 500.
+            json_mode (bool, optional): See chat. Defaults to False.
+
+        Returns:
+            str: The model's answer.
+        """
+        if self.use_openai:
+            extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+            res = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                **extra
+            )
+            return res.choices[0].message.content.strip()
+        else:
+            res = await self.async_client.post(
+                self.ollama_url,
+                json=self._ollama_payload(messages, stream=False, json_mode=json_mode)
+            )
+            return res.json().get("message", {}).get("content", "").strip()
+
+    async def astream_chat(self, messages, max_tokens=500):
+        """
+        Async version of stream_chat.
+
+        Args:
+            messages (list): Chat messages.
+            max_tokens (int, optional): Maximum number of tokens to generate, for OpenAI. Ollama
+                keeps its own limit. Defaults to 500.
+
+        Yields:
+            str: Pieces of the answer, in order.
+        """
+        if self.use_openai:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            async with self.async_client.stream(
+                "POST", self.ollama_url, json=self._ollama_payload(messages, stream=True)
+            ) as res:
+                async for line in res.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        break
@@ -1,6 +1,6 @@
 from src.config import CHROMA_PERSIST_PATH, VECTOR_STORE_COLLECTION
+from src.core.embeddings import get_embedding_function
 import chromadb
-from chromadb.utils import embedding_functions
 import os
 
 class VectorStore:
@@ -9,17 +9,19 @@ class VectorStore:
         Initialize a persistent vector store using ChromaDB.
 
         Creates a directory for persistent storage and sets up a collection
-        with a default embedding function. Handles potential errors by 
+        with the process-wide embedding function, so every store shares one
+        loaded model and its batches. Handles potential errors by 
         attempting to reset and recreate the collection if needed.
         """
         os.makedirs(CHROMA_PERSIST_PATH, exist_ok=True)
         self.client = chromadb.PersistentClient(path=CHROMA_PERSIST_PATH)
-        self.embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+        self.embedding_fn = get_embedding_function()
+        self.collection_name = self.embedding_fn.collection_name(VECTOR_STORE_COLLECTION)
 
         try:
             # Force collection creation, create if it doesn't exist
             self.collection = self.client.get_or_create_collection(
-                name=VECTOR_STORE_COLLECTION, embedding_function=self.embedding_fn
+                name=self.collection_name, embedding_function=self.embedding_fn
             )
         except ValueError as e:
             print(f"[VectorStore] Error accessing collection, attempting to reset: {e}")
@@ -34,7 +36,7 @@ class VectorStore:
         """
         self.client.reset()  # clear all collections
         self.collection = self.client.get_or_create_collection(
-            name=VECTOR_STORE_COLLECTION, embedding_function=self.embedding_fn
+            name=self.collection_name, embedding_function=self.embedding_fn
         )
         print("[VectorStore] Collection recreated after reset.")
 
@@ -55,6 +57,18 @@ class VectorStore:
             metadatas=[c["metadata"] for c in chunks]
         )
 
+    def has_document(self, doc_hash):
+        """
+        Check whether the chunks of a document are already stored.
+
+        Args:
+            doc_hash (str): Hash of the document, stored in the chunk metadata.
+
+        Returns:
+            bool: True if at least one chunk of the document exists.
+        """
+        return bool(self.collection.get(where={"doc_hash": doc_hash}, limit=1, include=[])["ids"])
+
     def query(self, query, n_results=3):
         """
         Perform a similarity search in the vector store.
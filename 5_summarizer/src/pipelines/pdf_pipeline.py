@@ -10,23 +10,27 @@ def clean_text(text):
     text = re.sub(r'\s+([.,!?;])', r'\1', text)
     return text.strip()
 
-def process_pdf_file(pdf_stream):
-    """Read PDF and return clean chunks with metadata"""
-    chunker = TextChunker()
-
+def iter_pdf_pages(pdf_stream):
+    """Yield (page_number, clean text) for each page with text, extracting one page at a time"""
     reader = PdfReader(pdf_stream)
-    all_text = ""
-    page_chunks = []
-
     for page_number, page in enumerate(reader.pages, start=1):
-        page_text = page.extract_text() or ""
-        page_text = clean_text(page_text)
-
+        page_text = clean_text(page.extract_text() or "")
         if page_text:
-            all_text += page_text + "\n\n"
-            page_chunks.append({"page": page_number, "text": page_text})
+            yield page_number, page_text
+
+def process_pdf_file(pdf_stream):
+    """Read PDF and return clean chunks with metadata and the text of each page"""
+    chunker = TextChunker()
+    pages = []
 
-    # Create semantic chunks of the entire document (avoid page-by-page cutting)
-    chunks = chunker.create_chunks(all_text, source=getattr(pdf_stream, "name", "uploaded_file.pdf"))
+    def extracted_pages():
+        # Pages are chunked as they are extracted and kept for the page store
+        for page in iter_pdf_pages(pdf_stream):
+            pages.append(page)
+            yield page
 
-    return chunks
+    # Create semantic chunks across pages (avoid page-by-page cutting), keeping page numbers
+    chunks = chunker.create_chunks_from_pages(
+        extracted_pages(), source=getattr(pdf_stream, "name", "uploaded_file.pdf")
+    )
+    return chunks, pages
@@ -23,21 +23,40 @@ class RAG:
         """
         self.vector_store.add_documents(chunks)
 
-    def query_and_respond(self, query, n_results=3):
+    def add_document(self, doc_hash, chunks):
         """
-        Retrieve relevant context and generate a response to the query.
+        Add the chunks of a document unless they are already stored.
 
         Args:
-            query (str): The user's query.
-            n_results (int, optional): Number of context documents to retrieve. Defaults to 3.
+            doc_hash (str): Hash of the document.
+            chunks (list): Chunks with IDs from assign_chunk_ids.
 
         Returns:
-            str: Generated response based on the retrieved context.
+            bool: True if the chunks were added, False if the document was already stored.
         """
+        if self.vector_store.has_document(doc_hash):
+            return False
+        self.vector_store.add_documents(chunks)
+        return True
+
+    @staticmethod
+    def _cite(doc, metadata):
+        """Prefixes a retrieved chunk with the pages it comes from, when known."""
+        metadata = metadata or {}
+        if "page_start" not in metadata:
+            return doc
+        if metadata["page_start"] == metadata["page_end"]:
+            return f"[page {metadata['page_start']}] {doc}"
+        return f"[pages {metadata['page_start']}-{metadata['page_end']}] {doc}"
+
+    def _messages(self, query, n_results):
         result = self.vector_store.query(query, n_results=n_results)
-        context = "\n".join(doc for doc in result["documents"][0])
+        context = "\n".join(
+            self._cite(doc, metadata) for doc, metadata in zip(result["documents"][0], result["metadatas"][0])
+        )
         prompt = f"""Based on the context below, answer the question. 
                     If no answer is found, reply with 'I don't know'.
+                    When the context gives page numbers, cite the pages you used.
 
                     Context:
                     {context}
@@ -46,8 +65,33 @@ class RAG:
                     {query}
 
                     Answer:"""
-        messages = [
+        return [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt}
         ]
-        return self.llm.chat(messages)
+
+    def query_and_respond(self, query, n_results=3):
+        """
+        Retrieve relevant context and generate a response to the query.
+
+        Args:
+            query (str): The user's query.
+            n_results (int, optional): Number of context documents to retrieve. Defaults to 3.
+
+        Returns:
+            str: Generated response based on the retrieved context.
+        """
+        return self.llm.chat(self._messages(query, n_results))
+
+    def stream_response(self, query, n_results=3):
+        """
+        Retrieve relevant context and yield the response as it is generated.
+
+        Args:
+            query (str): The user's query.
+            n_results (int, optional): Number of context documents to retrieve. Defaults to 3.
+
+        Yields:
+            str: Pieces of the response, in order.
+        """
+        yield from self.llm.stream_chat(self._messages(query, n_results))
@@ -1,44 +1,228 @@
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.core.chunking import TextChunker
 from src.core.llm import LLMClient
+from src.config import SUMMARY_CHUNK_CHARS, SUMMARY_MAX_PARALLEL_CALLS, SUMMARY_QUESTIONS_MODE
 
 class Summarizer:
-    def __init__(self, use_openai=True):
+    def __init__(self, use_openai=True, chunk_chars=SUMMARY_CHUNK_CHARS, max_parallel_calls=SUMMARY_MAX_PARALLEL_CALLS):
         """
         Initialize the Summarizer with an LLM client.
 
         Args:
             use_openai (bool, optional): Whether to use OpenAI's LLM. Defaults to True.
+            chunk_chars (int, optional): Longest text summarized in a single LLM call.
+                Longer texts are summarized section by section (map-reduce).
+            max_parallel_calls (int, optional): Maximum number of concurrent LLM calls.
         """
         self.llm = LLMClient(use_openai=use_openai)
+        self.chunk_chars = chunk_chars
+        self.max_parallel_calls = max_parallel_calls
 
-    def generate_summary(self, text, max_words=200):
+    def _summary_messages(self, text, max_words, instruction="Summarize this text"):
+        prompt = f"{instruction} in under {max_words} words:\n\n{text}"
+        return [
+            {"role": "system", "content": "You are a helpful assistant that summarizes text."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _summarize(self, text, max_words, instruction="Summarize this text"):
+        return self.llm.chat(self._summary_messages(text, max_words, instruction), max_tokens=max_words)
+
+    def _split(self, text):
+        """Splits text into sentence-aligned sections of at most chunk_chars characters."""
+        chunker = TextChunker(chunk_size=self.chunk_chars, chunk_overlap=0)
+        return [chunk["text"] for chunk in chunker.create_chunks(text, source="summary")]
+
+    def _map(self, sections, max_words, instruction, progress_callback=None, level=0):
+        """Summarizes sections concurrently, keeping their order."""
+        partials = [None] * len(sections)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel_calls, len(sections)))) as executor:
+            futures = {
+                executor.submit(self._summarize, section, max_words, instruction): i
+                for i, section in enumerate(sections)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                partials[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(done, len(sections), level)
+        return partials
+
+    def condense(self, text, max_words=200, progress_callback=None):
+        """
+        Shrink a text until it fits in one LLM call.
+
+        Texts up to chunk_chars characters are returned as they are. Longer
+        texts are split into sections that are summarized in parallel (map),
+        then the partial summaries are combined and summarized again until they
+        fit in one call (reduce). The number of rounds grows with the logarithm
+        of the text length.
+
+        Args:
+            text (str): The text to condense.
+            max_words (int, optional): Maximum number of words of each section summary. Defaults to 200.
+            progress_callback (callable, optional): See generate_summary.
+
+        Returns:
+            tuple: (text, reduced), where reduced is True if the text was replaced
+                by its combined section summaries.
+        """
+        if len(text) <= self.chunk_chars:
+            return text, False
+
+        sections = self._split(text)
+        partials = self._map(sections, max_words, "Summarize this section of a longer document", progress_callback)
+
+        level = 1
+        combined = "\n\n".join(partials)
+        while len(combined) > self.chunk_chars:
+            sections = self._split(combined)
+            if len(sections) >= len(partials):
+                # The partial summaries no longer shrink; cut them to one call
+                combined = combined[:self.chunk_chars]
+                break
+            partials = self._map(
+                sections, max_words, "Combine these partial summaries of a longer document", progress_callback, level
+            )
+            combined = "\n\n".join(partials)
+            level += 1
+
+        return combined, True
+
+    def _final_summary_messages(self, text, max_words, progress_callback=None, reduced=False):
+        """Run the map-reduce steps, unless already done, and return the messages of the final summary call."""
+        if not reduced:
+            text, reduced = self.condense(text, max_words, progress_callback)
+        if not reduced:
+            return self._summary_messages(text, max_words)
+        return self._summary_messages(
+            text, max_words, "Combine these partial summaries of a document into one summary"
+        )
+
+    def generate_summary(self, text, max_words=200, progress_callback=None, reduced=False):
         """
         Generate a concise summary of the given text.
 
+        Long texts are summarized hierarchically (map-reduce), see condense.
+
         Args:
             text (str): The text to be summarized.
             max_words (int, optional): Maximum number of words in the summary. Defaults to 200.
+            progress_callback (callable, optional): Called as callback(done, total, level)
+                after each section summary. Level 0 is the map step, higher levels are reduce steps.
+            reduced (bool, optional): The text is already condensed, as returned by
+                condense with reduced=True. Defaults to False.
 
         Returns:
             str: A summary of the text.
         """
-        prompt = f"Summarize this text in under {max_words} words:\n\n{text}"
+        messages = self._final_summary_messages(text, max_words, progress_callback, reduced)
+        return self.llm.chat(messages, max_tokens=max_words)
+
+    def stream_summary(self, text, max_words=200, progress_callback=None, reduced=False):
+        """
+        Generate a summary, yielding the final answer as it is generated.
+
+        For long texts the map-reduce steps run first; only the final call is streamed.
+
+        Args:
+            text (str): The text to be summarized.
+            max_words (int, optional): Maximum number of words in the summary. Defaults to 200.
+            progress_callback (callable, optional): See generate_summary.
+            reduced (bool, optional): See generate_summary.
+
+        Yields:
+            str: Pieces of the summary, in order.
+        """
+        messages = self._final_summary_messages(text, max_words, progress_callback, reduced)
+        yield from self.llm.stream_chat(messages, max_tokens=max_words)
+
+    def can_merge(self, text):
+        """Whether summary and questions for the text can be generated by one request."""
+        return len(text) <= self.chunk_chars
+
+    def generate_summary_and_questions(self, text, num_questions=5, max_words=200,
+                                       progress_callback=None, mode=SUMMARY_QUESTIONS_MODE):
+        """
+        Generate the summary and the study questions of a text.
+
+        In "concurrent" mode a long text is first condensed (see condense), then
+        the summary and questions requests run at the same time on the result,
+        so the total latency is that of the slower one. With max_parallel_calls
+        below 2 they run one after the other. In "merged" mode a single JSON request
+        returns both and the text is sent once. Texts too long for one call, or
+        merged answers that cannot be parsed, use the concurrent requests.
+
+        Args:
+            text (str): The text to process.
+            num_questions (int, optional): Number of questions to generate. Defaults to 5.
+            max_words (int, optional): Maximum number of words in the summary. Defaults to 200.
+            progress_callback (callable, optional): See generate_summary.
+            mode (str, optional): "concurrent" or "merged". Defaults to SUMMARY_QUESTIONS_MODE.
+
+        Returns:
+            tuple: (summary, questions), as returned by generate_summary and generate_questions.
+        """
+        if mode == "merged" and self.can_merge(text):
+            result = self._generate_merged(text, num_questions, max_words)
+            if result is not None:
+                return result
+
+        # Long texts are condensed once; both requests then use the section summaries
+        condensed, reduced = self.condense(text, max_words, progress_callback)
+        if self.max_parallel_calls < 2:
+            return (
+                self.generate_summary(condensed, max_words, reduced=reduced),
+                self.generate_questions(condensed, num_questions)
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            questions = executor.submit(self.generate_questions, condensed, num_questions)
+            summary = self.generate_summary(condensed, max_words, reduced=reduced)
+            return summary, questions.result()
+
+    def _generate_merged(self, text, num_questions, max_words):
+        """Asks for summary and questions in one JSON request. Returns None if the answer is unusable."""
+        prompt = (
+            f"Read the text below and return a JSON object with two keys:\n"
+            f'- "summary": a summary of the text in under {max_words} words\n'
+            f'- "questions": a list of {num_questions} exam-style study questions, '
+            f'each an object with "question" and "answer"\n\n{text}'
+        )
         messages = [
-            {"role": "system", "content": "You are a helpful assistant that summarizes text."},
+            {"role": "system", "content": "You summarize text and create exam-style study questions. Reply in JSON."},
             {"role": "user", "content": prompt}
         ]
-        return self.llm.chat(messages, max_tokens=max_words)
+        raw = self.llm.chat(messages, max_tokens=max_words * 2 + num_questions * 120, json_mode=True)
+
+        try:
+            data = json.loads(raw)
+            summary = data["summary"].strip()
+            questions = [
+                {"question": str(q["question"]).strip(), "answer": str(q["answer"]).strip()}
+                for q in data["questions"]
+            ]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"[Summarizer] Could not parse merged answer, using separate requests: {e}")
+            return None
+        return summary, questions[:num_questions]
 
-    def generate_questions(self, text, num_questions=5):
+    def generate_questions(self, text, num_questions=5, progress_callback=None):
         """
         Generate study questions with answers based on the given text.
 
+        Texts longer than chunk_chars are condensed first (see condense), so the
+        prompt always fits in one call.
+
         Args:
             text (str): The text to generate questions from.
             num_questions (int, optional): Number of questions to generate. Defaults to 5.
+            progress_callback (callable, optional): See generate_summary.
 
         Returns:
             list: A list of dictionaries containing questions and answers.
         """
+        text, _ = self.condense(text, progress_callback=progress_callback)
         prompt = f"Generate {num_questions} study questions with answers based on this text:\n\n{text}"
         messages = [
             {"role": "system", "content": "You create exam-style study questions."},
@@ -1,29 +1,257 @@
 import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-from src.config import OPENAI_API_KEY
+from src.config import (
+    OPENAI_API_KEY,
+    TRANSCRIPT_CACHE_PATH,
+    TRANSCRIPTION_BASE_URL,
+    TRANSCRIPTION_MAX_PARALLEL_CALLS,
+    TRANSCRIPTION_MODEL,
+    TRANSCRIPTION_OVERLAP_SECONDS,
+    TRANSCRIPTION_SEGMENT_SECONDS,
+)
+from src.core.document_cache import hash_bytes
+
+# Segments are sent as 16 kHz mono WAV: 5 minutes take about 9.6 MB,
+# well under the 25 MB upload limit of the transcription API
+SEGMENT_FRAME_RATE = 16000
+
+# Silences shorter than this (ms) are not used as cut points
+MIN_SILENCE_MS = 400
+
+# Longest run of words compared when removing text repeated across a cut
+MAX_OVERLAP_WORDS = 40
+
+def split_audio(audio, segment_ms, overlap_ms, min_silence_ms=MIN_SILENCE_MS):
+    """
+    Split audio into segments of at most segment_ms, cutting inside silences.
+
+    For each cut, the second half of the remaining window is searched for
+    silences and the cut is placed in the middle of the last one, so no word
+    is split. If the window has no silence, the cut is made at segment_ms and
+    the next segment starts overlap_ms earlier, so the words at the cut are
+    heard whole by at least one of the two segments.
+
+    Args:
+        audio (AudioSegment): Audio to split.
+        segment_ms (int): Maximum segment length, in milliseconds.
+        overlap_ms (int): Overlap at cuts made outside silences, in milliseconds.
+        min_silence_ms (int, optional): Shortest silence used as a cut point.
+
+    Returns:
+        list: (start_ms, end_ms, overlaps_previous) tuples covering the audio, in order.
+
+    Raises:
+        ValueError: If the overlap is not smaller than the segment length.
+    """
+    if overlap_ms >= segment_ms:
+        # The next segment would not start after the previous one
+        raise ValueError("overlap_ms must be smaller than segment_ms")
+
+    from pydub.silence import detect_silence
+
+    # Silence is relative to the recording's loudness
+    silence_thresh = audio.dBFS - 16
+    segments = []
+    start, overlaps_previous = 0, False
+
+    while len(audio) - start > segment_ms:
+        window_start = start + segment_ms // 2
+        window = audio[window_start:start + segment_ms]
+        silences = detect_silence(
+            window, min_silence_len=min_silence_ms, silence_thresh=silence_thresh, seek_step=10
+        )
+        if silences:
+            silence_start, silence_end = silences[-1]
+            cut = window_start + (silence_start + silence_end) // 2
+            segments.append((start, cut, overlaps_previous))
+            start, overlaps_previous = cut, False
+        else:
+            cut = start + segment_ms
+            segments.append((start, cut, overlaps_previous))
+            start, overlaps_previous = cut - overlap_ms, True
+
+    segments.append((start, len(audio), overlaps_previous))
+    return segments
+
+def _normalize(word):
+    return re.sub(r"[^\w]", "", word.lower())
+
+def stitch_transcripts(texts, overlaps):
+    """
+    Join segment transcripts, removing words repeated across overlapping cuts.
+
+    Where two segments overlap, the longest run of words that ends the first
+    transcript and starts the second one is kept only once. The first word or
+    two of the second transcript may be a word cut in half by the overlap, so
+    they can be skipped when looking for the repeated run.
+
+    Args:
+        texts (list): Transcript of each segment, in order.
+        overlaps (list): For each segment, whether it overlaps the previous one.
+
+    Returns:
+        str: The full transcript.
+    """
+    words = []
+    for text, overlaps_previous in zip(texts, overlaps):
+        new_words = text.split()
+        if overlaps_previous and words and new_words:
+            tail = [_normalize(w) for w in words[-MAX_OVERLAP_WORDS:]]
+            head = [_normalize(w) for w in new_words[:MAX_OVERLAP_WORDS + 2]]
+            drop = 0
+            for skip in range(3):
+                for size in range(min(len(tail), len(head) - skip), 0, -1):
+                    if tail[-size:] == head[skip:skip + size]:
+                        drop = skip + size
+                        break
+                if drop:
+                    break
+            new_words = new_words[drop:]
+        words.extend(new_words)
+    return " ".join(words)
+
+class TranscriptCache:
+    def __init__(self, path=TRANSCRIPT_CACHE_PATH):
+        """
+        Initialize a persistent cache of transcripts, keyed by audio hash.
+
+        Args:
+            path (str, optional): Directory where transcripts are stored.
+        """
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _file(self, audio_hash):
+        return os.path.join(self.path, f"{audio_hash}.txt")
+
+    def get(self, audio_hash):
+        """
+        Return the cached transcript of an audio, or None.
+
+        Args:
+            audio_hash (str): Hash of the audio bytes.
+
+        Returns:
+            str | None: The transcript.
+        """
+        with self._lock:
+            text = self._entries.get(audio_hash)
+            if text is None and os.path.exists(self._file(audio_hash)):
+                with open(self._file(audio_hash), "r", encoding="utf-8") as f:
+                    text = f.read()
+                self._entries[audio_hash] = text
+            return text
+
+    def put(self, audio_hash, text):
+        """
+        Store the transcript of an audio.
+
+        Args:
+            audio_hash (str): Hash of the audio bytes.
+            text (str): The transcript.
+        """
+        with self._lock:
+            self._entries[audio_hash] = text
+            # Write to a temporary file first so a crash never leaves a partial entry
+            tmp_file = self._file(audio_hash) + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_file, self._file(audio_hash))
 
 class TranscriptionService:
-    def __init__(self):
+    def __init__(self, base_url=TRANSCRIPTION_BASE_URL, model=TRANSCRIPTION_MODEL,
+                 segment_seconds=TRANSCRIPTION_SEGMENT_SECONDS, overlap_seconds=TRANSCRIPTION_OVERLAP_SECONDS,
+                 max_parallel_calls=TRANSCRIPTION_MAX_PARALLEL_CALLS, cache=None):
         """
         Initialize the transcription service with OpenAI's API key.
         Uses the Whisper model for audio transcription.
+
+        Recordings longer than segment_seconds are split near silences and the
+        segments are transcribed in parallel. Transcripts are cached by the hash
+        of the audio, so the same recording is only transcribed once.
+
+        Args:
+            base_url (str, optional): OpenAI-compatible API URL. None uses the OpenAI API.
+            model (str, optional): Transcription model. Defaults to TRANSCRIPTION_MODEL.
+            segment_seconds (int, optional): Maximum length of a segment, in seconds.
+            overlap_seconds (float, optional): Overlap at cuts made outside silences, in seconds.
+            max_parallel_calls (int, optional): Maximum number of concurrent requests.
+            cache (TranscriptCache, optional): Transcript cache. Defaults to one at TRANSCRIPT_CACHE_PATH.
+
+        Raises:
+            ValueError: If the overlap is not smaller than the segment length.
         """
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        if overlap_seconds >= segment_seconds:
+            raise ValueError("overlap_seconds must be smaller than segment_seconds")
 
-    def transcribe(self, audio_bytes: bytes) -> str:
+        # A local stand-in server does not need a real key
+        api_key = OPENAI_API_KEY or ("local" if base_url else None)
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.model = model
+        self.segment_ms = int(segment_seconds * 1000)
+        self.overlap_ms = int(overlap_seconds * 1000)
+        self.max_parallel_calls = max_parallel_calls
+        self.cache = cache or TranscriptCache()
+
+    def transcribe(self, audio_bytes) -> str:
         """
         Transcribe audio bytes to text using OpenAI's Whisper model.
 
         Args:
-            audio_bytes (bytes): Raw audio data to be transcribed.
+            audio_bytes (bytes | file-like): Raw audio data to be transcribed.
 
         Returns:
             str: Transcribed text from the audio.
         """
-        audio_file = ("recorded_audio.wav", audio_bytes)
+        if hasattr(audio_bytes, "read"):
+            audio_bytes = audio_bytes.read()
+
+        audio_hash = hash_bytes(audio_bytes)
+        text = self.cache.get(audio_hash)
+        if text is None:
+            text = self._transcribe_long(audio_bytes)
+            self.cache.put(audio_hash, text)
+        return text
 
+    def _request(self, audio_bytes, filename="recorded_audio.wav"):
         transcript = self.client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file
+            model=self.model,
+            file=(filename, audio_bytes)
         )
-        return transcript.text
+        return transcript.text.strip()
+
+    def _transcribe_long(self, audio_bytes):
+        from pydub import AudioSegment
+
+        try:
+            # WAV (the microphone format) is read natively, other formats need ffmpeg
+            audio_format = "wav" if audio_bytes[:4] == b"RIFF" else None
+            audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=audio_format)
+        except Exception as e:
+            # Without a decoder the recording can only be sent as it is
+            print(f"[TranscriptionService] Could not decode audio, sending it whole: {e}")
+            return self._request(audio_bytes)
+
+        if len(audio) <= self.segment_ms:
+            return self._request(audio_bytes)
+
+        segments = split_audio(audio, self.segment_ms, self.overlap_ms)
+        audio = audio.set_channels(1).set_frame_rate(SEGMENT_FRAME_RATE)
+
+        def transcribe_segment(index):
+            start, end, _ = segments[index]
+            buffer = io.BytesIO()
+            audio[start:end].export(buffer, format="wav")
+            return self._request(buffer.getvalue(), f"segment_{index}.wav")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel_calls, len(segments)))) as executor:
+            texts = list(executor.map(transcribe_segment, range(len(segments))))
+
+        print(f"[TranscriptionService] Transcribed {len(audio) / 1000:.0f}s of audio in {len(segments)} segments.")
+        return stitch_transcripts(texts, [overlaps for _, _, overlaps in segments])
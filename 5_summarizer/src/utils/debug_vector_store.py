@@ -1,5 +1,5 @@
 from chromadb import PersistentClient
-from chromadb.utils import embedding_functions
+from src.core.embeddings import get_embedding_function
 from src.config import CHROMA_PERSIST_PATH, VECTOR_STORE_COLLECTION
 
 def debug_vector_store(query: str, n_results: int = 3):
@@ -18,10 +18,11 @@ def debug_vector_store(query: str, n_results: int = 3):
         # Initialize the client
         client = PersistentClient(path=CHROMA_PERSIST_PATH)
 
-        # Use the same collection name as the system
+        # Use the same collection as the system
+        embedding_fn = get_embedding_function()
         collection = client.get_collection(
-            name=VECTOR_STORE_COLLECTION,
-            embedding_function=embedding_functions.DefaultEmbeddingFunction()
+            name=embedding_fn.collection_name(VECTOR_STORE_COLLECTION),
+            embedding_function=embedding_fn
         )
 
         # Perform a simple search
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction, ONNXMiniLM_L6_V2
+from src.core.embeddings import BatchedEmbeddingFunction
+
+TEXTS = [
+    "Short.",
+    "A somewhat longer sentence about the quarterly report and its figures.",
+    "Three words here",
+    " ".join(["A text long enough to be truncated at the model's token limit."] * 40),
+]
+
+class FakeSession:
+    """Model stand-in whose hidden state of each token depends only on its id."""
+
+    def run(self, _, inputs):
+        ids = inputs["input_ids"]
+        return [np.stack([np.sin(ids * (k + 1) / 7.0) for k in range(8)], axis=-1).astype(np.float32)]
+
+def _word_tokenizer(length=None):
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    vocab = {"[PAD]": 0, "[UNK]": 1}
+    for text in TEXTS:
+        for word, _ in Whitespace().pre_tokenize_str(text):
+            vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_truncation(max_length=256)
+    if length:
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]", length=length)
+    else:
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    return tokenizer
+
+def test_mixed_lengths_match_fixed_padding_offline():
+    batched = BatchedEmbeddingFunction(max_batch=8)
+    batched.__dict__.update(tokenizer=_word_tokenizer(), model=FakeSession())
+    reference = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+    reference.__dict__.update(tokenizer=_word_tokenizer(length=256), model=FakeSession())
+
+    vectors = batched._forward(TEXTS, batch_size=8)
+    expected = reference._forward(TEXTS, batch_size=8)
+
+    assert vectors.shape == (len(TEXTS), 8)
+    np.testing.assert_allclose(vectors, expected, atol=1e-6)
+
+@pytest.fixture(scope="module")
+def default_fn():
+    fn = DefaultEmbeddingFunction()
+    try:
+        fn(["warm up"])
+    except Exception as e:
+        pytest.skip(f"ONNX model unavailable: {e}")
+    return fn
+
+def test_mixed_lengths_match_default_function(default_fn):
+    batched = BatchedEmbeddingFunction(max_batch=8)
+
+    vectors = np.array(batched(TEXTS))
+    expected = np.array(default_fn(TEXTS))
+
+    np.testing.assert_allclose(vectors, expected, atol=1e-5)
+
+def test_int8_model_uses_its_own_collection():
+    assert BatchedEmbeddingFunction(quantized=False).collection_name("rag_collection") == "rag_collection"
+    assert BatchedEmbeddingFunction(quantized=True).collection_name("rag_collection") == "rag_collection_int8"
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.core.llm as llm
+from src.core.llm import LLMClient
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers Ollama /api/chat and OpenAI /v1/chat/completions requests."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/chat":
+            if request["stream"]:
+                lines = [{"message": {"content": word}, "done": False} for word in ("Hello ", "there")]
+                body = "\n".join(json.dumps(line) for line in lines + [{"done": True}]).encode()
+            else:
+                body = json.dumps({"message": {"content": "Hello there"}}).encode()
+        else:
+            body = json.dumps({
+                "id": "1", "object": "chat.completion", "created": 0, "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "Hello there"}}],
+            }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_ollama_async_calls_in_successive_event_loops(server_url):
+    client = LLMClient(use_openai=False)
+    client.ollama_url = f"{server_url}/api/chat"
+
+    async def collect():
+        return [piece async for piece in client.astream_chat(MESSAGES)]
+
+    # Each asyncio.run creates and closes its own loop
+    assert asyncio.run(client.achat(MESSAGES)) == "Hello there"
+    assert asyncio.run(client.achat(MESSAGES)) == "Hello there"
+    assert asyncio.run(collect()) == ["Hello ", "there"]
+
+def test_openai_async_calls_in_successive_event_loops(server_url, monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "local")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{server_url}/v1")
+    monkeypatch.setattr(LLMClient, "_shared", {})
+    client = LLMClient(use_openai=True)
+
+    assert asyncio.run(client.achat(MESSAGES)) == "Hello there"
+    assert asyncio.run(client.achat(MESSAGES)) == "Hello there"
@@ -0,0 +1,91 @@
+import io
+import os
+import re
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_transcription import build_audio, build_handler
+from src.services.transcription_service import (
+    TranscriptCache,
+    TranscriptionService,
+    split_audio,
+    stitch_transcripts,
+)
+
+def tone(ms):
+    return Sine(440, sample_rate=16000).to_audio_segment(duration=ms, volume=-10).set_channels(1)
+
+def silence(ms):
+    return AudioSegment.silent(duration=ms, frame_rate=16000)
+
+def test_stitch_removes_words_repeated_across_overlaps():
+    texts = ["the quick brown fox", "Brown fox jumps over", "over the lazy dog"]
+    assert stitch_transcripts(texts, [False, True, True]) == "the quick brown fox jumps over the lazy dog"
+
+def test_stitch_skips_a_word_cut_in_half():
+    texts = ["we went to the market", "ket to the market and bought bread"]
+    assert stitch_transcripts(texts, [False, True]) == "we went to the market and bought bread"
+
+def test_stitch_keeps_repeats_at_cuts_without_overlap():
+    assert stitch_transcripts(["yes yes", "yes no"], [False, False]) == "yes yes yes no"
+
+def test_split_audio_cuts_inside_silences():
+    audio = tone(6000) + silence(1000) + tone(6000) + silence(1000) + tone(6000)
+    segments = split_audio(audio, segment_ms=10_000, overlap_ms=1000)
+
+    assert segments[0][0] == 0 and segments[-1][1] == len(audio)
+    assert all(end - start <= 10_000 for start, end, _ in segments)
+    # Cuts fall inside the pauses and need no overlap
+    for (_, end, _), (start, _, overlaps) in zip(segments, segments[1:]):
+        assert end == start and not overlaps
+        assert audio[end - 100:end + 100].dBFS < -60
+
+def test_split_audio_overlaps_cuts_without_silence():
+    audio = tone(25_000)
+    segments = split_audio(audio, segment_ms=10_000, overlap_ms=1000)
+
+    assert segments == [(0, 10_000, False), (9_000, 19_000, True), (18_000, 25_000, True)]
+
+def test_overlap_must_be_smaller_than_segment():
+    with pytest.raises(ValueError):
+        split_audio(tone(25_000), segment_ms=10_000, overlap_ms=10_000)
+    with pytest.raises(ValueError):
+        TranscriptionService(base_url="http://127.0.0.1:1/v1", segment_seconds=10, overlap_seconds=10)
+
+def test_service_round_trip_against_stand_in(tmp_path):
+    handler = build_handler(seconds_per_audio_minute=0)
+    requests = []
+
+    class CountingHandler(handler):
+        def do_POST(self):
+            requests.append(self.path)
+            super().do_POST()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        service = TranscriptionService(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1", segment_seconds=20,
+            max_parallel_calls=4, cache=TranscriptCache(str(tmp_path))
+        )
+        audio = build_audio(minutes=1)
+
+        text = service.transcribe(audio)
+        seconds = [float(s) for s in re.findall(r"Transcript of ([\d.]+) seconds", text)]
+        assert len(seconds) == len(requests) >= 3
+        # The segments cover the recording, in order, each within the segment length
+        assert all(s <= 20 for s in seconds)
+        assert abs(sum(seconds) - len(AudioSegment.from_wav(io.BytesIO(audio))) / 1000) < 1
+
+        # The same recording is served from the cache
+        assert service.transcribe(audio) == text
+        assert len(requests) == len(seconds)
+    finally:
+        server.shutdown()
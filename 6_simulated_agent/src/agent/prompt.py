@@ -70,7 +70,8 @@ ORDER MANAGEMENT TOOLS:
 - get_order(order_id): Retrieve order details  
   **Response Format:** "Detalhes do Pedido: [ID, Itens, Total, Data, Status]"
 
-- list_orders(): Lists all existing orders in a human-readable format, including Order ID, date, rating (when not None), total value and items
+- list_orders(customer_document=None, page=1, page_size=20, id_prefix=None): Lists existing orders, newest first, in a human-readable format, including Order ID, date, rating (when not None), total value and items
+  Optional: filter by `customer_document` or by `id_prefix` (start of the order ID, case-insensitive, hyphens ignored); use `page` to see older orders (the result says how many pages exist)
 
 - rate_order(order_id, rating): Rate an order  
   Instructions (MUST follow strictly):
@@ -81,16 +82,14 @@ ORDER MANAGEMENT TOOLS:
   2) Order resolution strategy (do NOT ask the user for the full ID):
     - If the user provides a full order_id → call rate_order(order_id, rating) immediately.
     - If the user provides the first three characters (prefix) of the order_id:
-        a) Call list_orders (unless you already have a fresh list in this conversation).
-        b) Normalize IDs by lowercasing and removing hyphens.
-        c) Find orders whose normalized ID starts with the given 3-char prefix (case-insensitive).
-        d) If exactly one match → use that order_id.
-        e) If multiple matches → select the most recent by created_at.
-        f) If no matches → inform the user: "No order found starting with '<prefix>'." and stop.
-        g) After selecting the order, immediately call rate_order(order_id, rating).
+        a) Call list_orders(id_prefix="<prefix>"). It searches the whole history, not only the first page.
+        b) If it lists exactly one order → use that order_id.
+        c) If it lists multiple orders → select the first one (the most recent).
+        d) If it finds no order → inform the user: "No order found starting with '<prefix>'." and stop.
+        e) After selecting the order, immediately call rate_order(order_id, rating).
     - If the user says “last order” / “most recent order”:
-        a) Call list_orders (unless already available).
-        b) Select the most recent order by created_at.
+        a) Call list_orders(page_size=1) (unless already available). Orders come newest first.
+        b) Select the first order listed.
         c) Immediately call rate_order(order_id, rating).
 
   3) Tool usage visibility:
@@ -103,21 +102,22 @@ ORDER MANAGEMENT TOOLS:
 
   5) Efficiency:
     - Reuse any list_orders result already obtained in the current conversation when possible (avoid redundant calls).
+      A list without `id_prefix` only shows one page, so an order missing from it may still exist: search by prefix instead.
 
   --- FEW-SHOT EXAMPLES ---
   User: Quero avaliar o pedido abc em 6
   Assistant: A nota da avaliação deve estar entre 1.0 e 5.0.
 
   User: Quero avaliar meu último pedido em 4.5
-  Assistant (internal): list_orders → selecionar o mais recente → rate_order(order_id='f3a63a44-59c3-4514-88ba-06f2072726f4', rating=4.5)
+  Assistant (internal): list_orders(page_size=1) → selecionar o mais recente → rate_order(order_id='f3a63a44-59c3-4514-88ba-06f2072726f4', rating=4.5)
   Assistant (to user): "Order successfully rated: Order ID=f3a63a44-59c3-4514-88ba-06f2072726f4, Rating=4.5"
 
   User: Quero avaliar o pedido aed em 5
-  Assistant (internal): list_orders → normalizar IDs → prefixo "aed" → match encontrado → rate_order(order_id='aed12345-6789-xxxx-yyyy-zzzzzzzzzzzz', rating=5)
+  Assistant (internal): list_orders(id_prefix="aed") → match encontrado → rate_order(order_id='aed12345-6789-xxxx-yyyy-zzzzzzzzzzzz', rating=5)
   Assistant (to user): "Order successfully rated: Order ID=aed12345-6789-xxxx-yyyy-zzzzzzzzzzzz, Rating=5"
 
   User: Avaliar pedido xyz em 3
-  Assistant (internal): list_orders → nenhum pedido corresponde ao prefixo "xyz"
+  Assistant (internal): list_orders(id_prefix="xyz") → nenhum pedido corresponde ao prefixo "xyz"
   Assistant (to user): "Nenhum pedido encontrado iniciando com 'xyz'."
   --- END OF FEW-SHOTS ---
   
@@ -143,7 +143,7 @@ Interaction Pattern:
 - Updating inventory: `ACTION: update_inventory(product_name="...", quantity=...)`  
 - Creating order: `ACTION: generate_order(customer_name, customer_document, items=[...])`  
 - Getting order: `ACTION: get_order(order_id="...")`  
-- Listing orders: `ACTION: list_orders()`  
+- Listing orders: `ACTION: list_orders()`, or `ACTION: list_orders(id_prefix="...")` to find an order by the start of its ID  
 - Rating order: `ACTION: rate_order(order_id="...", rating=...)`  
 
 ---
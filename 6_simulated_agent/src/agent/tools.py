@@ -1,8 +1,8 @@
-import re
 from src.models.product import Product
 from src.models.inventory import Inventory
 from src.models.order import Order, OrderItem
 from src.utils.logger import setup_logger, log_execution_time
+from src.utils.helpers import normalize_product_name
 
 # Inicializa logger
 logger = setup_logger()
@@ -62,38 +62,64 @@ def get_order(order_id):
     return order_repo.find_by_id(order_id)
 
 @log_execution_time
-def list_orders():
+def list_orders(customer_document=None, page=1, page_size=20, id_prefix=None):
     """
-    Lista todos os pedidos existentes e formata a saída para o usuário.
+    Lista os pedidos existentes, mais recentes primeiro, e formata a saída para o usuário.
+
+    Args:
+        customer_document (str, optional): Lista apenas os pedidos deste cliente.
+        id_prefix (str, optional): Lista apenas os pedidos cujo ID começa com este prefixo
+            (sem diferenciar maiúsculas e ignorando hífens).
+        page (int, optional): Página a exibir, começando em 1.
+        page_size (int, optional): Quantidade de pedidos por página.
     """
-    orders = order_repo.list_all()
-    
-    if not orders:
+    try:
+        page = max(1, int(page))
+        page_size = max(1, int(page_size))
+    except (ValueError, TypeError):
+        return "Página inválida. Por favor, forneça números inteiros para page e page_size."
+
+    total_orders = order_repo.count(customer_document=customer_document, id_prefix=id_prefix)
+
+    if not total_orders:
+        if id_prefix:
+            return f"Nenhum pedido encontrado iniciando com '{id_prefix}'."
         return "Não há pedidos no histórico."
-        
+
+    # Uma única consulta traz pedidos, itens, nomes dos produtos e totais
+    orders = order_repo.list_summaries(
+        customer_document=customer_document,
+        id_prefix=id_prefix,
+        limit=page_size,
+        offset=(page - 1) * page_size
+    )
+    total_pages = (total_orders + page_size - 1) // page_size
+
+    if not orders:
+        return f"A página {page} não existe. O histórico tem {total_pages} página(s)."
+
     formatted_orders = []
     
     # Itera sobre cada pedido retornado pelo repositório
     for order in orders:
-        # Calcula o valor total do pedido
-        total_value = sum(item.quantity * product_repo.find_by_id(item.product_id).price 
-                          for item in order.items)
-        
         # Formata a data para um formato mais legível
-        date_formatted = order.created_at.strftime("%d/%m/%Y %H:%M:%S")
+        date_formatted = order.created_at.strftime("%d/%m/%Y %H:%M:%S") if order.created_at else "--"
         
         # Cria a string formatada para o pedido
         formatted_order = (
             f"Pedido ID: {order.id}\n"
             f"   Data: {date_formatted}\n"
-            f"   Valor Total: R${total_value:.2f}\n"
+            f"   Valor Total: R${order.total:.2f}\n"
             f"   Avaliação: {order.rating if order.rating else '--' }\n"
-            f"   Itens: {[f'{product_repo.find_by_id(item.product_id).name} ({item.quantity})' for item in order.items]}"
+            f"   Itens: {[f'{item.product_name or item.product_id} ({item.quantity})' for item in order.items]}"
         )
         formatted_orders.append(formatted_order)
     
     # Junta todas as strings de pedidos em uma única mensagem
-    return "Aqui está o seu histórico de pedidos:\n\n" + "\n\n".join(formatted_orders)
+    return (
+        f"Aqui está o seu histórico de pedidos (página {page} de {total_pages}, {total_orders} pedidos):\n\n"
+        + "\n\n".join(formatted_orders)
+    )
 
 @log_execution_time
 def rate_order(order_id, rating):
@@ -142,48 +168,32 @@ def format_products_list(products):
 
 @log_execution_time
 def get_product(product_name=None, product_id=None):
-    # Aggressive cleaning of product name
-    def clean_name(name):
-        if name is None:
-            return None
-        # Remove quotes, extra whitespace, and normalize
-        return re.sub(r'["\'\(\)]', '', str(name)).strip().lower()
-
-    # Normalize inputs
-    clean_product_name = clean_name(product_name)
-    clean_product_id = clean_name(product_id)
-
-    # If product_id looks like a product name, treat it as such
-    if clean_product_id and not clean_product_id.startswith('p'):
-        clean_product_name = clean_product_id
-        clean_product_id = None
-
-    # Get all products
-    products = product_repo.list_all()
+    # Normalize inputs (remove quotes, extra whitespace, lowercase)
+    clean_product_name = normalize_product_name(product_name)
+    clean_product_id = str(product_id).strip().strip('"\'') if product_id else None
 
     # Try to find by ID first
-    if clean_product_id and clean_product_id.startswith('p'):
-        product = next((p for p in products if p.id == clean_product_id), None)
+    if clean_product_id:
+        product = product_repo.find_by_id(clean_product_id)
         if product:
             return product
-        
+        # If product_id is not an ID, treat it as a name
+        if not clean_product_name:
+            product_name = product_id
+            clean_product_name = normalize_product_name(product_id)
+
     # Try to find by name
     if clean_product_name:
-        # Exact match
-        exact_match = next((p for p in products if clean_name(p.name) == clean_product_name), None)
+        # Exact match (indexed normalized name)
+        exact_match = product_repo.find_by_normalized_name(clean_product_name)
         if exact_match:
             return exact_match
-        
-        # Partial match
-        partial_match = next((p for p in products if clean_product_name in clean_name(p.name)), None)
-        if partial_match:
-            return partial_match
-        
-        # If no match, provide helpful error
-        similar_products = [p.name for p in products if clean_product_name in clean_name(p.name)]
-        if similar_products:
-            raise ValueError(f"Produto '{product_name}' não encontrado. Produtos similares: {', '.join(similar_products)}")
-        
+
+        # Partial match (name substring)
+        partial_matches = product_repo.search_by_name(clean_product_name, limit=1)
+        if partial_matches:
+            return partial_matches[0]
+
         raise ValueError(f"Produto '{product_name}' não encontrado")
     
     raise ValueError("Nome ou ID do produto deve ser fornecido")
@@ -223,11 +233,9 @@ def update_product(product_id, **kwargs):
     """
     Atualiza um produto existente na base.
     """
-    products = product_repo.list_all()
-    
     # Encontra o produto pelo ID.
     # Usamos o `product_id` que já foi passado como argumento.
-    matching_product = next((p for p in products if p.id == product_id), None)
+    matching_product = product_repo.find_by_id(product_id)
     
     # Se não encontrar, lança o erro.
     if not matching_product:
@@ -307,12 +315,10 @@ def update_inventory(product_id: str = None, method: str = None, quantity = None
     :param quantity: Quantity to add/remove to the inventory
     :return: Success message or error description
     """
-    # Find the product
+    # Find the product by ID, or by name when the agent passes the product name
+    product = None
     if product_id:
-        product = product_repo.find_by_id(product_id)
-    else:
-        products = product_repo.list_all()
-        product = next((p for p in products if p.name == product_id), None)
+        product = product_repo.find_by_id(product_id) or product_repo.find_by_normalized_name(product_id)
 
     if not product:
         return f"Produto '{product_id}' não encontrado."
@@ -21,3 +21,20 @@ class Order:
     def __post_init__(self):
         if not self.customer_document or not self.customer_name:
             raise ValueError("User identification is required: customer_document and customer_name must be provided")
+
+
+@dataclass
+class OrderItemSummary:
+    product_id: str
+    product_name: Optional[str]  # None se o produto foi removido
+    quantity: int
+
+@dataclass
+class OrderSummary:
+    id: str
+    customer_document: str
+    customer_name: str
+    created_at: Optional[datetime]
+    rating: Optional[float]
+    total: float
+    items: List[OrderItemSummary]
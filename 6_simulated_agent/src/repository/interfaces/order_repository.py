@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
-from src.models.order import Order
+from typing import List, Optional
+from src.models.order import Order, OrderSummary
 
 class OrderRepository(ABC):
     @abstractmethod
@@ -18,3 +18,13 @@ class OrderRepository(ABC):
     @abstractmethod
     def rate(self, order_id: str, rating: float) -> None:
         pass
+
+    @abstractmethod
+    def list_summaries(self, customer_document: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0,
+                       id_prefix: Optional[str] = None) -> List[OrderSummary]:
+        pass
+
+    @abstractmethod
+    def count(self, customer_document: Optional[str] = None, id_prefix: Optional[str] = None) -> int:
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from src.models.product import Product
 
 class ProductRepository(ABC):
@@ -11,6 +11,14 @@ class ProductRepository(ABC):
     def find_by_id(self, product_id: str) -> Product:
         pass
 
+    @abstractmethod
+    def find_by_normalized_name(self, product_name: str) -> Optional[Product]:
+        pass
+
+    @abstractmethod
+    def search_by_name(self, term: str, limit: int = 10) -> List[Product]:
+        pass
+
     @abstractmethod
     def create(self, product: Product) -> Product:
         pass
@@ -1,7 +1,8 @@
 from typing import Dict, List, Optional
 from src.repository.interfaces.order_repository import OrderRepository
 from src.repository.product_mem_repo import ProductMemRepository
-from src.models.order import Order
+from src.models.order import Order, OrderItemSummary, OrderSummary
+from src.utils.helpers import normalize_order_id
 
 class OrderMemRepository(OrderRepository):
     def __init__(self, product_repo: ProductMemRepository):
@@ -11,6 +12,50 @@ class OrderMemRepository(OrderRepository):
     def list_all(self) -> List[Order]:
         return list(self._orders.values())
 
+    def _filtered_orders(self, customer_document: Optional[str], id_prefix: Optional[str]) -> List[Order]:
+        prefix = normalize_order_id(id_prefix)
+        return [
+            order for order in self._orders.values()
+            if (not customer_document or order.customer_document == customer_document)
+            and (not prefix or normalize_order_id(order.id).startswith(prefix))
+        ]
+
+    def list_summaries(self, customer_document: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0,
+                       id_prefix: Optional[str] = None) -> List[OrderSummary]:
+        # Mais recentes primeiro, desempatando pelo ID, como na consulta do SQLite
+        orders = sorted(
+            self._filtered_orders(customer_document, id_prefix),
+            key=lambda order: (order.created_at is not None, order.created_at or 0, str(order.id)),
+            reverse=True
+        )
+        orders = orders[offset:] if limit is None else orders[offset:offset + limit]
+
+        summaries = []
+        for order in orders:
+            items, total = [], 0.0
+            for item in order.items:
+                product = self._product_repo.find_by_id(item.product_id)
+                items.append(OrderItemSummary(
+                    product_id=item.product_id,
+                    product_name=product.name if product else None,
+                    quantity=item.quantity
+                ))
+                total += item.quantity * product.price if product else 0.0
+            summaries.append(OrderSummary(
+                id=order.id,
+                customer_document=order.customer_document,
+                customer_name=order.customer_name,
+                created_at=order.created_at,
+                rating=order.rating,
+                total=total,
+                items=items
+            ))
+        return summaries
+
+    def count(self, customer_document: Optional[str] = None, id_prefix: Optional[str] = None) -> int:
+        return len(self._filtered_orders(customer_document, id_prefix))
+
     def find_by_id(self, order_id: str) -> Optional[Order]:
         return self._orders.get(order_id)
 
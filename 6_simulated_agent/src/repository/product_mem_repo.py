@@ -3,11 +3,40 @@ from src.repository.interfaces.product_repository import ProductRepository
 from src.models.product import Product
 from src.models.inventory import Inventory
 from src.repository.inventory_mem_repo import InventoryMemRepository
+from src.utils.helpers import normalize_product_name
 
 class ProductMemRepository(ProductRepository):
     def __init__(self, products: Dict[str, Product], inventory: Optional[InventoryMemRepository] = None):
         self._products = products
         self._inventory_repo = inventory  # deve ser passado!
+        # nome normalizado -> ids, na ordem de inserção
+        self._name_index: Dict[str, List[str]] = {}
+        self._indexed_names: Dict[str, str] = {}
+        self._rebuild_name_index()
+
+    def _rebuild_name_index(self) -> None:
+        self._name_index = {}
+        self._indexed_names = {}
+        for product in self._products.values():
+            self._index_name(product)
+
+    def _index_name(self, product: Product) -> None:
+        normalized = normalize_product_name(product.name)
+        self._indexed_names[product.id] = normalized
+        self._name_index.setdefault(normalized, []).append(product.id)
+
+    def _unindex_name(self, product_id: str) -> None:
+        normalized = self._indexed_names.pop(product_id, None)
+        ids = self._name_index.get(normalized)
+        if ids and product_id in ids:
+            ids.remove(product_id)
+            if not ids:
+                del self._name_index[normalized]
+
+    def _sync_name_index(self) -> None:
+        # O dict de produtos é compartilhado (ex.: InventoryMemRepository cria produtos temporários)
+        if len(self._indexed_names) != len(self._products):
+            self._rebuild_name_index()
 
     def _attach_inventory(self, product: Product) -> Optional[Product]:
         """Return a copy of the product with *quantity* refletindo o inventory atual."""
@@ -36,15 +65,34 @@ class ProductMemRepository(ProductRepository):
     def find_by_id(self, product_id: str) -> Optional[Product]:
         return self._attach_inventory(self._products.get(product_id))
 
+    def find_by_normalized_name(self, product_name: str) -> Optional[Product]:
+        self._sync_name_index()
+        ids = self._name_index.get(normalize_product_name(product_name))
+        return self._attach_inventory(self._products.get(ids[0])) if ids else None
+
+    def search_by_name(self, term: str, limit: int = 10) -> List[Product]:
+        self._sync_name_index()
+        term = normalize_product_name(term)
+        if not term:
+            return []
+        matches = [pid for pid, name in self._indexed_names.items() if term in name]
+        return [self._attach_inventory(self._products[pid]) for pid in matches[:limit]]
+
     def create(self, product: Product) -> Product:
+        if product.id in self._products:
+            self._unindex_name(product.id)
         self._products[product.id] = product
+        self._index_name(product)
         return self._attach_inventory(product)
 
     def update(self, product: Product) -> None:
         # Armazena os campos "de verdade"; quantity é derivado do inventory, então não persista quantity aqui.
         if product.id in self._products:
             base = self._products[product.id]
-            base.name = product.name
+            if base.name != product.name:
+                self._unindex_name(product.id)
+                base.name = product.name
+                self._index_name(base)
             base.price = product.price
             base.average_rating = product.average_rating
             base.image_url = product.image_url
@@ -52,6 +100,7 @@ class ProductMemRepository(ProductRepository):
     def delete(self, product_id: str) -> None:
         if product_id in self._products:
             del self._products[product_id]
+            self._unindex_name(product_id)
 
     def find_by_name(self, product_name: str) -> Optional[Product]:
         for product in self._products.values():
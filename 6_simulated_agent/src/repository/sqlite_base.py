@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -20,6 +21,9 @@ class SQLiteDatabase:
             poolclass=StaticPool
         )
         self.Session = sessionmaker(bind=self.engine)
+        self.search_index_ready = False
+        self.order_indexes_ready = False
+        self.fts_enabled = False
 
     def get_session(self):
         """
@@ -34,12 +38,107 @@ class SQLiteDatabase:
         Create all tables defined in Base
         """
         Base.metadata.create_all(self.engine)
+        self.search_index_ready = False
+        self.ensure_search_index()
+        self.order_indexes_ready = True
 
     def drop_all_tables(self):
         """
         Drop all tables defined in Base
         """
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS products_fts"))
         Base.metadata.drop_all(self.engine)
+        self.search_index_ready = False
+        self.order_indexes_ready = False
+        self.fts_enabled = False
+
+    def ensure_order_indexes(self):
+        """
+        Index the order columns used by the order history on databases
+        created before the indexes were declared. Runs once per database instance.
+        """
+        if self.order_indexes_ready:
+            return
+
+        with self.engine.begin() as conn:
+            tables = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+            if not {"orders", "order_items"} <= tables:
+                # Tables not created yet; create_all_tables creates the indexes
+                return
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_orders_customer_document ON orders (customer_document)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_orders_created_at ON orders (created_at)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items (order_id)"))
+
+        self.order_indexes_ready = True
+
+    def ensure_search_index(self):
+        """
+        Prepare the product name lookups on an existing database.
+
+        Adds and fills the normalized_name column of databases created before
+        it existed, indexes it, and keeps a trigram FTS5 table in sync with it
+        through triggers, for substring searches. When SQLite has no trigram
+        tokenizer (before 3.34), substring searches fall back to LIKE.
+        Runs once per database instance.
+        """
+        if self.search_index_ready:
+            return
+
+        from src.utils.helpers import normalize_product_name
+
+        with self.engine.begin() as conn:
+            columns = [row[1] for row in conn.execute(text("PRAGMA table_info(products)"))]
+            if not columns:
+                # Tables not created yet; create_all_tables calls this again
+                return
+
+            if "normalized_name" not in columns:
+                conn.execute(text("ALTER TABLE products ADD COLUMN normalized_name VARCHAR"))
+
+            missing = conn.execute(text("SELECT id, name FROM products WHERE normalized_name IS NULL")).fetchall()
+            if missing:
+                conn.execute(
+                    text("UPDATE products SET normalized_name = :normalized WHERE id = :id"),
+                    [{"id": row[0], "normalized": normalize_product_name(row[1])} for row in missing]
+                )
+
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_products_normalized_name ON products (normalized_name)"
+            ))
+
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+                )).first()
+                if not exists:
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE products_fts USING fts5("
+                        "normalized_name, content='products', content_rowid='rowid', tokenize='trigram')"
+                    ))
+                    conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+                    "INSERT INTO products_fts(rowid, normalized_name) VALUES (new.rowid, new.normalized_name); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+                    "INSERT INTO products_fts(products_fts, rowid, normalized_name) "
+                    "VALUES ('delete', old.rowid, old.normalized_name); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF normalized_name ON products BEGIN "
+                    "INSERT INTO products_fts(products_fts, rowid, normalized_name) "
+                    "VALUES ('delete', old.rowid, old.normalized_name); "
+                    "INSERT INTO products_fts(rowid, normalized_name) VALUES (new.rowid, new.normalized_name); END"
+                ))
+            self.fts_enabled = True
+        except OperationalError:
+            self.fts_enabled = False
+
+        self.search_index_ready = True
 
 # Global database instance
 db = SQLiteDatabase()
@@ -8,6 +8,8 @@ class ProductModel(Base):
     __tablename__ = 'products'
     id = Column(String, primary_key=True)
     name = Column(String, nullable=False)
+    # nome normalizado (helpers.normalize_product_name), indexado para buscas
+    normalized_name = Column(String, index=True)
     price = Column(Float, nullable=False)
     average_rating = Column(Float, default=0.0)
     image_url = Column(String)
@@ -25,9 +27,9 @@ class OrderModel(Base):
     __tablename__ = 'orders'
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    customer_document = Column(String, nullable=False)
+    customer_document = Column(String, nullable=False, index=True)
     customer_name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=datetime.now, index=True)
     rating = Column(Float)
 
     # Relationship to OrderItemModel
@@ -37,7 +39,7 @@ class OrderItemModel(Base):
     __tablename__ = 'order_items'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    order_id = Column(String, ForeignKey('orders.id'))
+    order_id = Column(String, ForeignKey('orders.id'), index=True)
     product_id = Column(String, ForeignKey('products.id'))
     quantity = Column(Integer, nullable=False)
 
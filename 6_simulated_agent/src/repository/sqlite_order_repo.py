@@ -1,13 +1,17 @@
+import json
 from typing import List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm.exc import NoResultFound
 from src.repository.interfaces.order_repository import OrderRepository
-from src.models.order import Order, OrderItem
+from src.models.order import Order, OrderItem, OrderItemSummary, OrderSummary
 from src.repository.sqlite_base import db
 from src.repository.sqlite_models import OrderModel, OrderItemModel, ProductModel, InventoryModel
+from src.utils.helpers import normalize_order_id
 
 class SQLiteOrderRepository(OrderRepository):
-    def __init__(self):
-        self.session = db.get_session()
+    def __init__(self, database=db):
+        database.ensure_order_indexes()
+        self.session = database.get_session()
 
     def list_all(self) -> List[Order]:
         """
@@ -32,6 +36,84 @@ class SQLiteOrderRepository(OrderRepository):
             ) for model in order_models
         ]
 
+    def _filtered_orders(self, query, customer_document, id_prefix):
+        if customer_document:
+            query = query.filter(OrderModel.customer_document == customer_document)
+        if id_prefix:
+            # Compara sem hífens e sem diferenciar maiúsculas, como normalize_order_id
+            normalized_id = func.replace(func.lower(OrderModel.id), "-", "")
+            query = query.filter(normalized_id.like(f"{normalize_order_id(id_prefix)}%"))
+        return query
+
+    def list_summaries(self, customer_document: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0,
+                       id_prefix: Optional[str] = None) -> List[OrderSummary]:
+        """
+        List orders with their items, product names and totals, newest first,
+        in a single query. Totals are computed by SQLite.
+
+        :param customer_document: Only orders of this customer, if given
+        :param limit: Maximum number of orders (None for all)
+        :param offset: Number of orders to skip, for pagination
+        :param id_prefix: Only orders whose ID starts with this prefix, ignoring case and hyphens
+        :return: List of OrderSummary objects
+        """
+        # Pagina os pedidos primeiro, para juntar só os itens da página
+        orders_query = self._filtered_orders(self.session.query(OrderModel), customer_document, id_prefix)
+        orders = (
+            orders_query
+            .order_by(OrderModel.created_at.desc(), OrderModel.id.desc())
+            .limit(-1 if limit is None else limit)
+            .offset(offset)
+            .subquery()
+        )
+
+        rows = (
+            self.session.query(
+                orders.c.id,
+                orders.c.customer_document,
+                orders.c.customer_name,
+                orders.c.created_at,
+                orders.c.rating,
+                func.coalesce(func.sum(OrderItemModel.quantity * ProductModel.price), 0.0).label("total"),
+                func.json_group_array(
+                    func.json_array(OrderItemModel.product_id, ProductModel.name, OrderItemModel.quantity)
+                ).label("items")
+            )
+            .outerjoin(OrderItemModel, OrderItemModel.order_id == orders.c.id)
+            .outerjoin(ProductModel, ProductModel.id == OrderItemModel.product_id)
+            .group_by(orders.c.id)
+            .order_by(orders.c.created_at.desc(), orders.c.id.desc())
+            .all()
+        )
+
+        return [
+            OrderSummary(
+                id=row.id,
+                customer_document=row.customer_document,
+                customer_name=row.customer_name,
+                created_at=row.created_at,
+                rating=row.rating,
+                total=row.total,
+                items=[
+                    OrderItemSummary(product_id=product_id, product_name=name, quantity=quantity)
+                    for product_id, name, quantity in json.loads(row.items)
+                    if product_id is not None  # pedido sem itens
+                ]
+            ) for row in rows
+        ]
+
+    def count(self, customer_document: Optional[str] = None, id_prefix: Optional[str] = None) -> int:
+        """
+        Count orders, optionally of a single customer or ID prefix
+
+        :param customer_document: Only orders of this customer, if given
+        :param id_prefix: Only orders whose ID starts with this prefix, if given
+        :return: Number of orders
+        """
+        query = self.session.query(func.count(OrderModel.id))
+        return self._filtered_orders(query, customer_document, id_prefix).scalar()
+
     def find_by_id(self, order_id: str) -> Optional[Order]:
         """
         Find an order by its ID
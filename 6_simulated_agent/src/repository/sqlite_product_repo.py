@@ -4,12 +4,29 @@ from src.repository.interfaces.product_repository import ProductRepository
 from src.models.product import Product
 from src.repository.sqlite_base import db
 from src.repository.sqlite_models import ProductModel
+from src.utils.helpers import normalize_product_name
 import uuid
+from sqlalchemy import func, text
 from sqlalchemy.orm import joinedload
 
 class SQLiteProductRepository(ProductRepository):
-    def __init__(self):
-        self.session = db.get_session()
+    def __init__(self, database=db):
+        self.database = database
+        self.database.ensure_search_index()
+        self.session = database.get_session()
+
+    @staticmethod
+    def _to_product(model: ProductModel) -> Product:
+        product = Product(
+            id=model.id,
+            name=model.name,
+            price=model.price,
+            average_rating=model.average_rating,
+            image_url=model.image_url
+        )
+        # adiciona quantity dinamicamente
+        product.quantity = model.inventory.quantity if model.inventory else 0
+        return product
 
     def list_all(self) -> List[Product]:
         """
@@ -23,24 +40,7 @@ class SQLiteProductRepository(ProductRepository):
             .all()
         )
 
-        products = []
-
-        for model in product_models:
-            # cria o Product normal
-            product = Product(
-                id=model.id,
-                name=model.name,
-                price=model.price,
-                average_rating=model.average_rating,
-                image_url=model.image_url,
-            )
-
-            # adiciona quantity dinamicamente
-            product.quantity = model.inventory.quantity if model.inventory else 0
-
-            products.append(product)
-
-        return products
+        return [self._to_product(model) for model in product_models]
 
     def find_by_id(self, product_id: str) -> Optional[Product]:
         """
@@ -59,19 +59,8 @@ class SQLiteProductRepository(ProductRepository):
 
             if not model:
                 return None
-            
-            product = Product(
-                id=model.id,
-                name=model.name,
-                price=model.price,
-                average_rating=model.average_rating,
-                image_url=model.image_url
-            )
-        
-            # adiciona quantity dinamicamente
-            product.quantity = model.inventory.quantity if model.inventory else 0
 
-            return product
+            return self._to_product(model)
 
         except NoResultFound:
             return None
@@ -104,6 +93,47 @@ class SQLiteProductRepository(ProductRepository):
         except Exception:
             return None
 
+    def find_by_normalized_name(self, product_name: str) -> Optional[Product]:
+        """
+        Find the product whose normalized name equals the normalized product_name.
+        Uses the index on normalized_name.
+
+        :param product_name: Product name, in any case, with or without quotes
+        :return: Product object or None
+        """
+        model = (
+            self.session.query(ProductModel)
+            .options(joinedload(ProductModel.inventory))
+            .filter(ProductModel.normalized_name == normalize_product_name(product_name))
+            .first()
+        )
+        return self._to_product(model) if model else None
+
+    def search_by_name(self, term: str, limit: int = 10) -> List[Product]:
+        """
+        Find products whose normalized name contains the normalized term.
+        Terms of 3+ characters use the trigram FTS5 index when available.
+
+        :param term: Part of the product name
+        :param limit: Maximum number of products returned
+        :return: List of Product objects, in insertion order
+        """
+        term = normalize_product_name(term)
+        if not term:
+            return []
+
+        query = self.session.query(ProductModel).options(joinedload(ProductModel.inventory))
+        if self.database.fts_enabled and len(term) >= 3:
+            phrase = '"' + term.replace('"', '""') + '"'
+            query = query.filter(text(
+                "products.rowid IN (SELECT rowid FROM products_fts WHERE products_fts MATCH :phrase)"
+            )).params(phrase=phrase)
+        else:
+            query = query.filter(func.instr(ProductModel.normalized_name, term) > 0)
+
+        models = query.order_by(text("products.rowid")).limit(limit).all()
+        return [self._to_product(model) for model in models]
+
     def create(self, product: Product) -> Product:
         """
         Create a new product in the database
@@ -113,6 +143,7 @@ class SQLiteProductRepository(ProductRepository):
         product_model = ProductModel(
             id=product.id,
             name=product.name,
+            normalized_name=normalize_product_name(product.name),
             price=product.price,
             average_rating=product.average_rating or 0.0,
             image_url=product.image_url
@@ -141,6 +172,7 @@ class SQLiteProductRepository(ProductRepository):
             product_model = self.session.query(ProductModel).filter_by(id=product.id).one()
             
             product_model.name = product.name
+            product_model.normalized_name = normalize_product_name(product.name)
             product_model.price = product.price
             product_model.average_rating = product.average_rating
             product_model.image_url = product.image_url
@@ -1,3 +1,4 @@
+import re
 import uuid
 from src.models.product import Product
 import random
@@ -17,3 +18,21 @@ def get_products():
     ]
 
     return {product.id: product for product in products}
+
+def normalize_product_name(name):
+    """
+    Normaliza o nome de um produto para buscas: remove aspas e parênteses,
+    espaços nas pontas e converte para minúsculas.
+    """
+    if name is None:
+        return None
+    return re.sub(r'["\'\(\)]', '', str(name)).strip().lower()
+
+def normalize_order_id(order_id):
+    """
+    Normaliza um ID de pedido (ou prefixo) para comparações: minúsculas,
+    sem hífens nem outros caracteres que não sejam letras ou dígitos.
+    """
+    if order_id is None:
+        return None
+    return re.sub(r'[^0-9a-z]', '', str(order_id).lower())
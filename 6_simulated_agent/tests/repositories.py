@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
-from src.repository.sqlite_base import db
+import os
+import tempfile
+import time
+from src.repository.sqlite_base import db, SQLiteDatabase
 from sqlalchemy import text
 
 from src.repository.product_mem_repo import ProductMemRepository
@@ -181,9 +184,142 @@ def test_sqlite_repositories():
     # pprint(product_repo.list_all())
     print("\n")
 
+def test_product_lookups():
+    print("🔎 Testing Product Lookups")
+    # Memory repository
+    products = get_products()
+    product_repo = ProductMemRepository(products=products, inventory=InventoryMemRepository(products))
+    keyboard = product_repo.find_by_normalized_name(' "RGB Mechanical Keyboard" ')
+    assert keyboard and keyboard.name == "RGB Mechanical Keyboard"
+    assert [p.name for p in product_repo.search_by_name("gaming")] == ["Gaming Notebook X15", "Gaming Mouse 7200DPI"]
+
+    keyboard.name = "Wireless Keyboard"
+    product_repo.update(keyboard)
+    assert product_repo.find_by_normalized_name("rgb mechanical keyboard") is None
+    assert product_repo.find_by_normalized_name("wireless keyboard").id == keyboard.id
+    product_repo.delete(keyboard.id)
+    assert product_repo.search_by_name("keyboard") == []
+
+    # SQLite repository, on a temporary database
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = SQLiteDatabase(os.path.join(tmp_dir, "lookups.db"))
+        database.create_all_tables()
+        product_repo = SQLiteProductRepository(database)
+        for product in get_products().values():
+            product_repo.create(product)
+
+        print(f"FTS5 trigram index: {'enabled' if database.fts_enabled else 'unavailable, using LIKE'}")
+        monitor = product_repo.find_by_normalized_name('27" full hd monitor')
+        assert monitor and monitor.name == '27" Full HD Monitor'
+        assert [p.name for p in product_repo.search_by_name("full hd")] == ['27" Full HD Monitor', "Full HD 1080p Webcam"]
+        assert [p.name for p in product_repo.search_by_name("hd", limit=1)] == ['27" Full HD Monitor']
+
+        monitor.name = "UltraWide Monitor"
+        product_repo.update(monitor)
+        assert [p.name for p in product_repo.search_by_name("ultrawide")] == ["UltraWide Monitor"]
+        product_repo.delete(monitor.id)
+        assert product_repo.search_by_name("ultrawide") == []
+
+        # Lookups stay flat as the catalog grows
+        with database.engine.begin() as conn:
+            conn.execute(
+                ProductModel.__table__.insert(),
+                [{"id": f"bulk-{i}", "name": f"Bulk Product {i}", "normalized_name": f"bulk product {i}", "price": 1.0}
+                 for i in range(100_000)]
+            )
+        start = time.perf_counter()
+        for i in range(0, 100_000, 1_000):
+            assert product_repo.find_by_normalized_name(f"Bulk Product {i}").id == f"bulk-{i}"
+            assert product_repo.search_by_name(f"product {i}", limit=1)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+        print(f"✅ Lookup pair on 100k products: {elapsed_ms:.2f} ms")
+        product_repo.session.close()
+    print("\n")
+
+def test_order_summaries():
+    print("🧾 Testing Order Summaries")
+    # Memory repository
+    products = get_products()
+    inventory_repo = InventoryMemRepository(products)
+    product_repo = ProductMemRepository(products=products, inventory=inventory_repo)
+    order_repo = OrderMemRepository(product_repo)
+    first, second = list(products.values())[:2]
+    inventory_repo.add(Inventory(product_id=first.id, quantity=10))
+    inventory_repo.add(Inventory(product_id=second.id, quantity=10))
+    order_repo.create(Order(id="ab-01", customer_document="b", customer_name="B", created_at=datetime(2024, 1, 2), items=[
+        OrderItem(product_id=first.id, quantity=1), OrderItem(product_id=second.id, quantity=3)
+    ]))
+    # Inserted later but older: summaries follow created_at, not insertion order
+    order_repo.create(Order(id="AB-02", customer_document="a", customer_name="A", created_at=datetime(2024, 1, 1),
+                            items=[OrderItem(product_id=first.id, quantity=2)]))
+    summaries = order_repo.list_summaries()
+    assert [s.customer_document for s in summaries] == ["b", "a"]
+    assert summaries[0].total == first.price + 3 * second.price
+    assert [s.total for s in order_repo.list_summaries(customer_document="a")] == [2 * first.price]
+    assert order_repo.count() == 2 and order_repo.count(customer_document="b") == 1
+    assert [s.id for s in order_repo.list_summaries(id_prefix="Ab0")] == ["ab-01", "AB-02"]
+    assert order_repo.count(id_prefix="ab02") == 1 and order_repo.count(id_prefix="xyz") == 0
+
+    # SQLite repository, on a temporary database
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = SQLiteDatabase(os.path.join(tmp_dir, "orders.db"))
+        database.create_all_tables()
+        product_repo = SQLiteProductRepository(database)
+        order_repo = SQLiteOrderRepository(database)
+        products = list(get_products().values())
+        for product in products:
+            product_repo.create(product)
+
+        # 10k orders with 1 to 3 items each
+        with database.engine.begin() as conn:
+            conn.execute(OrderModel.__table__.insert(), [
+                {"id": f"order-{i:05d}", "customer_document": f"doc-{i % 100}", "customer_name": "Bulk Customer",
+                 "created_at": datetime(2024, 1, 1) + timedelta(minutes=i)}
+                for i in range(10_000)
+            ])
+            conn.execute(OrderItemModel.__table__.insert(), [
+                {"order_id": f"order-{i:05d}", "product_id": products[(i + j) % len(products)].id, "quantity": j + 1}
+                for i in range(10_000) for j in range(i % 3 + 1)
+            ])
+
+        start = time.perf_counter()
+        page = order_repo.list_summaries(limit=20)
+        page_ms = (time.perf_counter() - start) * 1000
+        assert [s.id for s in page[:2]] == ["order-09999", "order-09998"]
+        assert page[0].total == sum(
+            (j + 1) * products[(9999 + j) % len(products)].price for j in range(9999 % 3 + 1)
+        )
+        assert page[0].items[0].product_name == products[9999 % len(products)].name
+        assert order_repo.list_summaries(limit=20, offset=20)[0].id == "order-09979"
+
+        customer_orders = order_repo.list_summaries(customer_document="doc-7")
+        assert len(customer_orders) == order_repo.count(customer_document="doc-7") == 100
+
+        # Prefix lookups search the whole history, not only the first page
+        start = time.perf_counter()
+        matches = order_repo.list_summaries(id_prefix="ORDER0012")
+        prefix_ms = (time.perf_counter() - start) * 1000
+        assert [s.id for s in matches][-1] == "order-00120" and len(matches) == order_repo.count(id_prefix="order0012") == 10
+
+        # Totals match the ones computed from the orders, as list_orders did before
+        prices = {p.id: p.price for p in products}
+        expected = {o.id: sum(i.quantity * prices[i.product_id] for i in o.items) for o in order_repo.list_all()}
+        start = time.perf_counter()
+        history = order_repo.list_summaries()
+        history_ms = (time.perf_counter() - start) * 1000
+        assert len(history) == 10_000 and all(abs(s.total - expected[s.id]) < 1e-6 for s in history)
+
+        print(f"✅ Page of 20 orders: {page_ms:.2f} ms, prefix lookup: {prefix_ms:.2f} ms, "
+              f"full 10k-order history: {history_ms:.2f} ms")
+        product_repo.session.close()
+        order_repo.session.close()
+    print("\n")
+
 def run_all_tests():
     print("🚀 Running Repository Tests\n")
     test_memory_repositories()
+    test_product_lookups()
+    test_order_summaries()
     # test_sqlite_repositories()
 
 if __name__ == "__main__":